@@ -0,0 +1,418 @@
+"""
+Benchmarks de los núcleos de cálculo (MRO y eléctrico) y del rerun completo de cada app, con Streamlit
+simulado (sin servidor ni navegador: solo el costo de cálculo del script).
+
+Cada caso se corre a tamaño realista y escalado (1, 1k y 1M escenarios; 13 a 2.000 unidades) y se reporta
+el mejor tiempo de varias repeticiones y su rendimiento (unidades por segundo). Los resultados se pueden
+guardar como línea base JSON y comparar contra ella: se marca regresión cuando el rendimiento cae más que
+el umbral (por defecto 25%) y el proceso termina con código 1. En máquinas compartidas o con frecuencia
+variable conviene una línea base propia de esa máquina y un umbral mayor.
+
+Uso:
+    python benchmark_motores.py --guardar-base benchmark_base.json
+    python benchmark_motores.py --comparar benchmark_base.json --umbral 0.25
+    python benchmark_motores.py --filtro rerun --max-tamano 1000
+"""
+import argparse
+import json
+import platform
+import runpy
+import sys
+import time
+import types
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import motor_electrico
+import motor_mro
+
+RAIZ = Path(__file__).parent
+APPS = {
+    "mro": RAIZ / "simulador_mrov5_1.py",
+    "electrico_v1": RAIZ / "panel_electrico_v1.py",
+    "electrico_v3": RAIZ / "panel_electrico_v3.py",
+    "electrico_v3r2": RAIZ / "panel_electrico_v3r2.py",
+}
+TAMANOS_ESCENARIOS = [1, 1_000, 1_000_000]
+UNIDADES_EDIFICIO = [13, 200, 2_000]
+
+
+# --- STREAMLIT SIMULADO ---
+# Cada widget devuelve su valor por defecto (o el indicado en 'valores' por etiqueta); el resto de la API
+# es un no-op. columns/tabs/expander/sidebar devuelven el mismo objeto, así los widgets anidados funcionan.
+
+class _Nada:
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, nombre):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _EstadoSesion(dict):
+    def __getattr__(self, nombre):
+        try:
+            return self[nombre]
+        except KeyError:
+            raise AttributeError(nombre) from None
+
+    def __setattr__(self, nombre, valor):
+        self[nombre] = valor
+
+
+class StreamlitSimulado(types.ModuleType):
+    def __init__(self, valores=None):
+        super().__init__("streamlit")
+        self.valores = valores or {}
+        self.session_state = _EstadoSesion()
+        self.query_params = {}
+        self.sidebar = self
+
+    def __getattr__(self, nombre):
+        return _Nada()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _valor(self, etiqueta, defecto):
+        return self.valores.get(etiqueta, defecto)
+
+    @staticmethod
+    def _decorador(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda funcion: funcion
+
+    cache_data = cache_resource = _decorador
+
+    def columns(self, spec, *args, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, etiquetas, *args, **kwargs):
+        return [self] * len(etiquetas)
+
+    def expander(self, *args, **kwargs):
+        return self
+
+    container = spinner = empty = expander
+
+    def number_input(self, etiqueta, min_value=None, max_value=None, value="min", *args, **kwargs):
+        if value == "min":
+            value = min_value if min_value is not None else 0.0
+        return self._valor(etiqueta, value)
+
+    def slider(self, etiqueta, min_value=None, max_value=None, value=None, *args, **kwargs):
+        return self._valor(etiqueta, value if value is not None else min_value)
+
+    def select_slider(self, etiqueta, options=(), value=None, *args, **kwargs):
+        return self._valor(etiqueta, value if value is not None else list(options)[0])
+
+    def selectbox(self, etiqueta, options=(), index=0, *args, **kwargs):
+        opciones = list(options)
+        return self._valor(etiqueta, opciones[index] if opciones and index is not None else None)
+
+    radio = selectbox
+
+    def multiselect(self, etiqueta, options=(), default=None, *args, **kwargs):
+        return self._valor(etiqueta, list(default or []))
+
+    def checkbox(self, etiqueta, value=False, *args, **kwargs):
+        return self._valor(etiqueta, value)
+
+    toggle = checkbox
+
+    def text_input(self, etiqueta, value="", *args, **kwargs):
+        return self._valor(etiqueta, value)
+
+    text_area = text_input
+
+    def data_editor(self, data, *args, **kwargs):
+        return data
+
+    def file_uploader(self, *args, **kwargs):
+        return None
+
+    def button(self, *args, **kwargs):
+        return False
+
+    download_button = button
+
+
+@contextmanager
+def streamlit_simulado(valores=None):
+    """
+    Instala el módulo simulado en sys.modules mientras dura el bloque. Los módulos del repo que importan
+    streamlit (p. ej. perfilador) se descargan al salir para no quedar atados al simulado.
+    """
+    previo = sys.modules.get("streamlit")
+    sys.modules["streamlit"] = StreamlitSimulado(valores)
+    try:
+        yield sys.modules["streamlit"]
+    finally:
+        sys.modules.pop("perfilador", None)
+        if previo is None:
+            sys.modules.pop("streamlit", None)
+        else:
+            sys.modules["streamlit"] = previo
+
+
+def correr_app(ruta, valores=None):
+    """
+    Un rerun completo del script con Streamlit simulado. Devuelve sus variables globales.
+    """
+    with streamlit_simulado(valores), warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return runpy.run_path(str(ruta), run_name="__benchmark__")
+
+
+# --- CASOS ---
+
+def casos_benchmark(max_tamano=None):
+    """
+    Lista de (nombre, unidades, preparar) donde preparar() devuelve la función a cronometrar (sin argumentos).
+    La preparación (datos de entrada, lectura de scripts) queda fuera del tiempo medido.
+    """
+    rng = np.random.default_rng(0)
+    registro = motor_mro.cargar_registro_flota()
+    flota_defecto = motor_mro.vector_cantidades({"B757-C": 2, "A320-C": 4, "B737-C": 3, "E190-C": 2}, registro)
+    casos = []
+
+    for n in TAMANOS_ESCENARIOS:
+        def preparar_nomina(n=n):
+            tecnicos = rng.integers(10, 1000, n).astype(float)
+            return lambda: motor_mro.calcular_nomina_compleja(tecnicos, 14.0, 5, 1)
+
+        def preparar_mro(n=n):
+            cantidades = rng.poisson(flota_defecto, (n, len(flota_defecto))).astype(float)
+            entradas = {**motor_mro.ENTRADAS_DEFECTO, "av_tecnicos": rng.integers(10, 60, n).astype(float)}
+            return lambda: motor_mro.evaluar_mro_vectorizado(cantidades, **entradas)
+
+        def preparar_prediccion(n=n):
+            return lambda: motor_mro.motor_prediccion_mercado(flota_defecto, 110_000, meses=24, n_trayectorias=n, semilla=1)
+
+        casos += [
+            (f"calcular_nomina_compleja[{n}]", n, preparar_nomina),
+            (f"evaluar_mro_vectorizado[{n}]", n, preparar_mro),
+            (f"motor_prediccion_mercado[{n} trayectorias]", n, preparar_prediccion),
+        ]
+
+    for n in TAMANOS_ESCENARIOS:
+        def preparar_breaker(n=n):
+            amperios = rng.uniform(5, 350, n)
+            return lambda: motor_electrico.seleccionar_breaker_comercial(amperios)
+
+        def preparar_iluminacion(n=n):
+            watts = rng.uniform(500, 20_000, n)
+            return lambda: motor_electrico.calc_demanda_iluminacion(watts)
+
+        def preparar_motor(n=n):
+            hp = rng.choice([1, 1.5, 2, 3, 5], n)
+            return lambda: motor_electrico.calc_motor_bomba(hp, 240, es_motor_mayor=True)
+
+        def preparar_conductores(n=n):
+            amperios = rng.uniform(5, 350, n)
+            longitud = rng.uniform(5, 80, n)
+            breakers = motor_electrico.seleccionar_breaker_comercial(amperios)
+            return lambda: motor_electrico.dimensionar_conductores(amperios, longitud, 240, breakers=breakers)
+
+        def preparar_riesgo(n=n):
+            equipos = ["iluminacion", "cocina", "lavado", "refri", "calentador", "microondas", "jacuzzi", "ac"]
+            watts = [5400, 8000, 4500, 600, 4500, 0, 3500, 3000]
+            return lambda: motor_electrico.riesgo_disparo(watts, equipos, [70, 100, 125], 240, n_muestras=n, semilla=0)
+
+        def preparar_motores(n=n):
+            hp = rng.choice([0.5, 1, 1.5, 2, 3, 5, 7.5, 10], n)
+            grupos = rng.integers(0, max(1, n // 10), n)
+            return lambda: motor_electrico.dimensionar_motores(hp, 240, 1, grupos)
+
+        casos += [
+            (f"dimensionar_motores[{n}]", n, preparar_motores),
+            (f"riesgo_disparo[{n} muestras]", n, preparar_riesgo),
+            (f"seleccionar_breaker_comercial[{n}]", n, preparar_breaker),
+            (f"dimensionar_conductores[{n}]", n, preparar_conductores),
+            (f"calc_demanda_iluminacion[{n}]", n, preparar_iluminacion),
+            (f"calc_motor_bomba[{n}]", n, preparar_motor),
+        ]
+
+    for unidades in UNIDADES_EDIFICIO:
+        def preparar_edificio(unidades=unidades):
+            edificio = motor_electrico.leer_edificio(motor_electrico.edificio_sintetico(unidades, n_torres=4, semilla=0))
+            return lambda: motor_electrico.calcular_edificio(edificio, 240, cargas_comunes_w=20_000)
+
+        def preparar_balance(unidades=unidades):
+            cargas = rng.uniform(8_000, 30_000, unidades)
+            return lambda: motor_electrico.balancear_fases(cargas, np.full(unidades, 2), 208)
+
+        def preparar_perfiles(unidades=unidades):
+            edificio = motor_electrico.leer_edificio(motor_electrico.edificio_sintetico(unidades, n_torres=4, semilla=0))
+            _, equipos, watts = motor_electrico.cargas_para_perfiles(edificio)
+
+            def simular():
+                # Cada llamado escribe su propio temporal; se borra para no llenar el disco entre repeticiones
+                resultado = motor_electrico.simular_perfiles_anuales(watts, equipos, intervalo_min=60, semilla=0)
+                Path(resultado["ruta_perfiles"]).unlink()
+                return resultado
+            return simular
+
+        def preparar_cuadros(unidades=unidades):
+            edificio = motor_electrico.leer_edificio(motor_electrico.edificio_sintetico(unidades, n_torres=4, semilla=0))
+            return lambda: motor_electrico.generar_cuadros(**motor_electrico.circuitos_unidades(edificio, 208), voltaje=208,
+                                                           nombres_tableros=edificio["unidades"], monofasico=True)
+
+        def preparar_hardware(unidades=unidades):
+            edificio = motor_electrico.leer_edificio(motor_electrico.edificio_sintetico(unidades, n_torres=4, semilla=0))
+            por_unidad = motor_electrico.calcular_edificio(edificio, 240)["unidades"]
+            _, piso = np.unique(edificio["pisos"], return_inverse=True)
+            return lambda: motor_electrico.configuracion_hardware(por_unidad["breaker"], grupo=piso, amperios_principal=600)
+
+        def preparar_cortocircuito(unidades=unidades):
+            # principal -> 4 alimentadores de torre -> posición de medidor -> centro de carga de cada unidad
+            torre = np.arange(unidades) % 4
+            padre = np.concatenate([[-1], np.zeros(4, dtype=int), 1 + torre, 5 + np.arange(unidades)])
+            longitud = np.concatenate([[10], np.full(4, 40.0), np.zeros(unidades), rng.uniform(15, 60, unidades)])
+            calibre = np.concatenate([["500", "4/0", "4/0", "4/0", "4/0"], np.full(unidades, ""), np.full(unidades, "2")])
+            return lambda: motor_electrico.corriente_cortocircuito(
+                1000, 5.75, 208, padre, longitud, calibre, conductores_paralelo=np.r_[4, np.ones(4 + 2 * unidades)],
+                fases=np.r_[np.full(5, 3), np.ones(2 * unidades, dtype=int)], fases_transformador=3, aic_ka=10)
+
+        casos += [
+            (f"calcular_edificio[{unidades} unidades]", unidades, preparar_edificio),
+            (f"balancear_fases[{unidades} unidades]", unidades, preparar_balance),
+            (f"simular_perfiles_anuales[{unidades} unidades x 8760]", unidades, preparar_perfiles),
+            (f"generar_cuadros[{unidades} unidades]", unidades, preparar_cuadros),
+            (f"configuracion_hardware[{unidades} unidades]", unidades, preparar_hardware),
+            (f"corriente_cortocircuito[{unidades} unidades]", unidades, preparar_cortocircuito),
+        ]
+
+    # Reruns completos: 1 rerun = 1 unidad de rendimiento (los del edificio v3 cuentan sus unidades)
+    casos += [
+        ("rerun mro[defecto]", 1, lambda: lambda: correr_app(APPS["mro"])),
+        ("rerun mro[1k trayectorias, 500 sitios]", 1, lambda: lambda: correr_app(
+            APPS["mro"], {"Trayectorias Simuladas": 1_000, "Fuente de Sitios": "Sitios de ejemplo", "Cantidad de Sitios": 500})),
+        ("rerun electrico_v1[defecto]", 1, lambda: lambda: correr_app(APPS["electrico_v1"])),
+        ("rerun electrico_v3r2[defecto]", 1, lambda: lambda: correr_app(APPS["electrico_v3r2"])),
+    ]
+    for unidades in UNIDADES_EDIFICIO:
+        # Proyecto sintético de la pestaña Edificio: el tamaño es la cantidad de unidades (el Monte Carlo de
+        # riesgo de disparo es un costo fijo por rerun y no escala con el edificio)
+        casos.append((f"rerun electrico_v3[{unidades} unidades]", unidades,
+                      lambda unidades=unidades: lambda: correr_app(APPS["electrico_v3"], {
+                          "Origen de las unidades": "Proyecto sintético", "Unidades": unidades, "Torres": 4})))
+
+    if max_tamano is not None:
+        casos = [c for c in casos if c[1] <= max_tamano]
+    return casos
+
+
+# --- MEDICIÓN Y COMPARACIÓN ---
+
+def medir(funcion, repeticiones=5, presupuesto_s=10.0, muestra_minima_s=0.02):
+    """
+    Mejor tiempo y mediana por llamado sobre hasta 'repeticiones' muestras (se corta antes si se agota el
+    presupuesto). Las funciones muy rápidas se agrupan en lotes de llamados hasta que cada muestra dure
+    al menos muestra_minima_s, como timeit.autorange, para que el ruido del reloj no domine.
+    """
+    lote = 1
+    while True:
+        t_inicio = time.perf_counter()
+        for _ in range(lote):
+            funcion()
+        duracion = time.perf_counter() - t_inicio
+        if duracion >= muestra_minima_s:
+            break
+        lote *= 2
+
+    tiempos = [duracion / lote]
+    t_limite = time.perf_counter() + presupuesto_s
+    while len(tiempos) < repeticiones and time.perf_counter() < t_limite:
+        t_inicio = time.perf_counter()
+        for _ in range(lote):
+            funcion()
+        tiempos.append((time.perf_counter() - t_inicio) / lote)
+    return min(tiempos), float(np.median(tiempos)), len(tiempos)
+
+
+def correr_benchmarks(filtro=None, max_tamano=None, repeticiones=5, presupuesto_s=10.0, salida=sys.stdout):
+    resultados = {}
+    for nombre, unidades, preparar in casos_benchmark(max_tamano):
+        if filtro and filtro not in nombre:
+            continue
+        funcion = preparar()
+        funcion()  # calentamiento: lru_cache, imports y páginas de memoria
+        mejor, mediana, corridas = medir(funcion, repeticiones, presupuesto_s)
+        resultados[nombre] = {"unidades": unidades, "mejor_s": mejor, "mediana_s": mediana, "corridas": corridas,
+                              "unidades_por_s": unidades / mejor}
+        print(f"{nombre:<55} {mejor*1000:>11,.2f} ms  {unidades / mejor:>16,.0f} u/s", file=salida)
+    return {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar_con_base(actual, base, umbral=0.25):
+    """
+    Casos cuyo rendimiento cayó más que 'umbral' (fracción) respecto de la línea base: [(nombre, base, actual, cambio)].
+    Los casos que no están en ambos archivos se ignoran.
+    """
+    regresiones = []
+    for nombre, res in actual["resultados"].items():
+        referencia = base["resultados"].get(nombre)
+        if referencia is None:
+            continue
+        cambio = res["unidades_por_s"] / referencia["unidades_por_s"] - 1
+        if cambio < -umbral:
+            regresiones.append((nombre, referencia["unidades_por_s"], res["unidades_por_s"], cambio))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de los núcleos MRO/eléctricos y del rerun de cada app.")
+    parser.add_argument("--salida", default="benchmark_resultados.json", help="JSON con los resultados de esta corrida")
+    parser.add_argument("--guardar-base", help="Además, guardar los resultados como línea base en esta ruta")
+    parser.add_argument("--comparar", help="Línea base JSON contra la que comparar")
+    parser.add_argument("--umbral", type=float, default=0.25, help="Caída de rendimiento tolerada (default: 0.25 = 25%%)")
+    parser.add_argument("--filtro", help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--max-tamano", type=int, help="Omitir casos con más unidades que esto (p. ej. 1000 para una corrida rápida)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Repeticiones por caso (default: 5)")
+    parser.add_argument("--presupuesto", type=float, default=10.0, help="Segundos máximos por caso (default: 10)")
+    args = parser.parse_args(argv)
+
+    actual = correr_benchmarks(args.filtro, args.max_tamano, args.repeticiones, args.presupuesto)
+    Path(args.salida).write_text(json.dumps(actual, indent=2), encoding="utf-8")
+    if args.guardar_base:
+        Path(args.guardar_base).write_text(json.dumps(actual, indent=2), encoding="utf-8")
+        print(f"Línea base guardada en {args.guardar_base}")
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text(encoding="utf-8"))
+        regresiones = comparar_con_base(actual, base, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones (caída > {args.umbral:.0%}) contra {args.comparar}:")
+            for nombre, antes, despues, cambio in regresiones:
+                print(f"  {nombre:<55} {antes:>14,.0f} -> {despues:>14,.0f} u/s ({cambio:+.1%})")
+            return 1
+        print(f"\nSin regresiones contra {args.comparar} (umbral {args.umbral:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from motor_mro import (ENTRADAS_DEFECTO, RUTA_DEPARTAMENTOS, RUTA_PERFILES_FLOTA, VERSION_MOTOR, cargar_registro_flota,
+                       evaluar_mro, vector_cantidades)
+
+# ==========================================
+# ALMACÉN DE ESCENARIOS (SQLITE LOCAL)
+# ==========================================
+# Cada escenario guarda las entradas de la barra lateral (flota + plantilla/finanzas) y los KPIs del motor.
+# Los KPIs van en columnas propias con índice, así filtrar y ordenar cientos de escenarios es una consulta
+# SQL; las entradas van como JSON. La huella (hash) de las entradas permite reutilizar resultados ya
+# calculados: si se pide de nuevo el mismo juego de entradas, el motor no se vuelve a correr. La huella
+# incluye la versión del motor y el contenido de los archivos de datos, así un cambio en cualquiera de
+# ellos deja de reutilizar los resultados anteriores.
+
+RUTA_ALMACEN = Path(__file__).parent / "escenarios_mro.sqlite"
+ARCHIVOS_DATOS = [RUTA_PERFILES_FLOTA, RUTA_DEPARTAMENTOS]
+
+# KPIs con columna (e índice) propia en la tabla, en el orden en que se muestran
+KPIS_ESCENARIO = [
+    "ingreso_total", "utilidad_neta", "ocupacion", "saturacion_avionica",
+    "margen_avionica", "costo_nomina_total", "costo_admin_mensual", "demanda_total_horas", "capacidad_total",
+]
+KPIS_INDEXADOS = ["ingreso_total", "utilidad_neta", "ocupacion", "saturacion_avionica"]
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS escenarios (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE,
+    creado TEXT NOT NULL,
+    huella TEXT NOT NULL,
+    flota TEXT NOT NULL,
+    entradas TEXT NOT NULL,
+    {", ".join(f"{kpi} REAL" for kpi in KPIS_ESCENARIO)}
+);
+CREATE INDEX IF NOT EXISTS idx_escenarios_huella ON escenarios (huella);
+{"".join(f"CREATE INDEX IF NOT EXISTS idx_escenarios_{kpi} ON escenarios ({kpi});" for kpi in KPIS_INDEXADOS)}
+CREATE TABLE IF NOT EXISTS resultados (
+    huella TEXT PRIMARY KEY,
+    resultado TEXT NOT NULL
+);
+"""
+
+
+def normalizar_entradas(cantidades, entradas):
+    """
+    Forma canónica de un juego de entradas: flota como {clave: cantidad} (sin ceros, ordenada) y todas las
+    entradas de ENTRADAS_DEFECTO como float (las que falten toman su valor por defecto).
+    """
+    registro = cargar_registro_flota()
+    vector = vector_cantidades(cantidades, registro)
+    flota = {str(clave): float(qty) for clave, qty in zip(registro["claves"], vector) if qty != 0}
+    entradas = {nombre: float(entradas.get(nombre, defecto)) for nombre, defecto in ENTRADAS_DEFECTO.items()}
+    return flota, entradas
+
+
+def huella_datos(archivos=None):
+    """
+    SHA-256 del contenido de los archivos de datos del motor (registro de flota y departamentos).
+    """
+    digesto = hashlib.sha256()
+    for ruta in ARCHIVOS_DATOS if archivos is None else archivos:
+        digesto.update(Path(ruta).read_bytes())
+    return digesto.hexdigest()
+
+
+def huella_entradas(flota, entradas):
+    """
+    SHA-256 del JSON canónico de las entradas normalizadas, la versión del motor y la huella de los datos.
+    """
+    texto = json.dumps({"flota": flota, "entradas": entradas, "version_motor": VERSION_MOTOR, "datos": huella_datos()},
+                       sort_keys=True)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class AlmacenEscenarios:
+    """
+    Escenarios con nombre y caché de resultados del motor en un archivo SQLite.
+    La conexión se comparte entre sesiones (st.cache_resource): todo acceso a ella pasa por un lock.
+    """
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = Path(ruta)
+        self._bloqueo = threading.RLock()
+        self._conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+        with self._bloqueo:
+            self._conexion.executescript(ESQUEMA)
+
+    def cerrar(self):
+        with self._bloqueo:
+            self._conexion.close()
+
+    def evaluar(self, cantidades, entradas):
+        """
+        Resultado del motor para estas entradas: se toma de la caché si la huella ya existe,
+        si no se calcula con evaluar_mro y se guarda. Devuelve (resultado, huella, reutilizado).
+        """
+        flota, entradas = normalizar_entradas(cantidades, entradas)
+        huella = huella_entradas(flota, entradas)
+        with self._bloqueo:
+            fila = self._conexion.execute("SELECT resultado FROM resultados WHERE huella = ?", (huella,)).fetchone()
+        if fila is not None:
+            return json.loads(fila[0]), huella, True
+
+        resultado = evaluar_mro(vector_cantidades(flota), **entradas)
+        with self._bloqueo, self._conexion:
+            self._conexion.execute("INSERT OR REPLACE INTO resultados (huella, resultado) VALUES (?, ?)",
+                                   (huella, json.dumps(resultado)))
+        return resultado, huella, False
+
+    def guardar(self, nombre, cantidades, entradas, sobrescribir=False):
+        """
+        Guarda (o reemplaza, con sobrescribir=True) un escenario con nombre. Devuelve (resultado, reutilizado).
+        """
+        resultado, huella, reutilizado = self.evaluar(cantidades, entradas)
+        flota, entradas = normalizar_entradas(cantidades, entradas)
+        columnas = ["nombre", "creado", "huella", "flota", "entradas", *KPIS_ESCENARIO]
+        valores = [nombre, datetime.now().isoformat(timespec="seconds"), huella, json.dumps(flota), json.dumps(entradas),
+                   *(resultado[kpi] for kpi in KPIS_ESCENARIO)]
+        verbo = "INSERT OR REPLACE" if sobrescribir else "INSERT"
+        with self._bloqueo, self._conexion:
+            self._conexion.execute(f"{verbo} INTO escenarios ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})", valores)
+        return resultado, reutilizado
+
+    def eliminar(self, nombre):
+        with self._bloqueo, self._conexion:
+            self._conexion.execute("DELETE FROM escenarios WHERE nombre = ?", (nombre,))
+
+    def buscar_por_huella(self, cantidades, entradas):
+        """
+        Nombres de los escenarios guardados con exactamente estas entradas.
+        """
+        huella = huella_entradas(*normalizar_entradas(cantidades, entradas))
+        with self._bloqueo:
+            return [f[0] for f in self._conexion.execute("SELECT nombre FROM escenarios WHERE huella = ? ORDER BY nombre", (huella,))]
+
+    def filtrar(self, minimos=None, maximos=None, orden="utilidad_neta", descendente=True, limite=None, incluir_no_finitos=True):
+        """
+        Escenarios cuyos KPIs caen en los rangos indicados ({kpi: valor}; None = sin límite), ordenados por un KPI.
+        Un KPI no finito (±inf, o NaN que SQLite guarda como NULL; p. ej. saturación con capacidad de aviónica 0)
+        no se puede comparar con un límite: con incluir_no_finitos=True esas filas pasan el filtro de ese KPI,
+        con False se excluyen. Solo se aceptan nombres de KPIS_ESCENARIO, así la consulta se arma sin riesgo de inyección.
+        """
+        condiciones, parametros = [], []
+        for operador, limites in ((">=", minimos or {}), ("<=", maximos or {})):
+            for kpi, valor in limites.items():
+                if kpi not in KPIS_ESCENARIO:
+                    raise ValueError(f"KPI desconocido: {kpi}")
+                if valor is None:
+                    continue
+                no_finito = f"{kpi} IS NULL OR abs({kpi}) = 9e999"  # 9e999 es +inf en SQLite
+                condiciones.append(f"({kpi} {operador} ? OR {no_finito})" if incluir_no_finitos
+                                   else f"({kpi} {operador} ? AND NOT ({no_finito}))")
+                parametros.append(float(valor))
+        if orden not in KPIS_ESCENARIO + ["nombre", "creado"]:
+            raise ValueError(f"Orden desconocido: {orden}")
+
+        consulta = f"SELECT nombre, creado, {', '.join(KPIS_ESCENARIO)} FROM escenarios"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += f" ORDER BY {orden} {'DESC' if descendente else 'ASC'}"
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros.append(int(limite))
+        with self._bloqueo:
+            return pd.read_sql_query(consulta, self._conexion, params=parametros)
+
+    def cargar(self, nombre):
+        """
+        Entradas y KPIs de un escenario: (flota, entradas, kpis).
+        """
+        with self._bloqueo:
+            fila = self._conexion.execute(f"SELECT flota, entradas, {', '.join(KPIS_ESCENARIO)} FROM escenarios WHERE nombre = ?",
+                                          (nombre,)).fetchone()
+        if fila is None:
+            raise KeyError(f"No existe el escenario '{nombre}'")
+        return json.loads(fila[0]), json.loads(fila[1]), dict(zip(KPIS_ESCENARIO, fila[2:]))
+
+    def diferencias(self, nombre_a, nombre_b, solo_cambios=True):
+        """
+        Tabla lado a lado de dos escenarios (flota, entradas y KPIs) con la diferencia B - A.
+        """
+        flota_a, entradas_a, kpis_a = self.cargar(nombre_a)
+        flota_b, entradas_b, kpis_b = self.cargar(nombre_b)
+        filas = []
+        for grupo, a, b in (("Flota", flota_a, flota_b), ("Entrada", entradas_a, entradas_b), ("KPI", kpis_a, kpis_b)):
+            for clave in [*a, *(c for c in b if c not in a)]:
+                valor_a, valor_b = a.get(clave, 0.0), b.get(clave, 0.0)
+                filas.append({"Grupo": grupo, "Variable": clave, nombre_a: valor_a, nombre_b: valor_b, "Diferencia": valor_b - valor_a})
+        df = pd.DataFrame(filas, columns=["Grupo", "Variable", nombre_a, nombre_b, "Diferencia"])
+        return df[df["Diferencia"] != 0].reset_index(drop=True) if solo_cambios else df
+
+    def __len__(self):
+        with self._bloqueo:
+            return self._conexion.execute("SELECT COUNT(*) FROM escenarios").fetchone()[0]
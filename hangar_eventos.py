@@ -0,0 +1,205 @@
+import heapq
+import itertools
+from collections import deque
+
+import numpy as np
+
+# ==========================================
+# SIMULACIÓN DE EVENTOS DISCRETOS DEL HANGAR
+# ==========================================
+# Cada inducción ocupa una bahía desde que entra hasta que termina su check; si no hay bahía libre
+# espera en cola (FIFO). Dentro de la bahía, el trabajo de cada departamento espera una cuadrilla libre de
+# ese departamento (también FIFO): las cuadrillas se comparten entre todas las bahías, así que una bahía
+# vacía no retiene capacidad y un departamento saturado alarga el check. Unidades de tiempo: días calendario.
+
+DIAS_POR_MES = 365 / 12
+
+LLEGADA, FIN_TAREA, FIN_CHECK = 0, 1, 2
+
+
+def cuadrillas_departamentos(horas_departamento, tecnicos_departamento, horas_tecnico_mes=192, turnos_por_dia=2,
+                             max_tecnicos_por_avion=25, departamentos=None):
+    """
+    Cuadrillas de cada departamento y duración del check de cada tipo de avión sin esperas.
+
+    horas_departamento es (tipos x departamentos). La plantilla de cada departamento se reparte entre sus
+    turnos y, en cada turno, en cuadrillas de hasta max_tecnicos_por_avion (acceso físico al avión): una
+    cuadrilla atiende un avión a la vez durante todos los turnos del día. Cada técnico aporta
+    horas_tecnico_mes (ordinarias + extras, como en calcular_nomina_compleja). Los departamentos trabajan
+    en paralelo, así que sin esperas el check dura lo que tarde el departamento más lento.
+
+    Lanza ValueError si un departamento con horas asignadas no tiene técnicos (el check nunca terminaría).
+    Devuelve cuadrillas (departamentos,), horas-hombre por día de cada cuadrilla y duracion_dias (tipos,).
+    """
+    tecnicos_departamento = np.asarray(tecnicos_departamento, dtype=float)
+    horas_departamento = np.asarray(horas_departamento, dtype=float)
+    sin_plantilla = (tecnicos_departamento <= 0) & (horas_departamento > 0).any(axis=0)
+    if sin_plantilla.any():
+        nombres = np.flatnonzero(sin_plantilla) if departamentos is None else np.asarray(departamentos)[sin_plantilla]
+        raise ValueError(f"Departamentos con horas de check y sin técnicos: {nombres.tolist()}")
+
+    cuadrillas = np.ceil(np.maximum(tecnicos_departamento, 0) / turnos_por_dia / max_tecnicos_por_avion).astype(int)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        horas_dia = np.where(cuadrillas > 0, tecnicos_departamento * horas_tecnico_mes / DIAS_POR_MES / cuadrillas, 0.0)
+        dias_departamento = np.where(horas_departamento > 0, horas_departamento / horas_dia, 0.0)
+    return {
+        "cuadrillas": cuadrillas,
+        "horas_dia_cuadrilla": horas_dia,
+        "duracion_dias": dias_departamento.max(axis=1),
+    }
+
+
+def _replica_hangar(llegadas, trabajo, retrasos, n_bahias, cuadrillas, horas_dia_cuadrilla):
+    """
+    Una réplica con cola de eventos en heap: llegadas, fines de tarea de cada departamento y fines de check,
+    hasta vaciar el hangar. trabajo es (inducciones x departamentos) en horas; retrasos son los días que el
+    avión sigue en la bahía tras el trabajo (espera de piezas, sin ocupar cuadrillas).
+    Devuelve los instantes de inicio y fin de cada inducción y de cada tarea (inducciones x departamentos).
+    """
+    n, n_deptos = trabajo.shape
+    inicio = np.full(n, np.nan)
+    fin = np.full(n, np.nan)
+    inicio_tarea = np.full((n, n_deptos), np.nan)
+    fin_tarea = np.full((n, n_deptos), np.nan)
+    secuencia = itertools.count()
+    eventos = [(t, next(secuencia), LLEGADA, i, -1) for i, t in enumerate(llegadas.tolist())]
+    heapq.heapify(eventos)
+
+    duracion_tarea = np.where(trabajo > 0, trabajo / np.where(horas_dia_cuadrilla > 0, horas_dia_cuadrilla, np.inf), 0.0).tolist()
+    tareas = [np.flatnonzero(fila).tolist() for fila in trabajo > 0]
+    retrasos = retrasos.tolist()
+    pendientes = [0] * n
+
+    bahias_libres = n_bahias
+    cola_bahias = deque()
+    cuadrillas_libres = [int(c) for c in cuadrillas]
+    colas_depto = [deque() for _ in range(n_deptos)]
+
+    def asignar(t, i, d):
+        inicio_tarea[i, d] = t
+        fin_tarea[i, d] = t + duracion_tarea[i][d]
+        heapq.heappush(eventos, (fin_tarea[i, d], next(secuencia), FIN_TAREA, i, d))
+
+    def entrar(t, i):
+        inicio[i] = t
+        pendientes[i] = len(tareas[i])
+        if not tareas[i]:
+            heapq.heappush(eventos, (t + retrasos[i], next(secuencia), FIN_CHECK, i, -1))
+        for d in tareas[i]:
+            if cuadrillas_libres[d] > 0:
+                cuadrillas_libres[d] -= 1
+                asignar(t, i, d)
+            else:
+                colas_depto[d].append(i)
+
+    while eventos:
+        t, _, tipo_evento, i, d = heapq.heappop(eventos)
+        if tipo_evento == LLEGADA:
+            if bahias_libres == 0:
+                cola_bahias.append(i)
+                continue
+            bahias_libres -= 1
+            entrar(t, i)
+        elif tipo_evento == FIN_TAREA:
+            pendientes[i] -= 1
+            if pendientes[i] == 0:
+                heapq.heappush(eventos, (t + retrasos[i], next(secuencia), FIN_CHECK, i, -1))
+            if colas_depto[d]:
+                asignar(t, colas_depto[d].popleft(), d)
+            else:
+                cuadrillas_libres[d] += 1
+        else:
+            fin[i] = t
+            if cola_bahias:
+                entrar(t, cola_bahias.popleft())
+            else:
+                bahias_libres += 1
+
+    return inicio, fin, inicio_tarea, fin_tarea
+
+
+def simular_hangar(tasa_inducciones, horas_departamento, cuadrillas, horas_dia_cuadrilla, n_bahias, anios=5,
+                   n_replicas=100, cv_duracion=0.20, prob_escasez=0.30, retraso_escasez_dias=5.0, semilla=None):
+    """
+    Simula las inducciones de varios años en el hangar, repetido n_replicas veces.
+
+    - tasa_inducciones: inducciones por mes de cada tipo de avión (proceso de Poisson).
+    - horas_departamento (tipos x departamentos): trabajo de cada check, con un factor lognormal de media 1
+      y variación cv_duracion por avión; cada departamento lo ejecuta con una de sus cuadrillas
+      (ver cuadrillas_departamentos) y espera en cola si están todas ocupadas.
+    - Con probabilidad prob_escasez el avión queda además un retraso exponencial en la bahía por falta
+      de piezas, sin ocupar cuadrillas.
+
+    La simulación corre hasta vaciar el hangar; las métricas se miden sobre el horizonte.
+    Devuelve tiempos de permanencia (TAT), utilización de bahías y de cuadrillas por departamento, espera
+    media por cuadrilla de cada departamento y backlog mensual por réplica.
+    """
+    rng = np.random.default_rng(semilla)
+    tasa_inducciones = np.asarray(tasa_inducciones, dtype=float)
+    horas_departamento = np.asarray(horas_departamento, dtype=float)
+    cuadrillas = np.asarray(cuadrillas, dtype=int)
+    horas_dia_cuadrilla = np.asarray(horas_dia_cuadrilla, dtype=float)
+    sin_cuadrilla = (cuadrillas <= 0) & (horas_departamento[tasa_inducciones > 0] > 0).any(axis=0)
+    if sin_cuadrilla.any():
+        raise ValueError(f"Departamentos con trabajo y sin cuadrillas: {np.flatnonzero(sin_cuadrilla).tolist()}")
+
+    n_deptos = horas_departamento.shape[1]
+    horizonte = anios * 365.0
+    meses = int(round(anios * 12))
+    cortes_mensuales = np.arange(1, meses + 1) * DIAS_POR_MES
+    sigma = np.sqrt(np.log1p(cv_duracion ** 2))
+
+    tat, tipos_tat = [], []
+    utilizacion = np.zeros(n_replicas)
+    utilizacion_deptos = np.zeros((n_replicas, n_deptos))
+    espera_deptos = np.full((n_replicas, n_deptos), np.nan)
+    inducciones = np.zeros(n_replicas, dtype=int)
+    en_cola = np.zeros((n_replicas, meses))
+    en_hangar = np.zeros((n_replicas, meses))
+
+    for r in range(n_replicas):
+        # Llegadas: total Poisson por tipo y tiempos uniformes en el horizonte
+        n_por_tipo = rng.poisson(tasa_inducciones * anios * 12)
+        tipos = np.repeat(np.arange(len(tasa_inducciones)), n_por_tipo)
+        llegadas = rng.uniform(0, horizonte, size=len(tipos))
+        orden = np.argsort(llegadas)
+        llegadas, tipos = llegadas[orden], tipos[orden]
+
+        trabajo = horas_departamento[tipos] * np.exp(sigma * rng.standard_normal(len(tipos)) - sigma ** 2 / 2)[:, None]
+        retrasos = np.where(rng.random(len(tipos)) < prob_escasez, rng.exponential(retraso_escasez_dias, len(tipos)), 0.0)
+
+        inicio, fin, inicio_tarea, fin_tarea = _replica_hangar(llegadas, trabajo, retrasos, n_bahias, cuadrillas,
+                                                               horas_dia_cuadrilla)
+
+        completados = fin <= horizonte
+        tat.append(fin[completados] - llegadas[completados])
+        tipos_tat.append(tipos[completados])
+        ocupado = np.clip(np.minimum(fin, horizonte) - inicio, 0, None)
+        utilizacion[r] = np.nansum(ocupado) / (n_bahias * horizonte)
+        ocupado_tarea = np.clip(np.minimum(fin_tarea, horizonte) - inicio_tarea, 0, None)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilizacion_deptos[r] = np.where(cuadrillas > 0, np.nansum(ocupado_tarea, axis=0) / (cuadrillas * horizonte), 0.0)
+        con_tarea = np.isfinite(inicio_tarea).any(axis=0)
+        espera_deptos[r, con_tarea] = np.nanmean((inicio_tarea - inicio[:, None])[:, con_tarea], axis=0)
+        inducciones[r] = len(llegadas)
+
+        llegados = np.searchsorted(llegadas, cortes_mensuales, side="right")
+        iniciados = np.searchsorted(np.sort(inicio), cortes_mensuales, side="right")
+        terminados = np.searchsorted(np.sort(fin), cortes_mensuales, side="right")
+        en_cola[r] = llegados - iniciados
+        en_hangar[r] = llegados - terminados
+
+    tat = np.concatenate(tat)
+    tipos_tat = np.concatenate(tipos_tat)
+    return {
+        "tat": tat,
+        "tipos_tat": tipos_tat,
+        "tat_medio": float(tat.mean()) if len(tat) else np.nan,
+        "tat_p90": float(np.quantile(tat, 0.90)) if len(tat) else np.nan,
+        "utilizacion_bahias": utilizacion,
+        "utilizacion_departamentos": utilizacion_deptos,
+        "espera_departamentos": espera_deptos,
+        "inducciones": inducciones,
+        "backlog_cola": en_cola,
+        "backlog_hangar": en_hangar,
+    }
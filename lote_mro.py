@@ -0,0 +1,153 @@
+"""
+Corrida por lotes (sin Streamlit) de planes mensuales de hangar.
+
+Lee un CSV con una fila por sitio y mes: columnas de flota con las claves del registro
+(datos/perfiles_flota.csv, p. ej. "B757-C") y columnas de plantilla/finanzas con los nombres de
+ENTRADAS_DEFECTO (las que falten toman el valor por defecto). El archivo se procesa por bloques,
+cada bloque pasa por el motor vectorizado y se escribe de inmediato, así la memoria no crece con el plan.
+
+Las demás columnas se copian a la salida como identificación. Con --id-columnas se declaran y cualquier
+otra columna detiene la corrida; sin declararlas, solo se rechazan las que se parecen a una clave de flota
+o a una entrada (p. ej. "B757C"), para que un error de tipeo no se evalúe como flota en cero.
+
+Uso:
+    python lote_mro.py plan.csv resultados.csv --id-columnas sitio,mes
+    python lote_mro.py plan.csv resultados.parquet --tamano-bloque 200000 --procesos 4
+"""
+import argparse
+import importlib.util
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from motor_mro import ENTRADAS_DEFECTO, evaluar_mro_vectorizado, leer_tabla_escenarios, pronostico_esperado
+
+COLUMNAS_SALIDA = [
+    "demanda_total_horas", "demanda_avionica_horas", "capacidad_total", "capacidad_avionica",
+    "costo_nomina_total", "costo_admin_mensual", "horas_vendidas_total", "ingreso_total", "utilidad_neta",
+    "margen_avionica", "ocupacion", "saturacion_avionica", "demanda_pico_pronostico", "meses_saturados",
+]
+
+
+def evaluar_bloque(bloque, meses=24, columnas_identificacion=None):
+    """
+    Evalúa un bloque del plan: demanda, nómina, costos administrativos, P&L y pronóstico esperado.
+    Devuelve las columnas de identificación del bloque (las que no son entradas) más COLUMNAS_SALIDA.
+    """
+    cantidades, entradas, claves = leer_tabla_escenarios(bloque, columnas_identificacion=columnas_identificacion)
+    res = evaluar_mro_vectorizado(cantidades, **entradas)
+    pronostico = pronostico_esperado(res["demanda_total_horas"], res["capacidad_total"], meses=meses)
+
+    res["demanda_pico_pronostico"] = pronostico["demanda_pico"]
+    res["meses_saturados"] = pronostico["meses_saturados"]
+
+    identificacion = bloque[[c for c in bloque.columns if c not in ENTRADAS_DEFECTO and c not in claves]].reset_index(drop=True)
+    salida = pd.DataFrame({c: np.broadcast_to(res[c], len(bloque)) for c in COLUMNAS_SALIDA})
+    return pd.concat([identificacion, salida], axis=1)
+
+
+def procesar_bloque(bloque, meses=24, formato="csv", columnas_identificacion=None):
+    """
+    Evalúa un bloque y lo deja listo para escribir. Para CSV el texto se genera aquí (en el proceso
+    trabajador), porque formatear el CSV cuesta bastante más que el cálculo vectorizado.
+    """
+    resultado = evaluar_bloque(bloque, meses, columnas_identificacion)
+    if formato == "csv":
+        return list(resultado.columns), resultado.to_csv(header=False, index=False)
+    return resultado
+
+
+class EscritorResultados:
+    """
+    Escribe bloques de resultados a CSV (texto ya formateado por procesar_bloque) o Parquet
+    (un row group por bloque; requiere pyarrow, que se verifica al crear el escritor y no tras el primer bloque).
+    """
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.formato = "parquet" if self.ruta.suffix == ".parquet" else "csv"
+        if self.formato == "parquet" and importlib.util.find_spec("pyarrow") is None:
+            raise ValueError("La salida .parquet requiere pyarrow (pip install pyarrow); usa .csv o instálalo")
+        self._archivo = None
+        self._escritor = None
+
+    def escribir(self, bloque):
+        if self.formato == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if self._escritor is None:
+                self._escritor = pq.ParquetWriter(self.ruta, tabla.schema)
+            self._escritor.write_table(tabla)
+        else:
+            columnas, texto = bloque
+            if self._archivo is None:
+                self._archivo = open(self.ruta, "w", newline="", encoding="utf-8")
+                self._archivo.write(",".join(columnas) + "\n")
+            self._archivo.write(texto)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+def correr_lote(ruta_plan, ruta_salida, tamano_bloque=100_000, procesos=1, meses=24, columnas_identificacion=None):
+    """
+    Procesa el plan por bloques. Con procesos > 1 reparte los bloques en un pool de procesos y mantiene
+    como máximo 2 x procesos bloques en vuelo; los resultados se escriben en el orden del plan.
+    Devuelve la cantidad de filas procesadas.
+    """
+    escritor = EscritorResultados(ruta_salida)
+    filas = 0
+    bloques = pd.read_csv(ruta_plan, chunksize=tamano_bloque)
+    try:
+        if procesos <= 1:
+            for bloque in bloques:
+                escritor.escribir(procesar_bloque(bloque, meses, escritor.formato, columnas_identificacion))
+                filas += len(bloque)
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                en_vuelo = []
+                for bloque in bloques:
+                    en_vuelo.append(pool.submit(procesar_bloque, bloque, meses, escritor.formato, columnas_identificacion))
+                    filas += len(bloque)
+                    if len(en_vuelo) >= 2 * procesos:
+                        escritor.escribir(en_vuelo.pop(0).result())
+                for futuro in en_vuelo:
+                    escritor.escribir(futuro.result())
+    finally:
+        escritor.cerrar()
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corrida por lotes del motor MRO sobre un plan mensual de hangares.")
+    parser.add_argument("plan", help="CSV con una fila por sitio/mes")
+    parser.add_argument("salida", help="Archivo de resultados (.csv o .parquet)")
+    parser.add_argument("--tamano-bloque", type=int, default=100_000, help="Filas por bloque (default: 100000)")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos en paralelo (default: 1)")
+    parser.add_argument("--meses", type=int, default=24, help="Horizonte del pronóstico esperado (default: 24)")
+    parser.add_argument("--id-columnas", default=None,
+                        help="Columnas de identificación separadas por coma (p. ej. sitio,mes); cualquier otra columna es un error")
+    args = parser.parse_args(argv)
+    columnas_identificacion = None if args.id_columnas is None else [c.strip() for c in args.id_columnas.split(",") if c.strip()]
+
+    t_inicio = time.perf_counter()
+    try:
+        filas = correr_lote(args.plan, args.salida, args.tamano_bloque, args.procesos, args.meses, columnas_identificacion)
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+    duracion = time.perf_counter() - t_inicio
+    print(f"{filas:,} filas procesadas en {duracion:,.1f} s ({filas / max(duracion, 1e-9):,.0f} filas/s) -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
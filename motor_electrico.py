@@ -0,0 +1,1427 @@
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# MOTOR DE CÁLCULO ELÉCTRICO (SIN STREAMLIT)
+# ==========================================
+# Funciones normativas (NEC / CSCR) compartidas por los paneles eléctricos. Todas trabajan elemento a
+# elemento sobre arrays de NumPy (o escalares), así dimensionar 100k unidades o variantes de diseño es
+# un solo llamado en lugar de un ciclo de Python por unidad.
+
+# --- TABLAS Y FACTORES ---
+# Breakers comerciales estándar (A); por encima del último se requiere estudio especial
+BREAKERS_COMERCIALES = np.array([15, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 125, 150, 175, 200, 225, 250, 300, 400], dtype=float)
+ESTUDIO_ESPECIAL = np.inf
+TEXTO_ESTUDIO_ESPECIAL = f">{BREAKERS_COMERCIALES[-1]:.0f}A (Req. Estudio Especial)"
+
+# Carga continua: el breaker no debe operar a más del 80% -> capacidad = 125% de la carga
+FACTOR_CARGA_CONTINUA = 1.25
+
+# NEC 220.14 / 220.42 (vivienda): 180 VA por salida; primeros 3000 VA al 100%, resto al 35%
+VA_POR_SALIDA = 180
+VA_ILUMINACION_100 = 3000
+FACTOR_ILUMINACION_RESTO = 0.35
+
+FACTOR_MOTOR_MAYOR = 1.25  # NEC 430.24
+
+
+# --- A. PROTECCIONES ---
+
+def seleccionar_breaker_comercial(amperios_requeridos, factor_continuo=FACTOR_CARGA_CONTINUA):
+    """
+    Breaker comercial inmediatamente superior a amperios x factor_continuo, con una búsqueda binaria
+    (searchsorted) sobre BREAKERS_COMERCIALES. Devuelve np.inf (ESTUDIO_ESPECIAL) donde no alcanza el mayor.
+    """
+    capacidad_objetivo = np.asarray(amperios_requeridos, dtype=float) * factor_continuo
+    indice = np.searchsorted(BREAKERS_COMERCIALES, capacidad_objetivo, side="left")
+    breaker = np.append(BREAKERS_COMERCIALES, ESTUDIO_ESPECIAL)[indice]
+    return breaker if breaker.ndim else float(breaker)
+
+
+def formatear_breaker(breaker):
+    """
+    Texto para mostrar un breaker: "125A" o el aviso de estudio especial.
+    """
+    return TEXTO_ESTUDIO_ESPECIAL if np.isinf(breaker) else f"{breaker:.0f}A"
+
+
+# --- B. DEMANDA ---
+
+def calc_demanda_iluminacion(watts_totales):
+    """
+    NEC 220.42: primeros 3000 VA al 100%, resto al 35% (vivienda).
+    """
+    watts_totales = np.asarray(watts_totales, dtype=float)
+    demanda = np.minimum(watts_totales, VA_ILUMINACION_100) + np.maximum(watts_totales - VA_ILUMINACION_100, 0) * FACTOR_ILUMINACION_RESTO
+    return demanda if demanda.ndim else float(demanda)
+
+
+def calc_motor_bomba(hp, voltaje, es_motor_mayor=False, fases=1):
+    """
+    Watts reales y de diseño de un motor: corriente a plena carga de las tablas NEC 430.248/430.250
+    (corriente_plena_motor) y 125% para el motor mayor (NEC 430.24). Los argumentos pueden ser arrays.
+    """
+    amps = corriente_plena_motor(hp, voltaje, fases)
+    watts_reales = amps * np.asarray(voltaje, dtype=float) * np.where(np.asarray(fases) == 3, np.sqrt(3), 1.0)
+    watts_diseno = watts_reales * np.where(es_motor_mayor, FACTOR_MOTOR_MAYOR, 1.0)
+    if watts_reales.ndim == 0:
+        return float(watts_reales), float(watts_diseno)
+    return watts_reales, watts_diseno
+
+
+def dimensionar_unidades(salidas, cocina, otras_cargas, voltaje, factor_cocina=0.8):
+    """
+    Carga instalada, demanda, corriente y breaker de una o muchas unidades de vivienda (método estándar
+    simplificado): iluminación/tomas por NEC 220.42, cocina a factor_cocina y el resto al 100%.
+    otras_cargas es la suma en watts de los demás equipos de la unidad. Devuelve un dict de arrays.
+    """
+    watts_iluminacion = np.asarray(salidas, dtype=float) * VA_POR_SALIDA
+    cocina = np.asarray(cocina, dtype=float)
+    carga_instalada = watts_iluminacion + cocina + otras_cargas
+    demanda = calc_demanda_iluminacion(watts_iluminacion) + cocina * factor_cocina + otras_cargas
+    amperios = demanda / voltaje
+    return {
+        "watts_iluminacion": watts_iluminacion,
+        "carga_instalada": carga_instalada,
+        "demanda": demanda,
+        "amperios": amperios,
+        "breaker": seleccionar_breaker_comercial(amperios),
+    }
+
+
+# --- C. EDIFICIO MULTIFAMILIAR (UNIDAD POR UNIDAD) ---
+# Tabla de unidades: una fila por apartamento con torre, piso, cantidad de salidas y una columna w_<equipo>
+# por cada equipo fijo (watts de placa). La cocina va en w_cocina. La columna area_m2 es opcional.
+RUTA_EDIFICIO_EJEMPLO = Path(__file__).parent / "datos" / "edificio_ejemplo.csv"
+COLUMNAS_EDIFICIO = ["unidad", "torre", "piso", "salidas"]
+
+# NEC 220.84(C): carga calculada de cada unidad, la base a la que se aplica el factor de la Tabla 220.84.
+# (C)(2) cuenta 1500 VA por los 2 ramales de pequeños artefactos y el de lavandería de 210.11(C) (el de
+# baños no entra); (C)(5) toma el mayor entre calefacción y aire acondicionado, no la suma.
+VA_POR_PIE2_220_84 = 3.0
+PIES2_POR_M2 = 10.7639
+RAMALES_220_84 = 3
+EQUIPOS_CLIMA = ["ac", "calefaccion"]
+
+# NEC Tabla 220.84: factor de demanda por cantidad de unidades (3 o más, con cocina eléctrica).
+# Cada factor aplica desde su límite inferior hasta el siguiente.
+UNIDADES_NEC_220_84 = np.array([3, 6, 8, 11, 12, 14, 16, 18, 21, 22, 24, 26, 28, 31, 32, 34, 37, 39, 43, 46, 51, 56, 62])
+FACTORES_NEC_220_84 = np.array([0.45, 0.44, 0.43, 0.42, 0.41, 0.40, 0.39, 0.38, 0.37, 0.36, 0.35, 0.34,
+                                0.33, 0.32, 0.31, 0.30, 0.29, 0.28, 0.27, 0.26, 0.25, 0.24, 0.23])
+
+
+def factor_demanda_multifamiliar(n_unidades):
+    """
+    Factor de la Tabla 220.84 para n_unidades (escalar o array). Con menos de 3 unidades el método
+    opcional no aplica y se devuelve 1.0 (carga calculada completa).
+    """
+    n_unidades = np.asarray(n_unidades)
+    indice = np.searchsorted(UNIDADES_NEC_220_84, n_unidades, side="right") - 1
+    factor = np.where(indice >= 0, FACTORES_NEC_220_84[np.clip(indice, 0, None)], 1.0)
+    return factor if factor.ndim else float(factor)
+
+
+def carga_calculada_220_84(salidas, watts_equipos, equipos, area_m2=None):
+    """
+    Carga calculada (VA) de una o muchas unidades según NEC 220.84(C):
+    (1) 3 VA/pie² de iluminación general y tomas; donde falta el área se estima con salidas x 180 VA,
+    (2) 1500 VA por cada ramal de pequeños artefactos y de lavandería,
+    (3)/(4) la placa de los equipos fijos y motores (toda columna de watts_equipos salvo clima) y
+    (5) el mayor entre calefacción y aire acondicionado (EQUIPOS_CLIMA).
+    watts_equipos es (unidades x equipos) con las columnas en el orden de equipos.
+    """
+    salidas = np.asarray(salidas, dtype=float)
+    watts_equipos = np.atleast_2d(np.asarray(watts_equipos, dtype=float))
+    area_m2 = np.full(salidas.shape, np.nan) if area_m2 is None else np.asarray(area_m2, dtype=float)
+    iluminacion = np.where(np.isfinite(area_m2), area_m2 * PIES2_POR_M2 * VA_POR_PIE2_220_84, salidas * VA_POR_SALIDA)
+    es_clima = np.isin(equipos, EQUIPOS_CLIMA)
+    clima = watts_equipos[:, es_clima].max(axis=1) if es_clima.any() else 0.0
+    return iluminacion + RAMALES_220_84 * VA_RAMAL_OBLIGATORIO + watts_equipos[:, ~es_clima].sum(axis=1) + clima
+
+
+def leer_edificio(tabla):
+    """
+    Valida una tabla de unidades (DataFrame) y la convierte a arrays: datos de ubicación, salidas, área
+    (NaN si no viene) y la matriz unidades x equipos (watts). Las celdas vacías de equipos cuentan como 0 W.
+    """
+    faltantes = [c for c in COLUMNAS_EDIFICIO if c not in tabla.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en la tabla de unidades: {faltantes}")
+    columnas_equipos = [c for c in tabla.columns if c.startswith("w_")]
+    if "w_cocina" not in columnas_equipos:
+        raise ValueError("La tabla de unidades debe incluir la columna w_cocina")
+    return {
+        "unidades": tabla["unidad"].astype(str).to_numpy(),
+        "torres": tabla["torre"].astype(str).to_numpy(),
+        "pisos": tabla["piso"].to_numpy(),
+        "salidas": tabla["salidas"].fillna(0).to_numpy(dtype=float),
+        "area_m2": tabla["area_m2"].to_numpy(dtype=float) if "area_m2" in tabla.columns else np.full(len(tabla), np.nan),
+        "equipos": [c.removeprefix("w_") for c in columnas_equipos],
+        "watts_equipos": np.ascontiguousarray(tabla[columnas_equipos].fillna(0).to_numpy(dtype=float)),
+    }
+
+
+def cargar_edificio(ruta=RUTA_EDIFICIO_EJEMPLO):
+    return leer_edificio(pd.read_csv(ruta))
+
+
+def edificio_sintetico(n_unidades, n_torres=1, unidades_por_piso=4, fraccion_penthouse=0.05, semilla=None):
+    """
+    Proyecto de prueba con n_unidades repartidas en torres y pisos: apartamentos estándar con variación
+    aleatoria de salidas y equipos, y una fracción de penthouses (más salidas, jacuzzi y A/C).
+    Devuelve un DataFrame con el formato de la tabla de unidades.
+    """
+    rng = np.random.default_rng(semilla)
+    torre = np.arange(n_unidades) % n_torres
+    orden_en_torre = np.arange(n_unidades) // n_torres
+    penthouse = rng.random(n_unidades) < fraccion_penthouse
+    return pd.DataFrame({
+        "unidad": [f"T{t + 1}-{o + 1:03d}" for t, o in zip(torre, orden_en_torre)],
+        "torre": [f"Torre {t + 1}" for t in torre],
+        "piso": orden_en_torre // unidades_por_piso + 1,
+        "salidas": np.where(penthouse, 30, rng.integers(12, 19, n_unidades)),
+        "area_m2": np.where(penthouse, 180, rng.integers(60, 111, n_unidades)),
+        "w_cocina": rng.choice([6000, 8000, 9600], n_unidades),
+        "w_lavado": rng.choice([0, 4500, 5600], n_unidades, p=[0.1, 0.6, 0.3]),
+        "w_refri": 600,
+        "w_calentador": rng.choice([3500, 4500, 5500], n_unidades),
+        "w_microondas": np.where(penthouse, 0, 1200),
+        "w_jacuzzi": np.where(penthouse, 3500, 0),
+        "w_ac": np.where(penthouse, 3000, rng.choice([0, 1500], n_unidades, p=[0.7, 0.3])),
+    })
+
+
+def _agrupar(claves, valores):
+    """
+    Suma valores (unidades,) por clave con np.unique + bincount. Devuelve (claves únicas, conteo, sumas).
+    """
+    unicas, inversa = np.unique(claves, return_inverse=True)
+    return unicas, np.bincount(inversa), np.bincount(inversa, weights=valores)
+
+
+def calcular_edificio(edificio, voltaje, cargas_comunes_w=0.0, factor_cocina=0.8):
+    """
+    Acometidas individuales, alimentadores por torre y acometida general de un edificio multifamiliar.
+
+    - Cada unidad: método estándar de dimensionar_unidades (iluminación NEC 220.42, cocina a factor_cocina).
+    - Alimentador de torre y acometida general: NEC 220.84, factor de la tabla según la cantidad de unidades
+      servidas sobre la carga calculada de 220.84(C) de cada unidad (carga_calculada_220_84). Las cargas
+      comunes (ascensor, bombas, pasillos) se suman al 100% a la acometida general.
+    Todo se calcula sobre arrays: un proyecto de 2.000 unidades toma milisegundos.
+    """
+    watts_equipos = edificio["watts_equipos"]
+    cocina = watts_equipos[:, edificio["equipos"].index("cocina")]
+    otras_cargas = watts_equipos.sum(axis=1) - cocina
+    unidades = dimensionar_unidades(edificio["salidas"], cocina, otras_cargas, voltaje, factor_cocina)
+    carga_calculada = carga_calculada_220_84(edificio["salidas"], watts_equipos, edificio["equipos"], edificio["area_m2"])
+
+    torres, unidades_torre, calculada_torre = _agrupar(edificio["torres"], carga_calculada)
+    factor_torre = factor_demanda_multifamiliar(unidades_torre)
+    demanda_torre = calculada_torre * factor_torre
+    amperios_torre = demanda_torre / voltaje
+
+    n_unidades = len(carga_calculada)
+    factor_general = factor_demanda_multifamiliar(n_unidades)
+    demanda_general = carga_calculada.sum() * factor_general + cargas_comunes_w
+    return {
+        "unidades": unidades,
+        "carga_calculada": carga_calculada,
+        "torres": {
+            "torre": torres,
+            "unidades": unidades_torre,
+            "carga_calculada": calculada_torre,
+            "factor": factor_torre,
+            "demanda": demanda_torre,
+            "amperios": amperios_torre,
+            "breaker": seleccionar_breaker_comercial(amperios_torre),
+        },
+        "acometida": {
+            "unidades": n_unidades,
+            "carga_calculada": float(carga_calculada.sum()) + cargas_comunes_w,
+            "factor": factor_general,
+            "demanda": float(demanda_general),
+            "amperios": float(demanda_general / voltaje),
+            "breaker": seleccionar_breaker_comercial(demanda_general / voltaje),
+        },
+    }
+
+
+# --- D. BALANCE DE FASES ---
+# Cada carga se conecta a una opción según sus polos: 1 polo -> una fase y neutro (120V); 2 polos -> un par
+# de fases (208V o 240V entre líneas); 3 polos -> carga trifásica balanceada (solo en 208Y/120V). Las corrientes de línea se suman como fasores (factor de potencia 1)
+# y la corriente de neutro es la suma fasorial de las líneas (ley de corrientes de Kirchhoff).
+VOLTAJE_LINEA_NEUTRO = 120.0
+SISTEMAS_FASES = {
+    # 120/240V monofásico (3 hilos): L1 a 0°, L2 a 180°
+    240: {"fases": ["L1", "L2"], "angulos": [0, 180], "pares": [("L1", "L2")]},
+    # 208Y/120V trifásico: A, B, C desfasadas 120°
+    208: {"fases": ["A", "B", "C"], "angulos": [0, -120, 120], "pares": [("A", "B"), ("B", "C"), ("C", "A")]},
+}
+
+
+def matriz_conexiones(voltaje, monofasico=False):
+    """
+    Opciones de conexión del sistema de voltaje: (nombres, polos de cada opción, fases, matriz compleja
+    opciones x fases con la corriente de línea que aporta 1 VA conectado en esa opción).
+    monofasico=True limita el sistema a sus dos primeras fases (alimentación 120/208V de 3 hilos de una
+    unidad en un edificio 208Y/120V); en 240V no cambia nada.
+    """
+    sistema = SISTEMAS_FASES[voltaje]
+    fases = sistema["fases"][:2] if monofasico else sistema["fases"]
+    pares = sistema["pares"][:1] if monofasico else sistema["pares"]
+    fasores = dict(zip(fases, np.exp(1j * np.deg2rad(sistema["angulos"])) * VOLTAJE_LINEA_NEUTRO))
+    nombres, polos, filas = [], [], []
+    for fase in fases:
+        fila = np.zeros(len(fases), dtype=complex)
+        fila[fases.index(fase)] = fasores[fase] / VOLTAJE_LINEA_NEUTRO ** 2
+        nombres.append(fase), polos.append(1), filas.append(fila)
+    for x, y in pares:
+        v_linea = fasores[x] - fasores[y]
+        corriente = v_linea / abs(v_linea) ** 2
+        fila = np.zeros(len(fases), dtype=complex)
+        fila[fases.index(x)], fila[fases.index(y)] = corriente, -corriente
+        nombres.append(f"{x}-{y}"), polos.append(2), filas.append(fila)
+    if len(fases) == 3:
+        # Trifásica balanceada: 1 VA reparte I = 1 / (√3 · V_linea) en fase con cada tensión de fase
+        v_linea = abs(fasores["A"] - fasores["B"])
+        fila = np.array([fasores[f] / abs(fasores[f]) for f in fases]) / (np.sqrt(3) * v_linea)
+        nombres.append("-".join(fases)), polos.append(3), filas.append(fila)
+    return nombres, np.array(polos), fases, np.array(filas)
+
+
+def _objetivo_balance(corrientes, peso_neutro):
+    """
+    Desbalance de un juego de corrientes de línea (..., fases): máx - mín de las magnitudes más
+    peso_neutro x la corriente de neutro.
+    """
+    magnitudes = np.abs(corrientes)
+    return magnitudes.max(axis=-1) - magnitudes.min(axis=-1) + peso_neutro * np.abs(corrientes.sum(axis=-1))
+
+
+def corrientes_por_fase(cargas_va, conexion, voltaje):
+    """
+    Corriente de cada línea y del neutro (A) para cargas_va conectadas en los índices de opción conexion.
+    """
+    _, _, _, matriz = matriz_conexiones(voltaje)
+    corrientes = (np.asarray(cargas_va, dtype=float)[:, None] * matriz[np.asarray(conexion)]).sum(axis=0)
+    return np.abs(corrientes), float(np.abs(corrientes.sum()))
+
+
+def asignacion_alternada(polos, voltaje):
+    """
+    Asignación de referencia sin optimizar: cada carga rota por las opciones de su cantidad de polos
+    en el orden de la lista (Apto 1 en A-B, Apto 2 en B-C, ...).
+    """
+    _, polos_opcion, _, _ = matriz_conexiones(voltaje)
+    polos = np.asarray(polos)
+    conexion = np.empty(len(polos), dtype=int)
+    for p in np.unique(polos):
+        opciones = np.flatnonzero(polos_opcion == p)
+        if not len(opciones):
+            raise ValueError(f"El sistema de {voltaje}V no admite cargas de {p} polos")
+        seleccion = np.flatnonzero(polos == p)
+        conexion[seleccion] = opciones[np.arange(len(seleccion)) % len(opciones)]
+    return conexion
+
+
+def balancear_fases(cargas_va, polos, voltaje, busqueda_local=True, peso_neutro=1.0, max_iteraciones=200,
+                    max_candidatos_intercambio=256):
+    """
+    Asigna cada carga (unidad o circuito común) a una fase o par de fases minimizando el desbalance de
+    corrientes de línea y la corriente de neutro.
+
+    1. Voraz LPT: cargas de mayor a menor, cada una a la opción (de sus polos) que deja el menor desbalance.
+    2. Búsqueda local (opcional): en cada iteración se evalúan en bloque todos los movimientos de una carga
+       a otra opción y los intercambios entre dos cargas con los mismos polos, y se aplica el de mayor
+       mejora; termina cuando ninguno mejora o al llegar a max_iteraciones. Con muchas cargas, los
+       intercambios se buscan entre max_candidatos_intercambio cargas repartidas en todo el rango de tamaños
+       (el costo por iteración es cuadrático en los candidatos, no en el total).
+    Devuelve un dict con la conexión (índice y nombre por carga), corrientes de línea, neutro y desbalance.
+    """
+    nombres, polos_opcion, fases, matriz = matriz_conexiones(voltaje)
+    cargas_va = np.asarray(cargas_va, dtype=float)
+    polos = np.asarray(polos)
+    permitido = polos[:, None] == polos_opcion[None, :]  # cargas x opciones
+    if not permitido.any(axis=1).all():
+        raise ValueError(f"El sistema de {voltaje}V no admite cargas de {sorted(set(polos[~permitido.any(axis=1)].tolist()))} polos")
+    n = len(cargas_va)
+
+    conexion = np.empty(n, dtype=int)
+    corrientes = np.zeros(len(fases), dtype=complex)
+    for i in np.argsort(-cargas_va, kind="stable"):
+        candidatas = corrientes + cargas_va[i] * matriz
+        objetivo = np.where(permitido[i], _objetivo_balance(candidatas, peso_neutro), np.inf)
+        conexion[i] = np.argmin(objetivo)
+        corrientes = candidatas[conexion[i]]
+
+    # Candidatos de intercambio: muestra uniforme sobre las cargas ordenadas por tamaño
+    orden = np.argsort(cargas_va, kind="stable")
+    candidatos = orden[np.unique(np.linspace(0, n - 1, min(n, max_candidatos_intercambio)).astype(int))] if n else orden
+
+    iteraciones = 0
+    while busqueda_local and n and iteraciones < max_iteraciones:
+        actual = _objetivo_balance(corrientes, peso_neutro)
+        # Movimientos: carga i de su opción actual a la opción o
+        delta_mov = cargas_va[:, None, None] * (matriz[None, :, :] - matriz[conexion][:, None, :])
+        obj_mov = np.where(permitido, _objetivo_balance(corrientes + delta_mov, peso_neutro), np.inf)
+        mejor_mov = np.unravel_index(np.argmin(obj_mov), obj_mov.shape)
+        # Intercambios: candidato a toma la opción de b y viceversa (mismos polos, opciones distintas)
+        opcion_cand = conexion[candidatos]
+        diferencia = matriz[opcion_cand][None, :, :] - matriz[opcion_cand][:, None, :]  # C[o_b] - C[o_a]
+        delta_int = (cargas_va[candidatos][:, None] - cargas_va[candidatos][None, :])[:, :, None] * diferencia
+        valido = (polos[candidatos][:, None] == polos[candidatos][None, :]) & (opcion_cand[:, None] != opcion_cand[None, :])
+        obj_int = np.where(valido, _objetivo_balance(corrientes + delta_int, peso_neutro), np.inf)
+        mejor_int = np.unravel_index(np.argmin(obj_int), obj_int.shape)
+
+        if min(obj_mov[mejor_mov], obj_int[mejor_int]) >= actual - 1e-9:
+            break
+        if obj_mov[mejor_mov] <= obj_int[mejor_int]:
+            i, opcion = mejor_mov
+            corrientes = corrientes + delta_mov[i, opcion]
+            conexion[i] = opcion
+        else:
+            corrientes = corrientes + delta_int[mejor_int]
+            i, j = candidatos[list(mejor_int)]
+            conexion[i], conexion[j] = conexion[j], conexion[i]
+        iteraciones += 1
+
+    return {
+        "fases": fases,
+        "conexion": conexion,
+        "nombres_conexion": np.array(nombres)[conexion],
+        "corrientes": np.abs(corrientes),
+        "neutro": float(np.abs(corrientes.sum())),
+        "desbalance": float(_objetivo_balance(corrientes, 0.0)),
+        "iteraciones": iteraciones,
+    }
+
+
+# --- E. PERFILES DE CARGA ANUALES (SIMULACIÓN ESTOCÁSTICA) ---
+# Modelos de uso por equipo: una fila por equipo con su tipo ("eventos": encendidos Poisson por día con
+# duración exponencial; "continuo": curva horaria con ruido), la fracción de la potencia de placa que
+# consume al operar, la estacionalidad (amplitud y mes pico), el factor de fin de semana y el peso
+# relativo de cada hora del día en columnas h00..h23. Los equipos sin modelo usan la fila "otros".
+RUTA_PERFILES_EQUIPOS = Path(__file__).parent / "datos" / "perfiles_equipos.csv"
+# Perfiles simulados sin ruta_salida: un archivo propio por corrida en el directorio temporal, así sesiones
+# y procesos simultáneos no se pisan. Quien llama es dueño del archivo; limpiar_perfiles_temporales borra
+# los que quedaron de corridas anteriores.
+PREFIJO_PERFILES_CARGA = "qure_perfiles_"
+ANTIGUEDAD_MAXIMA_PERFILES_H = 24
+EQUIPO_GENERICO = "otros"
+
+
+@lru_cache(maxsize=8)
+def cargar_modelos_equipos(ruta=RUTA_PERFILES_EQUIPOS):
+    """
+    Tabla de modelos de uso indexada por equipo, con los pesos horarios normalizados a máximo 1.
+    El resultado se comparte entre llamados (lru_cache): tratarlo como de solo lectura.
+    """
+    df = pd.read_csv(ruta).set_index("equipo")
+    columnas_hora = [f"h{h:02d}" for h in range(24)]
+    faltantes = sorted(set(columnas_hora) - set(df.columns))
+    if faltantes:
+        raise ValueError(f"Faltan columnas horarias en {Path(ruta).name}: {faltantes}")
+    if EQUIPO_GENERICO not in df.index:
+        raise ValueError(f"{Path(ruta).name} debe incluir la fila '{EQUIPO_GENERICO}'")
+    pesos = df[columnas_hora].to_numpy(dtype=float)
+    df[columnas_hora] = pesos / pesos.max(axis=1, keepdims=True)
+    return df
+
+
+def cargas_para_perfiles(edificio, cargas_comunes=None):
+    """
+    Matriz cargas x equipos (watts de placa) para la simulación: una fila por unidad del edificio, con la
+    iluminación/tomas (salidas x 180 VA) como equipo, más una fila por cada carga común
+    ({nombre: {equipo: watts}}, por ejemplo {"Bomba 1": {"bomba": 1650}}). Devuelve (nombres, equipos, watts).
+    """
+    cargas_comunes = cargas_comunes or {}
+    equipos = ["iluminacion", *edificio["equipos"]]
+    equipos += sorted({e for equipos_carga in cargas_comunes.values() for e in equipos_carga} - set(equipos))
+    watts = np.zeros((len(edificio["unidades"]) + len(cargas_comunes), len(equipos)))
+    watts[:len(edificio["unidades"]), 0] = edificio["salidas"] * VA_POR_SALIDA
+    watts[:len(edificio["unidades"]), 1:1 + len(edificio["equipos"])] = edificio["watts_equipos"]
+    for fila, equipos_carga in enumerate(cargas_comunes.values(), start=len(edificio["unidades"])):
+        for equipo, w in equipos_carga.items():
+            watts[fila, equipos.index(equipo)] = w
+    return np.array([*edificio["unidades"], *cargas_comunes]), equipos, watts
+
+
+def _factor_calendario(modelo, dias_semana, meses):
+    """
+    Factor por día del año: estacionalidad coseno (máximo en mes_pico) y factor de fin de semana.
+    """
+    estacional = 1 + modelo["amplitud_estacional"] * np.cos(2 * np.pi * (meses - modelo["mes_pico"]) / 12)
+    return estacional * np.where(dias_semana >= 5, modelo["factor_fin_semana"], 1.0)
+
+
+def _simular_bloque(watts, equipos, modelos, intervalo_min, dias_semana, meses, rng):
+    """
+    Potencia (W) de un bloque de cargas: array float32 (cargas del bloque x intervalos del año).
+    Eventos: cantidad Poisson por carga y día, hora de inicio según los pesos horarios, duración
+    exponencial; cada evento se suma con un arreglo de diferencias (+P al inicio, -P al final) y una sola
+    suma acumulada por bloque. Continuos: curva horaria x ruido gamma por intervalo.
+    """
+    n_cargas, n_dias = len(watts), len(dias_semana)
+    por_dia = 1440 // intervalo_min
+    n_intervalos = n_dias * por_dia
+    hora_intervalo = (np.arange(por_dia) * intervalo_min) // 60
+    diferencias = np.zeros(n_cargas * (n_intervalos + 1))
+    continuo = np.zeros((n_cargas, n_intervalos), dtype=np.float32)
+
+    for k, equipo in enumerate(equipos):
+        potencia = watts[:, k]
+        if not potencia.any():
+            continue
+        modelo = modelos.loc[equipo if equipo in modelos.index else EQUIPO_GENERICO]
+        pesos_hora = modelo[[f"h{h:02d}" for h in range(24)]].to_numpy(dtype=float)
+        factor_dia = _factor_calendario(modelo, dias_semana, meses)
+        potencia_uso = potencia * modelo["fraccion_potencia"]
+
+        if modelo["tipo"] == "continuo":
+            curva = (factor_dia[:, None] * pesos_hora[hora_intervalo][None, :]).ravel().astype(np.float32)
+            ruido = rng.gamma(8.0, 1 / 8.0, (n_cargas, n_intervalos)).astype(np.float32)
+            continuo += potencia_uso[:, None].astype(np.float32) * curva[None, :] * ruido
+            continue
+
+        activos = np.flatnonzero(potencia)
+        conteos = rng.poisson(modelo["usos_dia"] * factor_dia[None, :], (len(activos), n_dias))
+        carga_ev = np.repeat(np.repeat(activos, n_dias), conteos.ravel())
+        dia_ev = np.repeat(np.tile(np.arange(n_dias), len(activos)), conteos.ravel())
+        minuto_inicio = (rng.choice(24, len(dia_ev), p=pesos_hora / pesos_hora.sum()) * 60
+                         + rng.uniform(0, 60, len(dia_ev)))
+        duracion = rng.exponential(modelo["duracion_min"], len(dia_ev))
+        # Duración en intervalos enteros (mínimo 1) con potencia ajustada para conservar la energía del evento
+        n_int_ev = np.maximum(1, np.rint(duracion / intervalo_min)).astype(int)
+        potencia_ev = potencia_uso[carga_ev] * duracion / (n_int_ev * intervalo_min)
+        inicio = dia_ev * por_dia + (minuto_inicio // intervalo_min).astype(int)
+        fin = np.minimum(inicio + n_int_ev, n_intervalos)
+        base = carga_ev * (n_intervalos + 1)
+        diferencias += np.bincount(base + inicio, weights=potencia_ev, minlength=len(diferencias))
+        diferencias -= np.bincount(base + fin, weights=potencia_ev, minlength=len(diferencias))
+
+    eventos = np.cumsum(diferencias.reshape(n_cargas, n_intervalos + 1), axis=1)[:, :n_intervalos]
+    return continuo + eventos.astype(np.float32)
+
+
+def simular_perfiles_anuales(watts, equipos, intervalo_min=60, breakers=None, voltaje=240, semilla=None,
+                             fecha_inicio="2025-01-01", dias=365, ruta_salida=None, bloque=64,
+                             modelos=None):
+    """
+    Curvas de carga de un año (8760 intervalos horarios o 35040 de 15 minutos) para cada carga (filas de
+    watts: cargas x equipos) y el perfil coincidente del edificio.
+
+    Los perfiles se escriben por bloques de `bloque` cargas en un .npy mapeado a memoria (ruta_salida, o un
+    archivo temporal único por corrida si es None; se lee con np.load(ruta, mmap_mode="r")), así 500 unidades
+    x 35040 intervalos no necesitan caber en RAM. El archivo no se borra solo: quien llama lo elimina al
+    terminar o deja que limpiar_perfiles_temporales lo borre cuando envejezca.
+    En memoria solo queda el total del edificio y las estadísticas por carga:
+    - pico coincidente (máximo del total) y su intervalo, suma de picos individuales y factor de coincidencia;
+    - probabilidad de excedencia por carga: fracción de intervalos con corriente (W / voltaje) sobre el breaker
+      y sobre el 80% del breaker (límite de carga continua). breakers: array por carga (np.inf = sin breaker).
+    """
+    if 1440 % intervalo_min:
+        raise ValueError("intervalo_min debe dividir exactamente un día (por ejemplo 60 o 15)")
+    modelos = cargar_modelos_equipos() if modelos is None else modelos
+    watts = np.asarray(watts, dtype=float)
+    n_cargas = len(watts)
+    fechas = pd.date_range(fecha_inicio, periods=dias, freq="D")
+    dias_semana, meses = fechas.dayofweek.to_numpy(), fechas.month.to_numpy()
+    n_intervalos = dias * (1440 // intervalo_min)
+    breakers = np.full(n_cargas, np.inf) if breakers is None else np.asarray(breakers, dtype=float)
+
+    if ruta_salida is None:
+        with tempfile.NamedTemporaryFile(prefix=PREFIJO_PERFILES_CARGA, suffix=".npy", delete=False) as archivo:
+            ruta_salida = archivo.name
+    perfiles = np.lib.format.open_memmap(ruta_salida, mode="w+", dtype=np.float32, shape=(n_cargas, n_intervalos))
+    total = np.zeros(n_intervalos)
+    picos = np.zeros(n_cargas)
+    excedencia = np.zeros(n_cargas)
+    excedencia_80 = np.zeros(n_cargas)
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(semilla).spawn(-(-n_cargas // bloque))]
+    for rng, inicio in zip(rngs, range(0, n_cargas, bloque)):
+        fin = min(inicio + bloque, n_cargas)
+        potencia = _simular_bloque(watts[inicio:fin], equipos, modelos, intervalo_min, dias_semana, meses, rng)
+        perfiles[inicio:fin] = potencia
+        total += potencia.sum(axis=0, dtype=np.float64)
+        picos[inicio:fin] = potencia.max(axis=1)
+        amperios = potencia / voltaje
+        excedencia[inicio:fin] = (amperios > breakers[inicio:fin, None]).mean(axis=1)
+        excedencia_80[inicio:fin] = (amperios > 0.8 * breakers[inicio:fin, None]).mean(axis=1)
+    perfiles.flush()
+    del perfiles
+
+    intervalo_pico = int(np.argmax(total))
+    pico = float(total[intervalo_pico])
+    return {
+        "ruta_perfiles": str(ruta_salida),
+        "forma": (n_cargas, n_intervalos),
+        "intervalo_min": intervalo_min,
+        "inicio": fechas[0],
+        "total": total,
+        "pico_coincidente": pico,
+        "momento_pico": fechas[0] + pd.Timedelta(minutes=intervalo_pico * intervalo_min),
+        "intervalo_pico": intervalo_pico,
+        "picos": picos,
+        "suma_picos": float(picos.sum()),
+        "factor_coincidencia": pico / picos.sum() if picos.sum() else 0.0,
+        "energia_kwh": float(total.sum() * intervalo_min / 60 / 1000),
+        "excedencia_breaker": excedencia,
+        "excedencia_80": excedencia_80,
+    }
+
+
+def limpiar_perfiles_temporales(antiguedad_horas=ANTIGUEDAD_MAXIMA_PERFILES_H, directorio=None):
+    """
+    Borra los perfiles temporales de simular_perfiles_anuales con más de antiguedad_horas. Devuelve cuántos borró.
+    """
+    limite = time.time() - antiguedad_horas * 3600
+    borrados = 0
+    for ruta in Path(directorio or tempfile.gettempdir()).glob(f"{PREFIJO_PERFILES_CARGA}*.npy"):
+        try:
+            if ruta.stat().st_mtime < limite:
+                ruta.unlink()
+                borrados += 1
+        except OSError:
+            pass  # otro proceso lo borró o lo tiene abierto
+    return borrados
+
+
+# --- F. CONDUCTORES Y CAÍDA DE TENSIÓN ---
+# NEC Tabla 310.16 (ampacidad a 30°C, 3 conductores portadores en canalización) y Capítulo 9 Tabla 9
+# (resistencia AC y reactancia en ohm/km, tubería de PVC, 75°C). Calibres de menor a mayor en ambos CSV.
+RUTA_AMPACIDAD = Path(__file__).parent / "datos" / "ampacidad_nec_310_16.csv"
+RUTA_IMPEDANCIA = Path(__file__).parent / "datos" / "impedancia_nec_cap9_tabla9.csv"
+TEMPERATURA_BASE_AMPACIDAD = 30.0
+
+# NEC 310.15(C)(1): ajuste por cantidad de conductores portadores de corriente en la misma canalización
+CONDUCTORES_AGRUPAMIENTO = np.array([1, 4, 7, 10, 21, 31, 41])
+FACTORES_AGRUPAMIENTO = np.array([1.0, 0.80, 0.70, 0.50, 0.45, 0.40, 0.35])
+
+# Límite recomendado de caída de tensión por alimentador o ramal (NEC 210.19(A) / 215.2(A), notas informativas)
+CAIDA_TENSION_MAXIMA = 0.03
+# Calibre mínimo para conductores en paralelo (NEC 310.10(G)): 1/0
+CALIBRE_MINIMO_PARALELO = "1/0"
+
+# NEC 240.6(A): capacidades estándar de fusibles e interruptores de tiempo inverso
+CAPACIDADES_ESTANDAR_240_6 = np.array([15, 20, 25, 30, 35, 40, 45, 50, 60, 70, 80, 90, 100, 110, 125, 150, 175, 200,
+                                       225, 250, 300, 350, 400, 450, 500, 600, 700, 800, 1000, 1200, 1600, 2000,
+                                       2500, 3000, 4000, 5000, 6000], dtype=float)
+# NEC 240.4(B): hasta 800A se permite el dispositivo estándar inmediato superior a la ampacidad
+LIMITE_PROTECCION_SUPERIOR = 800
+# NEC 240.4(D): protección máxima de conductores pequeños (material, calibre) -> A
+PROTECCION_MAXIMA_240_4_D = {("cu", "14"): 15, ("cu", "12"): 20, ("cu", "10"): 30, ("al", "12"): 15, ("al", "10"): 25}
+
+
+@lru_cache(maxsize=4)
+def cargar_tablas_conductores(ruta_ampacidad=RUTA_AMPACIDAD, ruta_impedancia=RUTA_IMPEDANCIA):
+    """
+    Tablas de conductores como arrays alineados por calibre (de menor a mayor): ampacidad por material y
+    temperatura de aislamiento {("cu", 75): array}, resistencia por material y reactancia (ohm/km).
+    El resultado se comparte entre llamados (lru_cache): tratarlo como de solo lectura.
+    """
+    ampacidad = pd.read_csv(ruta_ampacidad, dtype={"calibre": str})
+    impedancia = pd.read_csv(ruta_impedancia, dtype={"calibre": str})
+    if ampacidad["calibre"].tolist() != impedancia["calibre"].tolist():
+        raise ValueError("Las tablas de ampacidad e impedancia deben tener los mismos calibres en el mismo orden")
+    return {
+        "calibres": ampacidad["calibre"].to_numpy(dtype=str),
+        "area_mm2": ampacidad["area_mm2"].to_numpy(dtype=float),
+        # Calibres sin dato (aluminio 14 AWG) quedan en 0 A / inf ohm y nunca se eligen
+        "ampacidad": {(material, temp): ampacidad[f"{material}_{temp}"].fillna(0).to_numpy(dtype=float)
+                      for material in ("cu", "al") for temp in (60, 75, 90)},
+        "resistencia": {material: impedancia[f"r_{material}_pvc"].fillna(np.inf).to_numpy(dtype=float) for material in ("cu", "al")},
+        "reactancia": impedancia["xl_pvc"].to_numpy(dtype=float),
+    }
+
+
+def _capacidad_estandar(amperios, redondear_arriba=True):
+    """
+    Capacidad estándar NEC 240.6(A) inmediata superior (o inferior, redondear_arriba=False) a amperios.
+    """
+    amperios = np.asarray(amperios, dtype=float)
+    if redondear_arriba:
+        indice = np.searchsorted(CAPACIDADES_ESTANDAR_240_6, amperios - 1e-9, side="left")
+        return np.append(CAPACIDADES_ESTANDAR_240_6, np.inf)[indice]
+    indice = np.searchsorted(CAPACIDADES_ESTANDAR_240_6, amperios + 1e-9, side="right") - 1
+    return CAPACIDADES_ESTANDAR_240_6[np.clip(indice, 0, None)]
+
+
+def proteccion_maxima_conductor(ampacidad, calibre=None, material="cu"):
+    """
+    Máximo dispositivo de protección permitido para un conductor de la ampacidad dada: la capacidad
+    estándar 240.6(A) inmediata superior hasta 800A (NEC 240.4(B)), la inmediata inferior por encima
+    (240.4(C)) y, si se da el calibre, el tope de conductores pequeños de 240.4(D).
+    """
+    ampacidad = np.asarray(ampacidad, dtype=float)
+    maximo = np.where(ampacidad <= LIMITE_PROTECCION_SUPERIOR, _capacidad_estandar(ampacidad),
+                      _capacidad_estandar(ampacidad, redondear_arriba=False))
+    if calibre is not None:
+        tope = np.array([PROTECCION_MAXIMA_240_4_D.get((material, str(c)), np.inf) for c in np.ravel(calibre)])
+        maximo = np.minimum(maximo, tope.reshape(np.shape(calibre)))
+    return maximo
+
+
+def factor_temperatura(temperatura_ambiente, temperatura_aislamiento=75):
+    """
+    NEC 310.15(B): factor de corrección por temperatura ambiente distinta de 30°C,
+    sqrt((Tc - Ta) / (Tc - 30)); 0 si el ambiente alcanza la temperatura del aislamiento.
+    """
+    margen = np.maximum(temperatura_aislamiento - np.asarray(temperatura_ambiente, dtype=float), 0.0)
+    factor = np.sqrt(margen / (temperatura_aislamiento - TEMPERATURA_BASE_AMPACIDAD))
+    return factor if factor.ndim else float(factor)
+
+
+def factor_agrupamiento(conductores_portadores):
+    """
+    NEC 310.15(C)(1): factor de ajuste por cantidad de conductores portadores (hasta 3 = 100%).
+    """
+    indice = np.searchsorted(CONDUCTORES_AGRUPAMIENTO, conductores_portadores, side="right") - 1
+    factor = FACTORES_AGRUPAMIENTO[np.clip(indice, 0, None)]
+    return factor if np.ndim(factor) else float(factor)
+
+
+def dimensionar_conductores(amperios, longitud_m, voltaje, fases=1, breakers=None, material="cu",
+                            temperatura_aislamiento=75, temperatura_terminal=75, temperatura_ambiente=30.0,
+                            conductores_portadores=3, factor_potencia=0.9, caida_maxima=CAIDA_TENSION_MAXIMA,
+                            factor_continuo=FACTOR_CARGA_CONTINUA, max_paralelo=4):
+    """
+    Conductor mínimo de cada alimentador o ramal (todos los argumentos por circuito aceptan arrays).
+
+    Un calibre cumple si:
+    - su ampacidad corregida (tabla 310.16 x temperatura x agrupamiento, sin pasar la columna de la
+      temperatura de terminales, NEC 110.14(C)) alcanza amperios x factor_continuo;
+    - queda protegido por el breaker: breaker <= proteccion_maxima_conductor (240.6(A) inmediato superior
+      hasta 800A por 240.4(B) y topes de 240.4(D) para 14-10 AWG); breakers=None o np.inf omiten esta condición;
+    - la caída de tensión con la carga real no pasa caida_maxima: 2·I·L·Zef (monofásico) o √3·I·L·Zef
+      (trifásico), con Zef = R·fp + X·sen(θ) del Capítulo 9 Tabla 9.
+    También se consideran juegos en paralelo (2..max_paralelo, desde 1/0, cada juego en su propia
+    canalización) y se elige la combinación de menor sección total. La búsqueda es una sola
+    comparación circuitos x juegos x calibres.
+    Devuelve un dict de arrays; indice = -1 donde no hay solución dentro de la tabla.
+    """
+    tablas = cargar_tablas_conductores()
+    calibres = tablas["calibres"]
+    amperios, longitud_m, voltaje, fases = np.broadcast_arrays(
+        np.asarray(amperios, dtype=float), np.asarray(longitud_m, dtype=float),
+        np.asarray(voltaje, dtype=float), np.asarray(fases))
+    breakers = np.full(amperios.shape, np.inf) if breakers is None else np.broadcast_to(np.asarray(breakers, dtype=float), amperios.shape)
+
+    ampacidad_base = np.minimum(tablas["ampacidad"][(material, temperatura_aislamiento)],
+                                tablas["ampacidad"][(material, temperatura_terminal)])
+    correccion = factor_temperatura(temperatura_ambiente, temperatura_aislamiento) * factor_agrupamiento(conductores_portadores)
+    juegos = np.arange(1, max_paralelo + 1)
+    permitido = (juegos[:, None] == 1) | (np.arange(len(calibres))[None, :] >= np.flatnonzero(calibres == CALIBRE_MINIMO_PARALELO)[0])
+    # Ampacidad total por (juegos, calibre) con la corrección de cada circuito: circuitos x juegos x calibres
+    ampacidad = np.asarray(correccion, dtype=float).reshape(-1, 1, 1) * juegos[None, :, None] * ampacidad_base[None, None, :]
+    ampacidad = np.broadcast_to(ampacidad, (amperios.size, len(juegos), len(calibres)))
+
+    sen_fp = np.sqrt(1 - factor_potencia ** 2)
+    z_efectiva = (tablas["resistencia"][material] * factor_potencia + tablas["reactancia"] * sen_fp) / 1000  # ohm/m
+    multiplicador = np.where(fases.ravel() == 3, np.sqrt(3), 2.0)
+    caida = (multiplicador * amperios.ravel() * longitud_m.ravel() / voltaje.ravel())[:, None, None] * (z_efectiva[None, None, :] / juegos[None, :, None])
+
+    ok_ampacidad = ampacidad >= (amperios.ravel() * factor_continuo)[:, None, None]
+    proteccion = proteccion_maxima_conductor(ampacidad, np.broadcast_to(calibres, ampacidad.shape[-1:]), material)
+    ok_proteccion = np.isinf(breakers.ravel())[:, None, None] | (proteccion >= breakers.ravel()[:, None, None])
+    ok_caida = caida <= caida_maxima
+    cumple = ok_ampacidad & ok_proteccion & ok_caida & permitido[None, :, :]
+
+    # (juegos, calibre) que cumple con la menor sección total de cobre/aluminio (juegos x área)
+    seccion_total = (juegos[:, None] * tablas["area_mm2"][None, :]).ravel()
+    plano = np.where(cumple.reshape(amperios.size, -1), seccion_total[None, :], np.inf)
+    hay = np.isfinite(plano).any(axis=1)
+    posicion = np.argmin(plano, axis=1)
+    juego_idx, indice = np.divmod(posicion, len(calibres))
+    filas = np.arange(amperios.size)
+    # Sin solución: se informa el mayor calibre con el máximo de juegos y qué condición limita
+    juego_idx = np.where(hay, juego_idx, len(juegos) - 1)
+    indice_tabla = np.where(hay, indice, len(calibres) - 1)
+    limitante = np.where(hay, "", np.where(~ok_ampacidad[filas, juego_idx, indice_tabla] | ~ok_proteccion[filas, juego_idx, indice_tabla],
+                                           "ampacidad", "caída de tensión"))
+    forma = amperios.shape
+    return {
+        "indice": np.where(hay, indice, -1).reshape(forma),
+        "calibre": np.where(hay, calibres[indice_tabla], "Req. Estudio Especial").reshape(forma),
+        "conductores_paralelo": juegos[juego_idx].reshape(forma),
+        "ampacidad": ampacidad[filas, juego_idx, indice_tabla].reshape(forma),
+        "caida_pct": caida[filas, juego_idx, indice_tabla].reshape(forma) * 100,
+        "cumple": hay.reshape(forma),
+        "limitante": limitante.reshape(forma),
+    }
+
+
+def formatear_conductor(calibre, conductores_paralelo=1, material="cu"):
+    """
+    Texto de un conductor: "2/0 AWG Cu", "350 kcmil Cu" o "2x 500 kcmil Cu".
+    """
+    if calibre.startswith("Req"):
+        return calibre
+    unidad = "kcmil" if calibre.isdigit() and int(calibre) >= 250 else "AWG"
+    prefijo = f"{conductores_paralelo}x " if conductores_paralelo > 1 else ""
+    return f"{prefijo}{calibre} {unidad} {material.capitalize()}"
+
+
+# --- G. RIESGO DE DISPARO DE BREAKERS (MONTE CARLO) ---
+# Curva de disparo termomagnética aproximada: sobrecargas de I/In > 1 disparan tras
+# t = CONSTANTE_TERMICA / ((I/In)^2 - 1) segundos (200% -> 2 min); desde MULTIPLO_MAGNETICO x In, instantáneo.
+CONSTANTE_TERMICA_S = 360.0
+MULTIPLO_MAGNETICO = 10.0
+MINUTOS_ANIO = 525600
+
+
+def tiempo_disparo(multiplo_corriente, constante_termica=CONSTANTE_TERMICA_S, multiplo_magnetico=MULTIPLO_MAGNETICO):
+    """
+    Tiempo (s) hasta el disparo para una corriente de multiplo_corriente x In; np.inf si no hay sobrecarga.
+    """
+    multiplo_corriente = np.asarray(multiplo_corriente, dtype=float)
+    with np.errstate(divide="ignore"):
+        termico = np.where(multiplo_corriente > 1, constante_termica / (multiplo_corriente ** 2 - 1), np.inf)
+    return np.where(multiplo_corriente >= multiplo_magnetico, 0.0, termico)
+
+
+def _muestrear_corriente(watts, equipos, modelos, voltaje, n, rng):
+    """
+    n instantes aleatorios del año para una unidad (watts por equipo): corriente total (A) y duración
+    restante (min) del episodio. Cada equipo de eventos está encendido con la probabilidad de su hora
+    (arranques esperados en la hora x duración media / 60) y, si lo está, le queda una duración
+    exponencial (sin memoria); el episodio de sobrecarga termina cuando se apaga el primero.
+    """
+    dias = rng.integers(0, 365, n)
+    fechas = pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(365), unit="D")
+    dias_semana, meses = fechas.dayofweek.to_numpy()[dias], fechas.month.to_numpy()[dias]
+    horas = rng.integers(0, 24, n)
+    potencia = np.zeros(n)
+    duracion = np.full(n, np.inf)
+    for equipo, w in zip(equipos, watts):
+        if w <= 0:
+            continue
+        modelo = modelos.loc[equipo if equipo in modelos.index else EQUIPO_GENERICO]
+        pesos_hora = modelo[[f"h{h:02d}" for h in range(24)]].to_numpy(dtype=float)
+        factor_dia = _factor_calendario(modelo, dias_semana, meses)
+        potencia_uso = w * modelo["fraccion_potencia"]
+        if modelo["tipo"] == "continuo":
+            potencia += potencia_uso * factor_dia * pesos_hora[horas] * rng.gamma(8.0, 1 / 8.0, n)
+            continue
+        prob_encendido = np.minimum(1.0, modelo["usos_dia"] * factor_dia * pesos_hora[horas] / pesos_hora.sum()
+                                    * modelo["duracion_min"] / 60)
+        encendido = rng.random(n) < prob_encendido
+        potencia += np.where(encendido, potencia_uso, 0.0)
+        duracion = np.where(encendido, np.minimum(duracion, rng.exponential(modelo["duracion_min"], n)), duracion)
+    return potencia / voltaje, duracion
+
+
+def riesgo_disparo(watts, equipos, breakers_candidatos, voltaje, n_muestras=1_000_000, semilla=None, modelos=None,
+                   bloque=250_000, constante_termica=CONSTANTE_TERMICA_S):
+    """
+    Monte Carlo de disparo de breakers para uno o varios tipos de unidad (watts: tipos x equipos, o un solo
+    vector) contra cada breaker candidato, con n_muestras instantes por tipo (en bloques de `bloque`).
+
+    Por tipo y breaker devuelve (arrays tipos x candidatos):
+    - prob_sobrecarga: fracción del tiempo con corriente sobre el breaker;
+    - prob_disparo: fracción del tiempo en un episodio que dura lo suficiente para disparar (curva térmica);
+    - disparos_anuales: frecuencia esperada de disparos, P(estado) / duración media del episodio, estimada con
+      el promedio de 1/duración (los instantes al azar caen en episodios largos con más probabilidad).
+    También entrega percentiles de corriente por tipo (p50, p99, p99.9 y máximo).
+    """
+    modelos = cargar_modelos_equipos() if modelos is None else modelos
+    watts = np.atleast_2d(np.asarray(watts, dtype=float))
+    breakers_candidatos = np.asarray(breakers_candidatos, dtype=float)
+    n_tipos = len(watts)
+    rng = np.random.default_rng(semilla)
+
+    sobrecarga = np.zeros((n_tipos, len(breakers_candidatos)))
+    disparo = np.zeros((n_tipos, len(breakers_candidatos)))
+    tasa = np.zeros((n_tipos, len(breakers_candidatos)))
+    percentiles = np.zeros((n_tipos, 4))
+    for t in range(n_tipos):
+        corrientes = []
+        for inicio in range(0, n_muestras, bloque):
+            m = min(bloque, n_muestras - inicio)
+            corriente, duracion = _muestrear_corriente(watts[t], equipos, modelos, voltaje, m, rng)
+            multiplo = corriente[:, None] / breakers_candidatos[None, :]
+            sobre = multiplo > 1
+            dispara = sobre & (duracion[:, None] * 60 >= tiempo_disparo(multiplo, constante_termica))
+            sobrecarga[t] += sobre.sum(axis=0)
+            disparo[t] += dispara.sum(axis=0)
+            with np.errstate(divide="ignore"):
+                tasa[t] += np.where(dispara, 1 / np.maximum(duracion[:, None], 1e-3), 0.0).sum(axis=0)
+            corrientes.append(corriente.astype(np.float32))
+        percentiles[t] = np.percentile(np.concatenate(corrientes), [50, 99, 99.9, 100])
+    return {
+        "breakers": breakers_candidatos,
+        "prob_sobrecarga": sobrecarga / n_muestras,
+        "prob_disparo": disparo / n_muestras,
+        "disparos_anuales": tasa / n_muestras * MINUTOS_ANIO,
+        "percentiles_corriente": percentiles,
+    }
+
+
+# --- H. MOTORES (NEC 430) ---
+# Corriente a plena carga (FLC) de NEC Tabla 430.248 (monofásicos) y 430.250 (trifásicos de inducción),
+# una fila por potencia con una columna v<voltaje> por cada voltaje nominal de motor.
+RUTA_MOTORES_NEC = Path(__file__).parent / "datos" / "motores_nec_430.csv"
+# Voltaje de sistema -> columna de voltaje nominal del motor en las tablas
+VOLTAJE_NOMINAL_MOTOR = {115: 115, 120: 115, 200: 200, 208: 208, 230: 230, 240: 230, 460: 460, 480: 460, 575: 575, 600: 575}
+
+# NEC Tabla 430.52: protección máxima del circuito ramal de motor como múltiplo de la FLC
+FACTOR_PROTECCION_RAMAL = {
+    "breaker_tiempo_inverso": 2.50,
+    "fusible_dos_elementos": 1.75,
+    "fusible_sin_retardo": 3.00,
+    "breaker_instantaneo": 8.00,
+}
+FACTOR_CONDUCTOR_MOTOR = 1.25  # NEC 430.22
+FACTOR_SOBRECARGA_MOTOR = 1.25  # NEC 430.32(A)(1), factor de servicio >= 1.15
+
+
+@lru_cache(maxsize=4)
+def cargar_tablas_motores(ruta=RUTA_MOTORES_NEC):
+    """
+    Tablas de FLC indexadas por (fases, voltaje nominal): {(1, 230): (hp, amperios)} con solo las
+    potencias que tienen dato para ese voltaje, ordenadas por HP.
+    El resultado se comparte entre llamados (lru_cache): tratarlo como de solo lectura.
+    """
+    df = pd.read_csv(ruta, dtype={"tabla": str, "hp_texto": str})
+    tablas = {}
+    for columna in (c for c in df.columns if c.startswith("v") and c[1:].isdigit()):
+        for fases, sub in df.groupby("fases"):
+            sub = sub[sub[columna].notna()].sort_values("hp")
+            if len(sub):
+                tablas[(int(fases), int(columna[1:]))] = (sub["hp"].to_numpy(dtype=float), sub[columna].to_numpy(dtype=float))
+    return tablas
+
+
+def corriente_plena_motor(hp, voltaje, fases=1):
+    """
+    FLC (A) de NEC 430.248 (fases=1) o 430.250 (fases=3) para motores de hp y voltaje de sistema dados
+    (arrays o escalares). Entre potencias de la tabla se interpola linealmente; fuera del rango se escala
+    en proporción a los HP del extremo más cercano.
+    """
+    tablas = cargar_tablas_motores()
+    hp, voltaje, fases = np.broadcast_arrays(np.asarray(hp, dtype=float), np.asarray(voltaje), np.asarray(fases))
+    voltajes, inversa = np.unique(voltaje, return_inverse=True)
+    nominal = np.array([VOLTAJE_NOMINAL_MOTOR.get(int(v), int(v)) for v in voltajes], dtype=int)[inversa].reshape(hp.shape)
+    amperios = np.full(hp.shape, np.nan)
+    for f, v in set(zip(fases.ravel().tolist(), nominal.ravel().tolist())):
+        if (f, v) not in tablas:
+            raise ValueError(f"No hay tabla NEC 430 para motores de {f} fase(s) a {v}V")
+        hp_tabla, amps_tabla = tablas[(f, v)]
+        sel = (fases == f) & (nominal == v)
+        x = hp[sel]
+        amperios[sel] = np.where(x < hp_tabla[0], x / hp_tabla[0] * amps_tabla[0],
+                                 np.where(x > hp_tabla[-1], x / hp_tabla[-1] * amps_tabla[-1], np.interp(x, hp_tabla, amps_tabla)))
+    return amperios if amperios.ndim else float(amperios)
+
+
+def dimensionar_motores(hp, voltaje, fases=1, grupo=0, tipo_proteccion="breaker_tiempo_inverso", otras_cargas_a=0.0):
+    """
+    Circuitos ramales y alimentadores de grupos de motores, todo en arrays (un motor por elemento).
+
+    Por motor: FLC (430.248/430.250), VA, ampacidad del conductor ramal (125% FLC, 430.22), ajuste de
+    sobrecarga (430.32) y protección del ramal: capacidad estándar inmediata superior a FLC x factor de la
+    Tabla 430.52 (430.52(C)(1) Excepción 1).
+    Por grupo (grupo = etiqueta por motor: panel, torre o edificio): ampacidad del alimentador
+    (430.24: 125% del motor mayor + FLC de los demás + otras_cargas_a por grupo, en el orden de "grupos") y
+    protección máxima del alimentador (430.62(A): mayor protección de ramal + FLC de los demás motores,
+    redondeada a la capacidad estándar inferior). También la carga de diseño en VA con la misma regla.
+    """
+    hp, voltaje, fases, grupo = np.broadcast_arrays(np.asarray(hp, dtype=float), np.asarray(voltaje, dtype=float),
+                                                    np.asarray(fases), np.asarray(grupo))
+    flc = np.atleast_1d(corriente_plena_motor(hp, voltaje, fases))
+    va = flc * voltaje * np.where(fases == 3, np.sqrt(3), 1.0)
+    proteccion_ramal = _capacidad_estandar(flc * FACTOR_PROTECCION_RAMAL[tipo_proteccion])
+
+    grupos, inversa = np.unique(grupo, return_inverse=True)
+    n_grupos = len(grupos)
+    # Motor mayor de cada grupo (por FLC) y ramal con la mayor protección (430.62)
+    orden_flc = np.lexsort((flc, inversa))
+    ultimos = np.searchsorted(inversa[orden_flc], np.arange(n_grupos), side="right") - 1
+    mayor = orden_flc[ultimos]
+    orden_prot = np.lexsort((proteccion_ramal, inversa))
+    mayor_prot = orden_prot[ultimos]
+
+    suma_flc = np.bincount(inversa, weights=flc, minlength=n_grupos)
+    suma_va = np.bincount(inversa, weights=va, minlength=n_grupos)
+    otras_cargas_a = np.broadcast_to(np.asarray(otras_cargas_a, dtype=float), (n_grupos,))
+    amperios_alimentador = suma_flc + (FACTOR_MOTOR_MAYOR - 1) * flc[mayor] + otras_cargas_a
+    limite_proteccion = proteccion_ramal[mayor_prot] + suma_flc - flc[mayor_prot] + otras_cargas_a
+    return {
+        "flc": flc,
+        "va": va,
+        "conductor_ramal_a": flc * FACTOR_CONDUCTOR_MOTOR,
+        "sobrecarga_a": flc * FACTOR_SOBRECARGA_MOTOR,
+        "proteccion_ramal": proteccion_ramal,
+        "grupos": grupos,
+        "motor_mayor": mayor,
+        "amperios_alimentador": amperios_alimentador,
+        "va_alimentador": suma_va + (FACTOR_MOTOR_MAYOR - 1) * va[mayor],
+        "proteccion_alimentador": _capacidad_estandar(limite_proteccion, redondear_arriba=False),
+    }
+
+
+# --- I. CUADROS DE CARGA (CIRCUITOS RAMALES Y CENTROS DE CARGA) ---
+# Circuitos de 120V de 20A para tomas/iluminación cargados hasta el 80% (1920 VA); ramales obligatorios de
+# vivienda NEC 210.11(C): 2 de pequeños artefactos de cocina, 1 de lavandería y 1 de baños, 1500 VA c/u.
+VA_CIRCUITO_GENERAL = VOLTAJE_LINEA_NEUTRO * 20 * 0.8
+VA_RAMAL_OBLIGATORIO = 1500.0
+RAMALES_OBLIGATORIOS = [("Pequeños Artefactos Cocina 1", 20), ("Pequeños Artefactos Cocina 2", 20), ("Lavandería", 20), ("Baños", 20)]
+# Equipos desde este consumo van a 2 polos (voltaje de línea); por debajo, 1 polo a 120V
+VA_MINIMO_DOS_POLOS = 1800.0
+BREAKER_MINIMO_RAMAL = 20.0
+NOMBRES_EQUIPOS = {"cocina": "Cocina", "lavado": "Secadora / Centro de Lavado", "refri": "Refrigeradora",
+                   "calentador": "Calentador de Agua", "microondas": "Microondas", "jacuzzi": "Jacuzzi", "ac": "Aire Acondicionado"}
+# Centros de carga comerciales (espacios) y reserva de espacios libres por tablero
+TAMANOS_CENTRO_CARGA = np.array([4, 6, 8, 12, 16, 20, 24, 30, 32, 40, 42, 54, 60, 72, 84])
+RESERVA_ESPACIOS = 0.2
+
+
+def circuitos_unidades(edificio, voltaje):
+    """
+    Circuitos ramales de todas las unidades del edificio (arrays planos, un elemento por circuito):
+    iluminación/tomas en circuitos de 20A según salidas x 180 VA, los ramales obligatorios de 210.11(C)
+    y un circuito dedicado por equipo fijo (2 polos desde VA_MINIMO_DOS_POLOS, breaker al 125%).
+    """
+    n = len(edificio["unidades"])
+    va_general = edificio["salidas"] * VA_POR_SALIDA
+    n_generales = np.maximum(1, np.ceil(va_general / VA_CIRCUITO_GENERAL)).astype(int)
+    unidad_general = np.repeat(np.arange(n), n_generales)
+    orden_general = np.arange(len(unidad_general)) - np.repeat(np.cumsum(n_generales) - n_generales, n_generales)
+    partes = [{
+        "tablero": unidad_general,
+        "descripcion": np.char.add("Iluminación y Tomas ", (orden_general + 1).astype(str)),
+        "polos": np.ones(len(unidad_general), dtype=int),
+        "va": (va_general / n_generales)[unidad_general],
+        "breaker": np.full(len(unidad_general), 20.0),
+    }]
+    for nombre, breaker in RAMALES_OBLIGATORIOS:
+        partes.append({"tablero": np.arange(n), "descripcion": np.full(n, nombre), "polos": np.ones(n, dtype=int),
+                       "va": np.full(n, VA_RAMAL_OBLIGATORIO), "breaker": np.full(n, float(breaker))})
+    for k, equipo in enumerate(edificio["equipos"]):
+        watts = edificio["watts_equipos"][:, k]
+        con_equipo = np.flatnonzero(watts > 0)
+        w = watts[con_equipo]
+        polos = np.where(w >= VA_MINIMO_DOS_POLOS, 2, 1)
+        amperios = w / np.where(polos == 2, voltaje, VOLTAJE_LINEA_NEUTRO)
+        partes.append({"tablero": con_equipo, "descripcion": np.full(len(con_equipo), NOMBRES_EQUIPOS.get(equipo, equipo.capitalize())),
+                       "polos": polos, "va": w, "breaker": np.maximum(seleccionar_breaker_comercial(amperios), BREAKER_MINIMO_RAMAL)})
+    return {clave: np.concatenate([p[clave] for p in partes]) for clave in partes[0]}
+
+
+def _ubicar_circuitos(polos, fases_opcion, n_fases):
+    """
+    Posiciones (números de espacio) de los circuitos de un tablero, ya ordenados por polos descendente.
+    Espacios impares a la izquierda y pares a la derecha; la fila r está en la fase r mod n_fases. Un
+    circuito de k polos ocupa k filas seguidas de una columna cuyas fases coinciden con su conexión; las
+    filas que se saltan quedan como huecos para circuitos de 1 polo. Devuelve (espacios, filas usadas).
+    """
+    siguiente = [0, 0]
+    huecos = {f: [] for f in range(n_fases)}
+    espacios = []
+    for k, fases in zip(polos, fases_opcion):
+        if k == 1 and huecos[fases[0]]:
+            espacios.append([huecos[fases[0]].pop(0)])
+            continue
+        mejor = None
+        for col in (0, 1):
+            for salto in range(n_fases):
+                fila = siguiente[col] + salto
+                cubiertas = {(fila + j) % n_fases for j in range(k)}
+                if cubiertas == set(fases) and (k > 1 or fila % n_fases == fases[0]):
+                    if mejor is None or fila < mejor[1]:
+                        mejor = (col, fila)
+                    break
+        col, fila = mejor
+        for hueco in range(siguiente[col], fila):
+            huecos[hueco % n_fases].append(2 * hueco + col + 1)
+        espacios.append([2 * (fila + j) + col + 1 for j in range(k)])
+        siguiente[col] = fila + k
+    return espacios, max(siguiente)
+
+
+def generar_cuadros(tablero, descripcion, polos, va, breaker, voltaje, nombres_tableros=None, reserva=RESERVA_ESPACIOS,
+                    peso_neutro=1.0, monofasico=False):
+    """
+    Cuadros de carga de muchos tableros a la vez (arrays planos de circuitos con el índice de su tablero).
+
+    1. Balance de fases: circuitos de mayor a menor VA dentro de cada tablero; en cada ronda se asigna el
+       k-ésimo circuito de todos los tableros juntos a la fase/par (matriz_conexiones) que deja menor
+       desbalance de corrientes en su tablero (LPT vectorizado entre tableros).
+    2. Ubicación en espacios (filas alternadas por fase) y tamaño del centro de carga: el menor de
+       TAMANOS_CENTRO_CARGA con los espacios usados más la reserva.
+    monofasico=True para tableros de unidades (dos fases y neutro, ver matriz_conexiones).
+    Devuelve (cuadro por circuito, resumen por tablero) como DataFrames.
+    """
+    nombres, polos_opcion, fases, matriz = matriz_conexiones(voltaje, monofasico)
+    tablero, polos, va, breaker = (np.asarray(a) for a in (tablero, polos, va, breaker))
+    va = va.astype(float)
+    descripcion = np.asarray(descripcion)
+    n_tableros = int(tablero.max()) + 1 if len(tablero) else 0
+    nombres_tableros = np.asarray(nombres_tableros if nombres_tableros is not None else [f"Tablero {i + 1}" for i in range(n_tableros)])
+
+    orden = np.lexsort((-va, tablero))
+    tablero, descripcion, polos, va, breaker = tablero[orden], descripcion[orden], polos[orden], va[orden], breaker[orden]
+    inicio_tablero = np.searchsorted(tablero, np.arange(n_tableros))
+    rango = np.arange(len(tablero)) - inicio_tablero[tablero]
+    permitido = polos[:, None] == polos_opcion[None, :]
+    if not permitido.any(axis=1).all():
+        raise ValueError(f"El sistema de {voltaje}V no admite circuitos de {sorted(set(polos[~permitido.any(axis=1)].tolist()))} polos")
+
+    corrientes = np.zeros((n_tableros, len(fases)), dtype=complex)
+    conexion = np.empty(len(tablero), dtype=int)
+    for r in range(int(rango.max()) + 1 if len(rango) else 0):
+        sel = np.flatnonzero(rango == r)
+        candidatas = corrientes[tablero[sel]][:, None, :] + va[sel, None, None] * matriz[None, :, :]
+        objetivo = np.where(permitido[sel], _objetivo_balance(candidatas, peso_neutro), np.inf)
+        conexion[sel] = np.argmin(objetivo, axis=1)
+        corrientes[tablero[sel]] = candidatas[np.arange(len(sel)), conexion[sel]]
+
+    # Fases cubiertas por cada opción (índices de fase)
+    fases_de_opcion = [[fases.index(f) for f in nombre.split("-")] for nombre in nombres]
+    espacios = [None] * len(tablero)
+    filas_usadas = np.zeros(n_tableros, dtype=int)
+    for t in range(n_tableros):
+        fin = inicio_tablero[t + 1] if t + 1 < n_tableros else len(tablero)
+        indices = np.arange(inicio_tablero[t], fin)
+        indices = indices[np.argsort(-polos[indices], kind="stable")]
+        ubicados, filas_usadas[t] = _ubicar_circuitos(polos[indices], [fases_de_opcion[c] for c in conexion[indices]], len(fases))
+        for i, e in zip(indices, ubicados):
+            espacios[i] = e
+
+    espacios_usados = 2 * filas_usadas
+    requeridos = np.ceil(espacios_usados * (1 + reserva))
+    indice_tamano = np.searchsorted(TAMANOS_CENTRO_CARGA, requeridos)
+    tamano = np.where(indice_tamano < len(TAMANOS_CENTRO_CARGA), TAMANOS_CENTRO_CARGA[np.minimum(indice_tamano, len(TAMANOS_CENTRO_CARGA) - 1)], 0)
+    magnitudes = np.abs(corrientes)
+
+    cuadro = pd.DataFrame({
+        "Tablero": nombres_tableros[tablero],
+        "Espacios": [",".join(map(str, e)) for e in espacios],
+        "Circuito": descripcion,
+        "Polos": polos,
+        "Breaker (A)": breaker,
+        "Carga (VA)": va,
+        "Conexión": np.array(nombres)[conexion],
+        "_primer_espacio": [e[0] for e in espacios],
+    }).sort_values(["Tablero", "_primer_espacio"], kind="stable").drop(columns="_primer_espacio").reset_index(drop=True)
+    resumen = pd.DataFrame({
+        "Tablero": nombres_tableros,
+        "Circuitos": np.bincount(tablero, minlength=n_tableros),
+        "Espacios Usados": espacios_usados,
+        "Centro de Carga (espacios)": tamano,
+        "Carga (VA)": np.bincount(tablero, weights=va, minlength=n_tableros),
+        **{f"Fase {f} (A)": magnitudes[:, i] for i, f in enumerate(fases)},
+        "Desbalance (A)": magnitudes.max(axis=1) - magnitudes.min(axis=1),
+    })
+    return cuadro, resumen
+
+
+# --- J. HARDWARE DEL BANCO DE MEDIDORES (CATÁLOGO Y CONFIGURACIÓN DE MENOR COSTO) ---
+# Catálogo local con precios: módulos de medidores (posiciones, breaker máximo por posición), breakers QDP
+# para las posiciones, bases de medidor individuales con interruptor y secciones principales del banco.
+RUTA_CATALOGO_HARDWARE = Path(__file__).parent / "datos" / "catalogo_hardware.csv"
+COLUMNAS_CATALOGO = ["tipo", "modelo", "posiciones", "amperios", "polos", "precio"]
+TIPOS_CATALOGO = ["modulo", "breaker", "base", "principal"]
+MAX_DESCONEXIONES_SERVICIO = 6  # NEC 230.71(A): máximo de medios de desconexión por acometida
+
+
+def leer_catalogo_hardware(tabla):
+    """
+    Valida un catálogo (DataFrame) y lo separa por tipo: {tipo: {"modelo", "posiciones", "amperios", "polos", "precio",
+    "aic_ka"}}.
+    """
+    faltantes = [c for c in COLUMNAS_CATALOGO if c not in tabla.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el catálogo de hardware: {faltantes}")
+    desconocidos = sorted(set(tabla["tipo"]) - set(TIPOS_CATALOGO))
+    if desconocidos:
+        raise ValueError(f"Tipos de hardware desconocidos: {desconocidos} (válidos: {TIPOS_CATALOGO})")
+    catalogo = {}
+    for tipo in TIPOS_CATALOGO:
+        sub = tabla[tabla["tipo"] == tipo]
+        catalogo[tipo] = {
+            "modelo": sub["modelo"].astype(str).to_numpy(),
+            "posiciones": sub["posiciones"].fillna(0).to_numpy(dtype=int),
+            "amperios": sub["amperios"].to_numpy(dtype=float),
+            "polos": sub["polos"].to_numpy(dtype=int),
+            "precio": sub["precio"].to_numpy(dtype=float),
+            # Capacidad interruptiva (kA) opcional; sin dato queda NaN
+            "aic_ka": sub["aic_ka"].to_numpy(dtype=float) if "aic_ka" in sub else np.full(len(sub), np.nan),
+        }
+    if not len(catalogo["modulo"]["modelo"]) or not (catalogo["modulo"]["posiciones"] > 0).all():
+        raise ValueError("El catálogo debe incluir módulos de medidores, todos con al menos una posición")
+    return catalogo
+
+
+@lru_cache(maxsize=4)
+def cargar_catalogo_hardware(ruta=RUTA_CATALOGO_HARDWARE):
+    """
+    Catálogo por defecto (datos/catalogo_hardware.csv). Compartido entre llamados: tratarlo como de solo lectura.
+    """
+    return leer_catalogo_hardware(pd.read_csv(ruta))
+
+
+def _mas_barato(compatible, precio):
+    """
+    Precio mínimo y posición del componente más barato a lo largo del primer eje de compatible (inf si ninguno).
+    """
+    precios = np.where(compatible, precio.reshape((-1,) + (1,) * (compatible.ndim - 1)), np.inf)
+    if not len(precio):
+        return precios.min(axis=0, initial=np.inf), np.zeros(compatible.shape[1:], dtype=int)
+    return precios.min(axis=0), precios.argmin(axis=0)
+
+
+def configuracion_hardware(breakers_requeridos, catalogo=None, polos=2, ampacidad_conductor=None, grupo=None,
+                           amperios_principal=None, max_desconexiones=MAX_DESCONEXIONES_SERVICIO, calibre_conductor=None,
+                           material="cu"):
+    """
+    Configuración de menor costo del banco de medidores: cada medidor (unidad o panel común) queda en una
+    posición de módulo con un breaker QDP o en una base individual, con un breaker conforme en ambos casos:
+    capacidad >= breaker requerido, mismos polos y, si se da la ampacidad del conductor, sin superar
+    proteccion_maxima_conductor (240.4(B)/(C), y 240.4(D) si también se da calibre_conductor y material).
+
+    grupo separa bancos independientes (p. ej. uno por torre), cada uno con una sola familia de módulos y su
+    sección principal (la más barata >= amperios_principal del grupo; sin principal si es None). Se evalúan
+    todas las combinaciones familia x cantidad de módulos de todos los grupos a la vez: los medidores se
+    agrupan por tipo de requisito y, para cada familia, los tipos con mayor ahorro frente a una base ocupan
+    primero las posiciones, así que el costo de cada combinación sale de sumas acumuladas por tipo.
+    Cada base individual es un medio de desconexión de la acometida, igual que la principal del banco:
+    por grupo no pueden sumar más de max_desconexiones (NEC 230.71(A)).
+
+    Devuelve por grupo la familia, cantidad de módulos, principal y costo; por medidor si va en módulo, el
+    componente (breaker o base) y su costo; y el costo total por familia de módulos para comparar.
+    """
+    catalogo = cargar_catalogo_hardware() if catalogo is None else catalogo
+    requerido = np.asarray(breakers_requeridos, dtype=float).ravel()
+    n = requerido.size
+    polos = np.broadcast_to(np.asarray(polos, dtype=int), (n,))
+    grupo = np.zeros(n, dtype=int) if grupo is None else np.asarray(grupo, dtype=int)
+    n_grupos = int(grupo.max()) + 1 if n else 1
+    if ampacidad_conductor is None:
+        maximo = np.full(n, np.inf)
+    else:
+        ampacidad = np.broadcast_to(np.asarray(ampacidad_conductor, dtype=float), (n,))
+        maximo = proteccion_maxima_conductor(ampacidad, None if calibre_conductor is None
+                                             else np.broadcast_to(np.asarray(calibre_conductor, dtype=str), (n,)), material)
+    maximo = np.maximum(maximo, requerido)
+
+    # Tipos de requisito (breaker mínimo, máximo, polos) y conteo por grupo
+    tipos, inversa = np.unique(np.column_stack([requerido, maximo, polos]), axis=0, return_inverse=True)
+    inversa = inversa.ravel()
+    n_tipos = len(tipos)
+    conteo = np.bincount(grupo * n_tipos + inversa, minlength=n_grupos * n_tipos).reshape(n_grupos, n_tipos)
+
+    modulos, breakers, bases = catalogo["modulo"], catalogo["breaker"], catalogo["base"]
+    def conforme(componente):
+        return ((componente["amperios"][:, None] >= tipos[None, :, 0]) & (componente["amperios"][:, None] <= tipos[None, :, 1])
+                & (componente["polos"][:, None] == tipos[None, :, 2]))
+
+    # Costo por medidor en cada familia de módulos (breaker más barato que cabe en la posición) y en base
+    cabe = ((breakers["amperios"][None, :] <= modulos["amperios"][:, None])
+            & (breakers["polos"][None, :] <= modulos["polos"][:, None]))  # modulos x breakers
+    costo_modulo, breaker_elegido = _mas_barato(cabe.T[:, :, None] & conforme(breakers)[:, None, :], breakers["precio"])
+    costo_base, base_elegida = _mas_barato(conforme(bases), bases["precio"])
+    sin_opcion = np.isinf(costo_base) & np.isinf(costo_modulo).all(axis=0)
+    conteo[:, sin_opcion] = 0
+
+    # Por familia, tipos ordenados por ahorro descendente; solo los de ahorro positivo usan posiciones
+    with np.errstate(invalid="ignore"):
+        ahorro = costo_base[None, :] - costo_modulo
+    ahorro = np.where(np.isnan(ahorro), -np.inf, ahorro)
+    orden = np.argsort(-ahorro, axis=1, kind="stable")  # modulos x tipos
+    conteo_ord = conteo[:, orden]  # grupos x modulos x tipos
+    positivos = (conteo_ord * (np.take_along_axis(ahorro, orden, axis=1) > 0)[None]).sum(axis=2)
+    acumulado_previo = np.cumsum(conteo_ord, axis=2) - conteo_ord
+
+    posiciones = modulos["posiciones"]
+    max_modulos = int(np.ceil(conteo.sum(axis=1).max() / posiciones.min()))
+    cantidades = np.arange(max_modulos + 1)
+    capacidad = cantidades[None, :] * posiciones[:, None]  # modulos x cantidades
+    # Posiciones ocupadas: las de ahorro positivo que quepan, y al menos las que no caben en bases por 230.71(A)
+    limite_bases = max_desconexiones - (cantidades > 0)
+    minimo_en_modulos = np.maximum(conteo.sum(axis=1)[:, None] - limite_bases[None, :], 0)  # grupos x cantidades
+    en_modulos = np.maximum(np.minimum(capacidad[None], positivos[:, :, None]), minimo_en_modulos[:, None, :])
+    excede = en_modulos > capacidad[None]
+    en_modulos = np.minimum(en_modulos, capacidad[None])  # grupos x modulos x cantidades
+    colocados = np.clip(en_modulos[..., None] - acumulado_previo[:, :, None, :], 0, conteo_ord[:, :, None, :])
+    restantes = conteo_ord[:, :, None, :] - colocados
+    costo_modulo_ord = np.take_along_axis(costo_modulo, orden, axis=1)[None, :, None, :]
+    costo_base_ord = costo_base[orden][None, :, None, :]
+    with np.errstate(invalid="ignore"):
+        costo = (np.where(colocados > 0, colocados * costo_modulo_ord, 0).sum(axis=3)
+                 + np.where(restantes > 0, restantes * costo_base_ord, 0).sum(axis=3)
+                 + cantidades[None, None, :] * modulos["precio"][None, :, None])
+    costo[excede] = np.inf
+
+    principales = catalogo["principal"]
+    if amperios_principal is None:
+        costo_principal, principal_elegido = np.zeros(n_grupos), np.full(n_grupos, -1)
+    else:
+        amperios_principal = np.broadcast_to(np.asarray(amperios_principal, dtype=float), (n_grupos,))
+        costo_principal, principal_elegido = _mas_barato(principales["amperios"][:, None] >= amperios_principal[None, :],
+                                                         principales["precio"])
+    costo = costo + np.where(cantidades > 0, costo_principal[:, None], 0)[:, None, :]
+
+    # Mejor (familia, cantidad) por grupo; un grupo sin combinación finita no es factible con este catálogo
+    plano = costo.reshape(n_grupos, -1)
+    mejor_modulo, mejor_cantidad = np.divmod(plano.argmin(axis=1), len(cantidades))
+    costo_grupo = plano.min(axis=1)
+    colocados_mejor = colocados[np.arange(n_grupos), mejor_modulo, mejor_cantidad]  # grupos x tipos (ordenados)
+    colocados_tipo = np.zeros_like(colocados_mejor)
+    np.put_along_axis(colocados_tipo, orden[mejor_modulo], colocados_mejor, axis=1)
+
+    # Asignación por medidor: dentro de cada (grupo, tipo) los primeros en orden de entrada van al módulo
+    orden_medidores = np.lexsort((inversa, grupo))
+    clave = (grupo * n_tipos + inversa)[orden_medidores]
+    inicio = np.flatnonzero(np.r_[True, clave[1:] != clave[:-1]])
+    rango = np.empty(n, dtype=int)
+    rango[orden_medidores] = np.arange(n) - np.repeat(inicio, np.diff(np.r_[inicio, n]))
+    en_modulo = (rango < colocados_tipo[grupo, inversa]) & ~sin_opcion[inversa]
+    familia = mejor_modulo[grupo]
+    costo_medidor = np.where(en_modulo, costo_modulo[familia, inversa], costo_base[inversa])
+    componente = np.where(en_modulo, np.append(breakers["modelo"], "")[breaker_elegido[familia, inversa]],
+                          np.append(bases["modelo"], "")[np.where(np.isinf(costo_base), -1, base_elegida)[inversa]])
+    tiene_modulos = mejor_cantidad > 0
+    return {
+        "modulo": np.where(tiene_modulos, modulos["modelo"][mejor_modulo], ""),
+        "cantidad_modulos": mejor_cantidad,
+        "posiciones_libres": mejor_cantidad * posiciones[mejor_modulo] - colocados_tipo.sum(axis=1),
+        "principal": np.where(tiene_modulos & (principal_elegido >= 0),
+                              np.append(principales["modelo"], "")[np.where(np.isinf(costo_principal), -1, principal_elegido)], ""),
+        "factible": np.isfinite(costo_grupo),
+        "costo_grupo": costo_grupo,
+        "costo_total": float(costo_grupo.sum()),
+        "en_modulo": en_modulo,
+        "componente": np.where(sin_opcion[inversa], "", componente),
+        "costo_medidor": np.where(sin_opcion[inversa], np.nan, costo_medidor),
+        "sin_opcion": np.flatnonzero(sin_opcion[inversa]),
+        "modelos_modulo": modulos["modelo"],
+        "costo_por_modulo": costo.min(axis=2).sum(axis=0),
+    }
+
+
+# --- K. CORRIENTE DE CORTOCIRCUITO DISPONIBLE (MÉTODO PUNTO A PUNTO) ---
+# Constantes C (pies x A / V) de conductores de 600V, tres conductores individuales en tubo de acero o no
+# magnético. Calibres en el mismo orden que la tabla de ampacidad.
+RUTA_CONSTANTES_C = Path(__file__).parent / "datos" / "constantes_c_punto_a_punto.csv"
+PIES_POR_METRO = 3.28084
+# UL 1561: la impedancia real del transformador puede ser hasta 10% menor que la de placa (peor caso)
+TOLERANCIA_IMPEDANCIA_TRANSFORMADOR = 0.9
+# Contribución de motores en marcha: 4 x FLC en bornes del transformador
+MULTIPLICADOR_APORTE_MOTORES = 4.0
+# Falla línea-neutro en bornes de un transformador monofásico con derivación central: 1.5 x falla línea-línea
+FACTOR_FALLA_LINEA_NEUTRO = 1.5
+# Falla línea-línea de un ramal monofásico tomado de un sistema trifásico: 0.866 x falla trifásica
+FACTOR_FALLA_LINEA_LINEA = np.sqrt(3) / 2
+# Capacidades interruptivas normalizadas (kA simétricos)
+CAPACIDADES_INTERRUPTIVAS_KA = np.array([10, 14, 18, 22, 25, 35, 42, 50, 65, 100, 150, 200], dtype=float)
+
+
+@lru_cache(maxsize=4)
+def cargar_constantes_c(ruta=RUTA_CONSTANTES_C):
+    """
+    Constantes C por (material, canalización) {("cu", "acero"): array}, alineadas con los calibres de
+    cargar_tablas_conductores. Calibres sin dato en la tabla (1000 kcmil) se extrapolan desde el mayor calibre
+    con dato en proporción inversa a la impedancia del Capítulo 9 Tabla 9; aluminio 14 AWG queda en 0.
+    El resultado se comparte entre llamados (lru_cache): tratarlo como de solo lectura.
+    """
+    tabla = pd.read_csv(ruta, dtype={"calibre": str})
+    conductores = cargar_tablas_conductores()
+    if tabla["calibre"].tolist() != conductores["calibres"].tolist():
+        raise ValueError("La tabla de constantes C debe tener los mismos calibres que la tabla de ampacidad")
+    constantes = {}
+    for material in ("cu", "al"):
+        impedancia = np.hypot(conductores["resistencia"][material], conductores["reactancia"])
+        for canalizacion in ("acero", "no_magnetico"):
+            c = tabla[f"{material}_{canalizacion}"].to_numpy(dtype=float)
+            con_dato = np.flatnonzero(np.isfinite(c))
+            ultimo = con_dato[-1]
+            extrapolar = np.arange(len(c)) > ultimo
+            c[extrapolar] = c[ultimo] * impedancia[ultimo] / impedancia[extrapolar]
+            constantes[(material, canalizacion)] = np.nan_to_num(c)
+    return constantes
+
+
+def corriente_cortocircuito(kva_transformador, impedancia_pct, voltaje, padre, longitud_m, calibre, conductores_paralelo=1,
+                            fases=None, fases_transformador=1, material="cu", canalizacion="no_magnetico",
+                            aporte_motores_a=0.0, aic_ka=None):
+    """
+    Corriente de cortocircuito simétrica disponible en cada nodo de la instalación (método punto a punto).
+
+    En bornes del transformador: I = FLA x 100 / (%Z x 0.9) más 4 x FLC de los motores en marcha. Cada nodo
+    se alimenta desde su padre (-1 = bornes del transformador) por longitud_m de calibre con
+    conductores_paralelo juegos; la corriente al inicio del tramo se reduce por M = 1 / (1 + f), con
+    f = 1.732 L I / (C n E_LL) en nodos trifásicos y f = 2 L I / (C n E) en monofásicos, L en pies.
+    Con transformador monofásico (120/240V) se evalúa también la falla línea-neutro (1.5 x en bornes,
+    E = 120V); un ramal monofásico de un sistema trifásico arranca con 0.866 x la falla trifásica.
+    Un calibre fuera de la tabla (p. ej. "Req. Estudio Especial") se toma sin impedancia, del lado seguro.
+
+    Los nodos se procesan por nivel de profundidad: cada nivel es una sola operación vectorizada.
+    Devuelve por nodo la corriente máxima (A), la capacidad interruptiva normalizada mínima (kA) y, si se
+    da aic_ka, si el interruptor del nodo la soporta (los nodos sin dato de AIC no se marcan).
+    """
+    padre = np.asarray(padre, dtype=int)
+    n = padre.size
+    longitud_pies = np.broadcast_to(np.asarray(longitud_m, dtype=float), (n,)) * PIES_POR_METRO
+    juegos = np.broadcast_to(np.asarray(conductores_paralelo, dtype=float), (n,))
+    fases = np.full(n, fases_transformador) if fases is None else np.broadcast_to(np.asarray(fases, dtype=int), (n,))
+    if fases_transformador == 1 and (fases == 3).any():
+        raise ValueError("Un transformador monofásico no puede alimentar nodos trifásicos")
+    posicion_calibre = {c: i for i, c in enumerate(cargar_tablas_conductores()["calibres"])}
+    calibres_unicos, inversa = np.unique(np.broadcast_to(np.asarray(calibre, dtype=str), (n,)), return_inverse=True)
+    indice = np.array([posicion_calibre.get(c, -1) for c in calibres_unicos], dtype=int)[inversa.ravel()]
+    constante = np.where(indice >= 0, cargar_constantes_c()[(material, canalizacion)][indice], np.inf)
+
+    # Profundidad de cada nodo (1 = alimentado desde el transformador): se sube un nivel por iteración
+    profundidad = np.ones(n, dtype=int)
+    ancestro = padre.copy()
+    while (ancestro >= 0).any():
+        if profundidad.max() > n:
+            raise ValueError("La red de nodos tiene ciclos")
+        activo = ancestro >= 0
+        profundidad[activo] += 1
+        ancestro = np.where(activo, padre[np.clip(ancestro, 0, None)], -1)
+
+    fla = kva_transformador * 1000 / (voltaje * (np.sqrt(3) if fases_transformador == 3 else 1))
+    i_bornes = fla * 100 / (impedancia_pct * TOLERANCIA_IMPEDANCIA_TRANSFORMADOR) + MULTIPLICADOR_APORTE_MOTORES * aporte_motores_a
+    # Corrientes en cada nodo: trifásica, línea-línea y línea-neutro (NaN donde no aplica)
+    i_3f, i_ll, i_ln = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    for nivel in range(1, profundidad.max(initial=0) + 1):
+        nodos = np.flatnonzero(profundidad == nivel)
+        p = padre[nodos]
+        en_raiz = p < 0
+        p = np.clip(p, 0, None)
+        if fases_transformador == 3:
+            inicio_3f = np.where(en_raiz, i_bornes, i_3f[p])
+            inicio_ll = np.where(en_raiz | (fases[p] == 3), FACTOR_FALLA_LINEA_LINEA * inicio_3f, i_ll[p])
+            inicio_ln = np.full(len(nodos), np.nan)
+        else:
+            inicio_3f = np.full(len(nodos), np.nan)
+            inicio_ll = np.where(en_raiz, i_bornes, i_ll[p])
+            inicio_ln = np.where(en_raiz, FACTOR_FALLA_LINEA_NEUTRO * i_bornes, i_ln[p])
+        base = longitud_pies[nodos] / (constante[nodos] * juegos[nodos])
+        trifasico = fases[nodos] == 3
+        i_3f[nodos] = np.where(trifasico, inicio_3f / (1 + np.sqrt(3) * base * inicio_3f / voltaje), np.nan)
+        i_ll[nodos] = np.where(trifasico, np.nan, inicio_ll / (1 + 2 * base * inicio_ll / voltaje))
+        i_ln[nodos] = inicio_ln / (1 + 2 * base * inicio_ln / VOLTAJE_LINEA_NEUTRO)
+
+    isc = np.fmax(np.fmax(i_3f, i_ll), i_ln)
+    posicion = np.searchsorted(CAPACIDADES_INTERRUPTIVAS_KA, isc / 1000 - 1e-9, side="left")
+    resultado = {
+        "fla_transformador": float(fla),
+        "isc_bornes": float(i_bornes * (FACTOR_FALLA_LINEA_NEUTRO if fases_transformador == 1 else 1)),
+        "isc_a": isc,
+        "trifasica_a": i_3f,
+        "linea_linea_a": i_ll,
+        "linea_neutro_a": i_ln,
+        "profundidad": profundidad,
+        "aic_minimo_ka": np.append(CAPACIDADES_INTERRUPTIVAS_KA, np.inf)[posicion],
+    }
+    if aic_ka is not None:
+        aic_ka = np.broadcast_to(np.asarray(aic_ka, dtype=float), (n,))
+        resultado["cumple_aic"] = np.isnan(aic_ka) | (isc <= aic_ka * 1000)
+    return resultado
@@ -0,0 +1,898 @@
+import difflib
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# MOTOR DE CÁLCULO MRO (SIN STREAMLIT)
+# ==========================================
+# Secciones A-E del simulador como funciones puras: sin estado global ni efectos secundarios,
+# para que la app pueda memoizarlas por entradas y otros scripts puedan importarlas.
+# Las funciones numéricas aceptan escalares o arrays de NumPy y respetan broadcasting,
+# de modo que un mismo llamado evalúa un punto o una malla completa de configuraciones.
+
+# Versión del modelo de cálculo: subirla cuando un cambio del motor altere resultados, para invalidar
+# los KPIs guardados en cachés persistentes (escenarios_mro).
+VERSION_MOTOR = "1"
+
+# --- PARÁMETROS DE JORNADA ---
+HORAS_ORDINARIAS_MES = 192  # 48 hrs/sem x 4 semanas
+SEMANAS_POR_MES = 4
+HORAS_POR_DOMINGO = 8
+
+# Orden de los ejes del barrido de plantilla
+VARIABLES_PLANTILLA = ["av_tecnicos", "otros_tecnicos", "he_15", "he_20", "salario_tecnico_base"]
+
+# Costo mensual del mando indirecto de aviónica
+COSTO_ENCARGADO_AVIONICA = 2500
+COSTO_JEFATURA_AVIONICA = 3500
+
+
+# Entradas numéricas del simulador y sus valores por defecto (los de la barra lateral)
+ENTRADAS_DEFECTO = {
+    "av_tecnicos": 30, "av_encargados": 5, "av_jefatura": 1, "otros_tecnicos": 470,
+    "salario_gg": 12000, "cant_gtes_area": 3, "salario_gte_area": 6000, "cant_pms": 8, "salario_pm": 4500,
+    "salario_tecnico_base": 14.0, "he_15": 5, "he_20": 1, "tarifa_venta": 65.0, "gastos_fijos": 250000,
+}
+
+
+# --- A. MODELO DE CARGA DE TRABAJO (WORKLOAD) ---
+# Registro de perfiles de flota: una fila por variante y nivel de check (A/C/D), con las horas
+# por check y la participación de cada departamento en columnas pct_<departamento>.
+RUTA_PERFILES_FLOTA = Path(__file__).parent / "datos" / "perfiles_flota.csv"
+
+
+@lru_cache(maxsize=8)
+def cargar_registro_flota(ruta=RUTA_PERFILES_FLOTA):
+    """
+    Carga el registro de perfiles (CSV o JSON orientado a registros) en arrays contiguos de NumPy.
+    El resultado se comparte entre llamados (lru_cache): tratarlo como de solo lectura.
+    """
+    ruta = Path(ruta)
+    df = pd.read_json(ruta, orient="records") if ruta.suffix == ".json" else pd.read_csv(ruta)
+
+    columnas_pct = [c for c in df.columns if c.startswith("pct_")]
+    participacion = np.ascontiguousarray(df[columnas_pct].to_numpy(dtype=float))
+    sumas = participacion.sum(axis=1)
+    if not np.allclose(sumas, 1.0, atol=1e-6):
+        malas = df["clave"][~np.isclose(sumas, 1.0, atol=1e-6)].tolist()
+        raise ValueError(f"Las participaciones por departamento deben sumar 1.0 en: {malas}")
+
+    horas = np.ascontiguousarray(df["hrs"].to_numpy(dtype=float))
+    return {
+        "claves": df["clave"].to_numpy(dtype=str),
+        "modelos": df["modelo"].to_numpy(dtype=str),
+        "categorias": df["categoria"].to_numpy(dtype=str),
+        "checks": df["check"].to_numpy(dtype=str),
+        "departamentos": [c.removeprefix("pct_") for c in columnas_pct],
+        "horas": horas,
+        "participacion": participacion,  # tipos x departamentos
+        "horas_departamento": np.ascontiguousarray(horas[:, None] * participacion),  # tipos x departamentos
+        "indice": {clave: i for i, clave in enumerate(df["clave"])},
+    }
+
+
+def vector_cantidades(cantidades, registro=None):
+    """
+    Convierte una mezcla de flota a vector alineado con el registro.
+    Acepta un dict {clave: cantidad} o un array (tipos,) / (escenarios x tipos), que se devuelve tal cual.
+    """
+    registro = registro or cargar_registro_flota()
+    if isinstance(cantidades, dict):
+        vector = np.zeros(len(registro["claves"]))
+        for clave, qty in cantidades.items():
+            vector[registro["indice"][clave]] = qty
+        return vector
+    return np.asarray(cantidades, dtype=float)
+
+
+def demanda_por_departamento(cantidades, registro=None):
+    """
+    Horas demandadas por departamento: (tipos,) -> (departamentos,) o (escenarios x tipos) -> (escenarios x departamentos),
+    en un solo producto matricial.
+    """
+    registro = registro or cargar_registro_flota()
+    return vector_cantidades(cantidades, registro) @ registro["horas_departamento"]
+
+
+def calcular_demanda(cantidades, registro=None):
+    """
+    Demanda de horas total y de aviónica para una o muchas mezclas de flota.
+    """
+    registro = registro or cargar_registro_flota()
+    vector = vector_cantidades(cantidades, registro)
+    demanda_total_horas = vector @ registro["horas"]
+    demanda_avionica_horas = vector @ registro["horas_departamento"][:, registro["departamentos"].index("avionica")]
+    return demanda_total_horas, demanda_avionica_horas
+
+
+# --- B. CÁLCULO DE CAPACIDAD Y NÓMINA ---
+
+def calcular_nomina_compleja(n_tecnicos, rate_base, h_extra, d_domingo):
+    cap_ord = n_tecnicos * HORAS_ORDINARIAS_MES
+    costo_ord = cap_ord * rate_base
+    cap_15 = n_tecnicos * (h_extra * SEMANAS_POR_MES)
+    costo_15 = cap_15 * (rate_base * 1.5)
+    cap_20 = n_tecnicos * (d_domingo * HORAS_POR_DOMINGO)
+    costo_20 = cap_20 * (rate_base * 2.0)
+    return cap_ord + cap_15 + cap_20, costo_ord + costo_15 + costo_20
+
+
+# --- C. COSTOS GERENCIALES Y ADMINISTRATIVOS ---
+
+def calcular_costos_admin(salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm, av_encargados, av_jefatura):
+    costo_gtes_area_total = cant_gtes_area * salario_gte_area
+    costo_pms_total = cant_pms * salario_pm
+    return {
+        "costo_gtes_area_total": costo_gtes_area_total,
+        "costo_pms_total": costo_pms_total,
+        "costo_admin_mensual": salario_gg + costo_gtes_area_total + costo_pms_total,
+        "costo_indirecto_avionica": (av_encargados * COSTO_ENCARGADO_AVIONICA) + (av_jefatura * COSTO_JEFATURA_AVIONICA),
+    }
+
+
+# --- D. PRODUCCIÓN REAL (VECTORIZADA) ---
+
+def malla_plantilla(av_tecnicos, otros_tecnicos, he_15, he_20, salario_tecnico_base):
+    """
+    Construye la malla de configuraciones a evaluar.
+    Cada argumento puede ser un escalar o un rango 1-D; se devuelve un array disperso por variable
+    (un eje por variable, en el orden de VARIABLES_PLANTILLA) listo para broadcasting.
+    """
+    ejes = [np.atleast_1d(np.asarray(v, dtype=float)) for v in (av_tecnicos, otros_tecnicos, he_15, he_20, salario_tecnico_base)]
+    return np.meshgrid(*ejes, indexing="ij", sparse=True)
+
+
+def evaluar_plantilla(av_tecnicos, otros_tecnicos, he_15, he_20, salario_tecnico_base,
+                      demanda_total_horas, demanda_avionica_horas, tarifa_venta,
+                      costo_admin_mensual, gastos_fijos):
+    """
+    Versión por lotes de las secciones B y D: capacidad, nómina, horas vendidas y utilidad neta.
+    Los argumentos se combinan con broadcasting de NumPy; con la salida de malla_plantilla
+    se obtiene la malla completa en un solo llamado.
+    """
+    av_tecnicos = np.asarray(av_tecnicos, dtype=float)
+    total_tecnicos = av_tecnicos + np.asarray(otros_tecnicos, dtype=float)
+
+    capacidad_total, costo_nomina_total = calcular_nomina_compleja(total_tecnicos, salario_tecnico_base, he_15, he_20)
+    capacidad_avionica, costo_nomina_avionica = calcular_nomina_compleja(av_tecnicos, salario_tecnico_base, he_15, he_20)
+
+    horas_vendidas_total = np.minimum(demanda_total_horas, capacidad_total)
+    horas_vendidas_avionica = np.minimum(demanda_avionica_horas, capacidad_avionica)
+
+    ingreso_total = horas_vendidas_total * tarifa_venta
+    gasto_total_operativo = costo_nomina_total + costo_admin_mensual + gastos_fijos
+
+    return {
+        "capacidad_total": capacidad_total,
+        "costo_nomina_total": costo_nomina_total,
+        "capacidad_avionica": capacidad_avionica,
+        "costo_nomina_avionica": costo_nomina_avionica,
+        "horas_vendidas_total": horas_vendidas_total,
+        "horas_vendidas_avionica": horas_vendidas_avionica,
+        "ingreso_total": ingreso_total,
+        "utilidad_neta": ingreso_total - gasto_total_operativo,
+    }
+
+
+def evaluar_mro_vectorizado(cantidades, av_tecnicos, av_encargados, av_jefatura, otros_tecnicos,
+                            salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm,
+                            salario_tecnico_base, he_15, he_20, tarifa_venta, gastos_fijos):
+    """
+    Secciones A-D para muchos escenarios a la vez: cantidades es (escenarios x tipos) y el resto de
+    entradas son escalares o arrays (escenarios,). Devuelve un dict de arrays por escenario.
+    """
+    demanda_total_horas, demanda_avionica_horas = calcular_demanda(cantidades)
+    return evaluar_desde_demanda(demanda_total_horas, demanda_avionica_horas, av_tecnicos, av_encargados, av_jefatura,
+                                 otros_tecnicos, salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm,
+                                 salario_tecnico_base, he_15, he_20, tarifa_venta, gastos_fijos)
+
+
+def evaluar_desde_demanda(demanda_total_horas, demanda_avionica_horas, av_tecnicos, av_encargados, av_jefatura,
+                          otros_tecnicos, salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm,
+                          salario_tecnico_base, he_15, he_20, tarifa_venta, gastos_fijos):
+    """
+    Secciones B-D a partir de horas ya calculadas (p. ej. después de mover demanda entre sitios).
+    """
+    admin = calcular_costos_admin(salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm, av_encargados, av_jefatura)
+    produccion = evaluar_plantilla(av_tecnicos, otros_tecnicos, he_15, he_20, salario_tecnico_base,
+                                   demanda_total_horas, demanda_avionica_horas, tarifa_venta,
+                                   admin["costo_admin_mensual"], gastos_fijos)
+
+    ingreso_avionica = produccion["horas_vendidas_avionica"] * tarifa_venta
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ocupacion = produccion["horas_vendidas_total"] / produccion["capacidad_total"]
+        saturacion_avionica = demanda_avionica_horas / produccion["capacidad_avionica"]
+    return {
+        "demanda_total_horas": demanda_total_horas,
+        "demanda_avionica_horas": demanda_avionica_horas,
+        **admin,
+        **produccion,
+        "ingreso_avionica": ingreso_avionica,
+        "margen_avionica": ingreso_avionica - produccion["costo_nomina_avionica"] - admin["costo_indirecto_avionica"],
+        "ocupacion": ocupacion,
+        "saturacion_avionica": saturacion_avionica,
+    }
+
+
+def evaluar_mro(cantidades, av_tecnicos, av_encargados, av_jefatura, otros_tecnicos,
+                salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm,
+                salario_tecnico_base, he_15, he_20, tarifa_venta, gastos_fijos):
+    """
+    Secciones A-D completas para un escenario: demanda, capacidad y nómina, costos administrativos y P&L.
+    """
+    resultado = evaluar_mro_vectorizado(cantidades, av_tecnicos, av_encargados, av_jefatura, otros_tecnicos,
+                                        salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm,
+                                        salario_tecnico_base, he_15, he_20, tarifa_venta, gastos_fijos)
+    return {k: float(v) for k, v in resultado.items()}
+
+
+# --- SENSIBILIDAD DE LA UTILIDAD NETA ---
+
+def _escenarios_perturbados(cantidades, entradas, n_escenarios, factores):
+    """
+    Arma (escenarios x tipos) y entradas por escenario a partir del punto base, multiplicando cada
+    variable por su array de factores (escenarios,). Las variables de flota se nombran "flota:<clave>".
+    """
+    registro = cargar_registro_flota()
+    matriz_flota = np.tile(vector_cantidades(cantidades, registro), (n_escenarios, 1))
+    por_escenario = {k: np.full(n_escenarios, float(v)) for k, v in entradas.items()}
+    for variable, factor in factores.items():
+        if variable.startswith("flota:"):
+            matriz_flota[:, registro["indice"][variable.removeprefix("flota:")]] *= factor
+        else:
+            por_escenario[variable] *= factor
+    return matriz_flota, por_escenario
+
+
+def variables_sensibilidad(cantidades, entradas):
+    """
+    Entradas numéricas perturbables: todas las de 'entradas' más cada tipo de avión presente en la flota.
+    """
+    registro = cargar_registro_flota()
+    vector = vector_cantidades(cantidades, registro)
+    return list(entradas) + [f"flota:{registro['claves'][i]}" for i in np.flatnonzero(vector > 0)]
+
+
+def analisis_sensibilidad(cantidades, entradas, variacion=0.10):
+    """
+    Tornado de la utilidad neta: cada variable se perturba -variacion/+variacion (relativo) y todos los
+    escenarios (1 + 2 x variables) se evalúan en un solo llamado a evaluar_mro_vectorizado.
+    Devuelve utilidad base, baja y alta por variable y la elasticidad (cambio % de utilidad / cambio % de la variable).
+    """
+    variables = variables_sensibilidad(cantidades, entradas)
+    n_escenarios = 1 + 2 * len(variables)
+    factores = {}
+    for k, variable in enumerate(variables):
+        factores[variable] = np.ones(n_escenarios)
+        factores[variable][[1 + 2 * k, 2 + 2 * k]] = [1 - variacion, 1 + variacion]
+    matriz_flota, por_escenario = _escenarios_perturbados(cantidades, entradas, n_escenarios, factores)
+
+    utilidad = evaluar_mro_vectorizado(matriz_flota, **por_escenario)["utilidad_neta"]
+    base, baja, alta = utilidad[0], utilidad[1::2], utilidad[2::2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elasticidad = ((alta - baja) / abs(base)) / (2 * variacion)
+    return {
+        "variables": variables,
+        "utilidad_base": float(base),
+        "utilidad_baja": baja,
+        "utilidad_alta": alta,
+        "elasticidad": elasticidad,
+    }
+
+
+def malla_sensibilidad(cantidades, entradas, variable_x, variable_y, variacion=0.20, pasos=21):
+    """
+    Interacción de dos variables: malla pasos x pasos de multiplicadores en [1-variacion, 1+variacion],
+    evaluada en un solo llamado. Devuelve los multiplicadores y la utilidad neta (y x x).
+    """
+    mult = np.linspace(1 - variacion, 1 + variacion, pasos)
+    mult_y, mult_x = np.meshgrid(mult, mult, indexing="ij")
+    factores = {variable_x: mult_x.ravel()}
+    factores[variable_y] = factores.get(variable_y, 1.0) * mult_y.ravel()
+    matriz_flota, por_escenario = _escenarios_perturbados(cantidades, entradas, mult_x.size, factores)
+
+    utilidad = evaluar_mro_vectorizado(matriz_flota, **por_escenario)["utilidad_neta"]
+    return mult, utilidad.reshape(pasos, pasos)
+
+
+# --- DEPARTAMENTOS (MATRIZ DEPARTAMENTOS x TIPOS DE AVIÓN) ---
+RUTA_DEPARTAMENTOS = Path(__file__).parent / "datos" / "departamentos.csv"
+
+
+@lru_cache(maxsize=8)
+def cargar_departamentos(ruta=RUTA_DEPARTAMENTOS):
+    """
+    Tabla de departamentos (plantilla, mandos y tarifas), una fila por departamento del registro de flota
+    y en el mismo orden que sus columnas pct_<departamento>.
+    """
+    df = pd.read_csv(ruta)
+    departamentos = cargar_registro_flota()["departamentos"]
+    faltantes = sorted(set(departamentos) - set(df["departamento"]))
+    if faltantes:
+        raise ValueError(f"Departamentos del registro de flota sin fila en {Path(ruta).name}: {faltantes}")
+    return df.set_index("departamento").loc[departamentos].reset_index()
+
+
+def evaluar_departamentos(demanda_departamento, tecnicos, encargados, costo_encargado, jefaturas, costo_jefatura,
+                          costo_hora_tecnico, tarifa_hora, he_15, he_20):
+    """
+    Capacidad, nómina, saturación y margen de contribución de todos los departamentos en una pasada.
+    Todos los argumentos se combinan con broadcasting sobre el último eje (departamentos), de modo
+    que también sirve para (escenarios x departamentos).
+    """
+    tecnicos = np.asarray(tecnicos, dtype=float)
+    demanda_departamento = np.asarray(demanda_departamento, dtype=float)
+
+    capacidad, costo_nomina = calcular_nomina_compleja(tecnicos, costo_hora_tecnico, he_15, he_20)
+    horas_vendidas = np.minimum(demanda_departamento, capacidad)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        saturacion = np.where(capacidad > 0, demanda_departamento / capacidad, np.inf)
+
+    ingreso = horas_vendidas * tarifa_hora
+    costo_mando = np.asarray(encargados) * costo_encargado + np.asarray(jefaturas) * costo_jefatura
+    return {
+        "demanda": demanda_departamento,
+        "capacidad": capacidad,
+        "horas_vendidas": horas_vendidas,
+        "saturacion": saturacion,
+        "ingreso": ingreso,
+        "costo_nomina": costo_nomina,
+        "costo_mando": costo_mando,
+        "margen_contribucion": ingreso - costo_nomina - costo_mando,
+        "horas_no_cubiertas": demanda_departamento - horas_vendidas,
+    }
+
+
+# --- E. PREDICCIÓN DE MERCADO (MONTE CARLO) ---
+
+# Ciclo estacional del pronóstico original (meses 3-4 altos, mes 6 bajo), repetido a lo largo del horizonte
+PATRON_ESTACIONAL = np.array([1.0, 1.0, 1.10, 1.10, 1.0, 0.85])
+TENDENCIAS_MERCADO = {"Escasez de Piezas": 0.90, "Flota Envejecida": 1.15, "Modernización Cabinas": 1.05}
+
+
+def _poisson_por_inversion(rng, lam_mes, n_trayectorias):
+    """
+    Muestras Poisson (meses x trayectorias) por inversión de la CDF: una tabla por mes y un
+    searchsorted sobre uniformes, bastante más rápido que rng.poisson para medias pequeñas.
+    """
+    k_max = int(np.max(lam_mes) + 12 * np.sqrt(np.max(lam_mes)) + 12)
+    k = np.arange(k_max + 1)
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+    log_pmf = k[None, :] * np.log(np.maximum(lam_mes, 1e-300))[:, None] - lam_mes[:, None] - log_fact[None, :]
+    cdf = np.cumsum(np.exp(log_pmf), axis=1)
+
+    uniformes = rng.random((len(lam_mes), n_trayectorias), dtype=np.float32)
+    llegadas = np.empty((len(lam_mes), n_trayectorias), dtype=np.float32)
+    for m in range(len(lam_mes)):
+        llegadas[m] = np.minimum(np.searchsorted(cdf[m], uniformes[m], side="right"), k_max)
+    return llegadas
+
+
+def simular_demanda_montecarlo(cantidades, horas_check, capacidad_total, meses=24, n_trayectorias=100_000,
+                               factor_tendencia=TENDENCIAS_MERCADO["Flota Envejecida"],
+                               dispersion_llegadas=0.0, cv_horas=0.15,
+                               prob_escasez=0.30, fraccion_retraso=0.25,
+                               patron_estacional=PATRON_ESTACIONAL, semilla=None):
+    """
+    Simula trayectorias de demanda mensual (horas) por tipo de avión como arrays (trayectorias x meses).
+
+    - Llegadas: Poisson con media cantidad x estacionalidad x tendencia; con dispersion_llegadas > 0
+      se usa la mezcla Gamma-Poisson (binomial negativa) para representar meses más volátiles.
+    - Horas por check: factor lognormal de media 1 y coeficiente de variación cv_horas por avión.
+    - Escasez de piezas: cada mes, con probabilidad prob_escasez, una fracción de las horas del mes
+      se retrasa y pasa al mes siguiente.
+
+    Devuelve las bandas P10/P50/P90 de la demanda total, la probabilidad de saturación contra
+    capacidad_total (escalar o por mes), la demanda media por tipo de avión y las trayectorias completas (float32).
+    """
+    rng = np.random.default_rng(semilla)
+    cantidades = np.asarray(cantidades, dtype=float)
+    horas_check = np.asarray(horas_check, dtype=float)
+    estacionalidad = np.resize(np.asarray(patron_estacional, dtype=float), meses)
+
+    # Internamente se trabaja meses x trayectorias para que cada mes sea contiguo en memoria
+    demanda_total = np.zeros((meses, n_trayectorias), dtype=np.float32)
+    media_por_tipo = np.zeros((len(cantidades), meses))
+
+    for t, (qty, hrs) in enumerate(zip(cantidades, horas_check)):
+        if qty <= 0:
+            continue
+        lam = qty * estacionalidad * factor_tendencia
+        if dispersion_llegadas > 0:
+            forma = 1.0 / dispersion_llegadas
+            lam_mezcla = rng.gamma(forma, 1.0 / forma, size=(meses, n_trayectorias)) * lam[:, None]
+            llegadas = rng.poisson(lam_mezcla).astype(np.float32)
+        else:
+            llegadas = _poisson_por_inversion(rng, lam, n_trayectorias)
+
+        # La suma de N checks lognormales se aproxima con un solo factor de CV reducido en sqrt(N)
+        sigma = np.sqrt(np.log1p(np.float32(cv_horas ** 2) / np.maximum(llegadas, np.float32(1.0))))
+        factor_horas = np.exp(sigma * rng.standard_normal((meses, n_trayectorias), dtype=np.float32) - sigma ** 2 / 2)
+        horas_tipo = llegadas * np.float32(hrs) * factor_horas
+
+        media_por_tipo[t] = horas_tipo.mean(axis=1)
+        demanda_total += horas_tipo
+
+    # Retrasos por escasez de piezas: el trabajo retrasado se arrastra al mes siguiente
+    if prob_escasez > 0 and fraccion_retraso > 0:
+        escasez = rng.random((meses, n_trayectorias), dtype=np.float32) < prob_escasez
+        arrastre = np.zeros(n_trayectorias, dtype=np.float32)
+        for m in range(meses):
+            carga_mes = demanda_total[m] + arrastre
+            arrastre = np.where(escasez[m], carga_mes * np.float32(fraccion_retraso), np.float32(0.0))
+            demanda_total[m] = carga_mes - arrastre
+
+    p10, p50, p90 = np.quantile(demanda_total, [0.10, 0.50, 0.90], axis=1)
+    capacidad = np.asarray(capacidad_total, dtype=np.float32).reshape(-1, 1)
+    prob_saturacion = (demanda_total > capacidad).mean(axis=1)
+
+    return {
+        "p10": p10,
+        "p50": p50,
+        "p90": p90,
+        "media": demanda_total.mean(axis=1),
+        "prob_saturacion": prob_saturacion,
+        "media_por_tipo": media_por_tipo,
+        "trayectorias": demanda_total.T,
+    }
+
+
+def motor_prediccion_mercado(cantidades, capacidad_total, meses=24, n_trayectorias=100_000, **parametros):
+    """
+    Tabla mensual del pronóstico Monte Carlo para una mezcla de flota (dict o vector del registro).
+    Los parámetros adicionales se pasan tal cual a simular_demanda_montecarlo.
+    """
+    registro = cargar_registro_flota()
+    sim = simular_demanda_montecarlo(vector_cantidades(cantidades, registro), registro["horas"], capacidad_total,
+                                     meses=meses, n_trayectorias=n_trayectorias, **parametros)
+    return pd.DataFrame({
+        "Mes Futuro": [f"Mes +{i+1}" for i in range(meses)],
+        "P10": sim["p10"],
+        "Demanda Proyectada": sim["p50"],
+        "P90": sim["p90"],
+        "Capacidad Actual": capacidad_total,
+        "Prob. Saturación": sim["prob_saturacion"],
+        "Estado": np.where(sim["prob_saturacion"] >= 0.5, "Saturado", "Con Capacidad"),
+    })
+
+
+def pronostico_esperado(demanda_total_horas, capacidad_total, meses=24,
+                        factor_tendencia=TENDENCIAS_MERCADO["Flota Envejecida"], prob_escasez=0.30, fraccion_retraso=0.25,
+                        patron_estacional=PATRON_ESTACIONAL):
+    """
+    Valor esperado del pronóstico (sin muestreo) para muchos escenarios: (escenarios,) -> (escenarios x meses).
+    Pensado para corridas por lotes donde el Monte Carlo completo por fila sería demasiado costoso.
+
+    Con los mismos parámetros es la media de simular_demanda_montecarlo: la escasez de piezas no descuenta
+    demanda (el factor 0.90 de la versión original) sino que retrasa al mes siguiente, en valor esperado,
+    prob_escasez x fraccion_retraso de la carga de cada mes.
+    Devuelve la demanda mensual esperada, su pico y los meses en que supera la capacidad.
+    """
+    estacionalidad = np.resize(np.asarray(patron_estacional, dtype=float), meses)
+    demanda_mensual = np.asarray(demanda_total_horas, dtype=float)[..., None] * estacionalidad * factor_tendencia
+    retraso = prob_escasez * fraccion_retraso
+    if retraso > 0:
+        arrastre = np.zeros(demanda_mensual.shape[:-1])
+        for m in range(meses):
+            carga_mes = demanda_mensual[..., m] + arrastre
+            arrastre = carga_mes * retraso
+            demanda_mensual[..., m] = carga_mes - arrastre
+    return {
+        "demanda_mensual": demanda_mensual,
+        "demanda_pico": demanda_mensual.max(axis=-1),
+        "meses_saturados": (demanda_mensual > np.asarray(capacidad_total, dtype=float)[..., None]).sum(axis=-1),
+    }
+
+
+def pronostico_diario(cantidades, capacidad_total=None, anios=10, fecha_inicio=None,
+                      factor_tendencia=TENDENCIAS_MERCADO["Flota Envejecida"], crecimiento_anual=0.0,
+                      patron_estacional=PATRON_ESTACIONAL, patron_semanal=None, registro=None):
+    """
+    Pronóstico esperado de largo plazo con resolución diaria, por tipo de avión y departamento.
+
+    La demanda mensual de cada tipo (cantidad x horas por departamento) se reparte entre los días del mes y
+    se escala por componentes calculados una sola vez para todo el horizonte:
+    - estacionalidad mensual (patron_estacional, cíclico, igual que pronostico_esperado),
+    - patrón semanal opcional (7 pesos, lunes primero; se normaliza a promedio 1),
+    - tendencia: factor_tendencia x (1 + crecimiento_anual) ^ años transcurridos.
+    El horizonte arranca el primer día del mes de fecha_inicio (por defecto, el mes siguiente).
+
+    Solo se guardan los tipos con cantidad > 0, como float32 (tipos x departamentos x días): 10 años del
+    registro completo ocupan ~2 MB. Con crecimiento_anual=0 y sin patrón semanal, la suma de cada mes
+    coincide con pronostico_esperado sin escasez (prob_escasez=0): aquí no se modelan retrasos.
+    """
+    registro = registro or cargar_registro_flota()
+    vector = vector_cantidades(cantidades, registro)
+    activos = np.flatnonzero(vector)
+
+    mes_inicio = np.datetime64("today", "M") + 1 if fecha_inicio is None else np.datetime64(fecha_inicio, "M")
+    meses = int(round(anios * 12))
+    fechas = np.arange(mes_inicio.astype("datetime64[D]"), (mes_inicio + meses).astype("datetime64[D]"))
+    mes_de_cada_dia = (fechas.astype("datetime64[M]") - mes_inicio).astype(int)
+    limites_mes = (mes_inicio + np.arange(meses + 1)).astype("datetime64[D]")
+    dias_por_mes = np.diff(limites_mes).astype(int)
+
+    estacionalidad = np.resize(np.asarray(patron_estacional, dtype=float), meses)
+    factor_diario = (estacionalidad / dias_por_mes)[mes_de_cada_dia]
+    if patron_semanal is not None:
+        pesos = np.asarray(patron_semanal, dtype=float)
+        dia_semana = (fechas.astype(int) + 3) % 7  # 1970-01-01 fue jueves -> lunes = 0
+        factor_diario = factor_diario * (pesos / pesos.mean())[dia_semana]
+    anios_transcurridos = np.arange(len(fechas)) / 365.25
+    factor_diario = factor_diario * factor_tendencia * (1 + crecimiento_anual) ** anios_transcurridos
+
+    horas_mes = (vector[activos, None] * registro["horas_departamento"][activos]).astype(np.float32)
+    resultado = {
+        "fechas": fechas,
+        "claves": registro["claves"][activos],
+        "departamentos": registro["departamentos"],
+        "demanda": horas_mes[:, :, None] * factor_diario.astype(np.float32),  # tipos x departamentos x días
+    }
+    if capacidad_total is not None:
+        resultado["capacidad"] = (capacidad_total / dias_por_mes[mes_de_cada_dia]).astype(np.float32)
+    return resultado
+
+
+def agregar_serie_diaria(fechas, serie, max_puntos=1500, frecuencia=None):
+    """
+    Reduce series diarias (..., días) a periodos para graficar sin mandar decenas de miles de puntos al navegador.
+
+    Con frecuencia=None elige la más fina de "D", "W" (semanas de lunes a domingo) o "M" que quede bajo
+    max_puntos. Por periodo devuelve la media diaria y el mínimo/máximo diario (banda), con np.*.reduceat.
+    """
+    if frecuencia is None:
+        n_semanas = len(np.unique((fechas.astype(int) + 3) // 7))
+        frecuencia = "D" if len(fechas) <= max_puntos else "W" if n_semanas <= max_puntos else "M"
+    if frecuencia == "D":
+        claves = fechas.astype(int)
+    elif frecuencia == "W":
+        claves = (fechas.astype(int) + 3) // 7
+    else:
+        claves = fechas.astype("datetime64[M]").astype(int)
+
+    inicios = np.flatnonzero(np.r_[True, claves[1:] != claves[:-1]])
+    dias = np.diff(np.r_[inicios, len(fechas)])
+    serie = np.asarray(serie)
+    return {
+        "frecuencia": frecuencia,
+        "fechas": fechas[inicios],
+        "media": np.add.reduceat(serie, inicios, axis=-1, dtype=np.float64) / dias,
+        "minimo": np.minimum.reduceat(serie, inicios, axis=-1),
+        "maximo": np.maximum.reduceat(serie, inicios, axis=-1),
+    }
+
+
+# --- MULTI-SITIO (EJE DE SITIOS) ---
+# Cada hangar es una fila: flota, plantilla y finanzas propias. Todo se evalúa vectorizado sobre el eje
+# de sitios (un solo llamado al motor), así 50 o 500 sitios cuestan lo mismo que uno para la app.
+
+def columnas_desconocidas(columnas, registro=None, columnas_identificacion=None, similitud=0.8):
+    """
+    Columnas que no son claves de flota ni entradas y que no pueden tomarse como identificación: con
+    columnas_identificacion declaradas, todas las que no estén en la lista; sin declarar, las que se parecen
+    a una clave o entrada (p. ej. "B757C" por "B757-C"), que casi siempre son un error de tipeo.
+    Devuelve {columna: nombre válido más parecido o None}.
+    """
+    registro = registro or cargar_registro_flota()
+    validas = list(registro["claves"]) + list(ENTRADAS_DEFECTO)
+    por_minusculas = {v.lower(): v for v in validas}
+    desconocidas = {}
+    for columna in columnas:
+        if columna in validas or (columnas_identificacion is not None and columna in columnas_identificacion):
+            continue
+        parecida = difflib.get_close_matches(str(columna).lower(), list(por_minusculas), n=1, cutoff=similitud)
+        if columnas_identificacion is not None or parecida:
+            desconocidas[columna] = por_minusculas[parecida[0]] if parecida else None
+    return desconocidas
+
+
+def leer_tabla_escenarios(tabla, registro=None, columnas_identificacion=None):
+    """
+    Convierte una tabla con una fila por sitio/escenario a la forma del motor: columnas de flota con las
+    claves del registro y columnas con los nombres de ENTRADAS_DEFECTO (las que falten, o vacías, toman el
+    valor por defecto). Devuelve (cantidades escenarios x tipos, entradas {nombre: array}, claves de flota usadas).
+    Lanza ValueError si hay columnas desconocidas (ver columnas_desconocidas): una clave mal escrita no
+    debe leerse como una flota en cero.
+    """
+    registro = registro or cargar_registro_flota()
+    desconocidas = columnas_desconocidas(tabla.columns, registro, columnas_identificacion)
+    if desconocidas:
+        detalle = ", ".join(f"'{c}'" + (f" (¿'{v}'?)" if v else "") for c, v in desconocidas.items())
+        raise ValueError(f"Columnas que no son claves de flota, entradas ni identificación: {detalle}")
+    claves = [c for c in registro["claves"] if c in tabla.columns]
+    cantidades = np.zeros((len(tabla), len(registro["claves"])))
+    for clave in claves:
+        cantidades[:, registro["indice"][clave]] = tabla[clave].fillna(0).to_numpy(dtype=float)
+    entradas = {
+        nombre: tabla[nombre].fillna(defecto).to_numpy(dtype=float) if nombre in tabla.columns else np.full(len(tabla), float(defecto))
+        for nombre, defecto in ENTRADAS_DEFECTO.items()
+    }
+    return cantidades, entradas, claves
+
+
+def redistribuir_demanda(demanda_total_horas, demanda_avionica_horas, capacidad_total, fraccion_transferible=1.0):
+    """
+    Mueve horas excedentes de sitios saturados a sitios con capacidad ociosa.
+
+    Se traslada lo menor entre el excedente transferible (fraccion_transferible del excedente) y la holgura
+    total de la red. Cada origen aporta en proporción a su excedente y cada destino recibe en proporción a su
+    holgura, así ningún destino pasa de su capacidad. Las horas movidas llevan la mezcla de aviónica del origen.
+    Devuelve la demanda total y de aviónica después del traslado y la matriz de traslados (origen x destino, horas).
+    """
+    demanda_total_horas = np.asarray(demanda_total_horas, dtype=float)
+    demanda_avionica_horas = np.asarray(demanda_avionica_horas, dtype=float)
+    excedente = np.maximum(demanda_total_horas - capacidad_total, 0) * fraccion_transferible
+    holgura = np.maximum(capacidad_total - demanda_total_horas, 0)
+    movido = min(excedente.sum(), holgura.sum())
+    if movido <= 0:
+        return demanda_total_horas, demanda_avionica_horas, np.zeros((len(demanda_total_horas),) * 2)
+
+    salida = excedente * (movido / excedente.sum())
+    entrada = holgura * (movido / holgura.sum())
+    traslados = np.outer(salida, entrada) / movido
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mezcla_avionica = np.where(demanda_total_horas > 0, demanda_avionica_horas / demanda_total_horas, 0.0)
+    avionica_movida = mezcla_avionica * salida
+    return (demanda_total_horas - salida + entrada,
+            demanda_avionica_horas - avionica_movida + mezcla_avionica @ traslados,
+            traslados)
+
+
+def evaluar_multisitio(cantidades, entradas, redistribuir=False, fraccion_transferible=1.0, costo_traslado_hora=0.0,
+                       meses=24, factor_tendencia=TENDENCIAS_MERCADO["Flota Envejecida"], prob_escasez=0.30,
+                       fraccion_retraso=0.25, registro=None):
+    """
+    Evalúa todos los sitios en un llamado vectorizado: demanda, nómina, P&L y pronóstico esperado por sitio,
+    más el consolidado de la red. Con redistribuir=True la demanda excedente se mueve antes del P&L
+    (ver redistribuir_demanda); el costo de traslado por hora lo absorbe el sitio que recibe.
+    """
+    cantidades = np.atleast_2d(vector_cantidades(cantidades, registro))
+    n_sitios = cantidades.shape[0]
+    entradas = {nombre: np.broadcast_to(np.asarray(entradas.get(nombre, defecto), dtype=float), (n_sitios,))
+                for nombre, defecto in ENTRADAS_DEFECTO.items()}
+
+    demanda_total_horas, demanda_avionica_horas = calcular_demanda(cantidades, registro)
+    traslados = np.zeros((n_sitios, n_sitios))
+    if redistribuir:
+        capacidad_total, _ = calcular_nomina_compleja(entradas["av_tecnicos"] + entradas["otros_tecnicos"],
+                                                      entradas["salario_tecnico_base"], entradas["he_15"], entradas["he_20"])
+        demanda_total_horas, demanda_avionica_horas, traslados = redistribuir_demanda(
+            demanda_total_horas, demanda_avionica_horas, capacidad_total, fraccion_transferible)
+
+    sitios = evaluar_desde_demanda(demanda_total_horas, demanda_avionica_horas, **entradas)
+    sitios["horas_recibidas"] = traslados.sum(axis=0)
+    sitios["horas_cedidas"] = traslados.sum(axis=1)
+    sitios["costo_traslados"] = sitios["horas_recibidas"] * costo_traslado_hora
+    sitios["utilidad_neta"] = sitios["utilidad_neta"] - sitios["costo_traslados"]
+    sitios["demanda_no_atendida"] = sitios["demanda_total_horas"] - sitios["horas_vendidas_total"]
+    sitios["gastos_fijos"] = entradas["gastos_fijos"]
+
+    pronostico = pronostico_esperado(sitios["demanda_total_horas"], sitios["capacidad_total"], meses=meses,
+                                     factor_tendencia=factor_tendencia, prob_escasez=prob_escasez,
+                                     fraccion_retraso=fraccion_retraso)
+    sumas = ["demanda_total_horas", "demanda_avionica_horas", "capacidad_total", "capacidad_avionica",
+             "horas_vendidas_total", "demanda_no_atendida", "ingreso_total", "costo_nomina_total",
+             "costo_admin_mensual", "gastos_fijos", "costo_traslados", "utilidad_neta", "horas_recibidas"]
+    consolidado = {clave: float(sitios[clave].sum()) for clave in sumas}
+    consolidado["ocupacion"] = consolidado["horas_vendidas_total"] / consolidado["capacidad_total"] if consolidado["capacidad_total"] else np.nan
+    consolidado["sitios_saturados"] = int((sitios["demanda_total_horas"] > sitios["capacidad_total"]).sum())
+    return {
+        "sitios": sitios,
+        "traslados": traslados,
+        "pronostico_mensual": pronostico["demanda_mensual"],  # sitios x meses
+        "consolidado": consolidado,
+    }
+
+
+# --- FLUJO DE CAJA, VPN Y TIR (ESCENARIOS x MESES) ---
+# Proyección mensual del P&L convertida a caja. Todo se calcula como arrays (escenarios x meses): las entradas
+# escalares o (escenarios,) se difunden sobre los meses, así miles de trayectorias Monte Carlo o puntos de
+# un barrido obtienen VPN y TIR en un solo llamado.
+
+DIAS_POR_MES_COMERCIAL = 365 / 12
+
+
+def _desfasar_meses(flujo, dias):
+    """
+    Desplaza un flujo (escenarios x meses) 'dias' hacia adelante (plazo de cobro o pago), repartiendo entre
+    los dos meses vecinos cuando el plazo no es un número entero de meses. Lo que cae fuera del horizonte se pierde.
+    """
+    meses = flujo.shape[1]
+    desfase = np.broadcast_to(np.asarray(dias, dtype=float) / DIAS_POR_MES_COMERCIAL, (flujo.shape[0],))[:, None]
+    entero, fraccion = np.floor(desfase).astype(int), desfase - np.floor(desfase)
+    t = np.arange(meses)
+    resultado = np.zeros_like(flujo)
+    for extra, peso in ((0, 1 - fraccion), (1, fraccion)):
+        origen = t - entero - extra
+        valido = origen >= 0
+        resultado += np.where(valido, np.take_along_axis(flujo, np.clip(origen, 0, None), axis=1), 0.0) * peso
+    return resultado
+
+
+def valor_presente(flujos, tasa_mensual, inversion_inicial=0.0):
+    """
+    VPN de flujos (escenarios x meses) al cierre de cada mes, menos la inversión en el mes 0.
+    tasa_mensual puede ser escalar o (escenarios,).
+    """
+    tasa_mensual = np.asarray(tasa_mensual, dtype=float)[..., None]
+    descuento = (1 + tasa_mensual) ** -np.arange(1, flujos.shape[-1] + 1)
+    return (flujos * descuento).sum(axis=-1) - inversion_inicial
+
+
+def tasa_interna_retorno(flujos, inversion_inicial=0.0, iteraciones=80):
+    """
+    TIR mensual por bisección vectorizada sobre todos los escenarios a la vez. NaN donde el VPN no cambia
+    de signo en el intervalo de búsqueda (p. ej. flujos siempre positivos sin inversión inicial).
+    """
+    n_escenarios = flujos.shape[0]
+    inversion_inicial = np.broadcast_to(np.asarray(inversion_inicial, dtype=float), (n_escenarios,))
+    baja, alta = np.full(n_escenarios, -0.99), np.full(n_escenarios, 1.0)
+    vpn_baja = valor_presente(flujos, baja, inversion_inicial)
+    con_solucion = np.sign(vpn_baja) != np.sign(valor_presente(flujos, alta, inversion_inicial))
+    for _ in range(iteraciones):
+        media = (baja + alta) / 2
+        vpn_media = valor_presente(flujos, media, inversion_inicial)
+        mismo_signo = np.sign(vpn_media) == np.sign(vpn_baja)
+        baja, vpn_baja = np.where(mismo_signo, media, baja), np.where(mismo_signo, vpn_media, vpn_baja)
+        alta = np.where(mismo_signo, alta, media)
+    return np.where(con_solucion, (baja + alta) / 2, np.nan)
+
+
+def proyectar_flujo_caja(demanda_mensual, entradas, fraccion_plantilla_inicial=1.0, meses_rampa=0,
+                         costo_contratacion=0.0, escalamiento_salarial_anual=0.0, escalamiento_tarifa_anual=0.0,
+                         dias_cobro=0.0, dias_pago=0.0, tasa_descuento_anual=0.12, inversion_inicial=0.0):
+    """
+    Proyecta P&L y caja mes a mes para (escenarios x meses) de demanda en horas (p. ej. trayectorias de
+    simular_demanda_montecarlo o demanda_mensual de pronostico_esperado).
+
+    - Rampa de contratación: la plantilla técnica arranca en fraccion_plantilla_inicial del objetivo y crece
+      linealmente hasta el 100% en meses_rampa; cada técnico nuevo cuesta costo_contratacion una sola vez.
+    - Escalamiento: salarios (técnicos y administración) y tarifa suben en escalones anuales.
+    - Plazos: los ingresos se cobran dias_cobro después y los gastos fijos se pagan dias_pago después;
+      la nómina y la administración se pagan en el mes.
+    Las entradas con nombres de ENTRADAS_DEFECTO pueden ser escalares o (escenarios,).
+    Devuelve los flujos mensuales, caja acumulada, VPN, TIR anual, mes de recuperación y caja mínima.
+    """
+    demanda_mensual = np.atleast_2d(np.asarray(demanda_mensual, dtype=float))
+    n_escenarios, meses = demanda_mensual.shape
+    e = {nombre: np.broadcast_to(np.asarray(entradas.get(nombre, defecto), dtype=float), (n_escenarios,))[:, None]
+         for nombre, defecto in ENTRADAS_DEFECTO.items()}
+    t = np.arange(meses)
+
+    avance_rampa = np.minimum((t + 1) / meses_rampa, 1.0) if meses_rampa > 0 else np.ones(meses)
+    fraccion_plantilla = fraccion_plantilla_inicial + (1 - fraccion_plantilla_inicial) * avance_rampa
+    tecnicos = (e["av_tecnicos"] + e["otros_tecnicos"]) * fraccion_plantilla
+    # La plantilla previa al mes 0 es la fracción inicial: el primer escalón de la rampa también son contrataciones
+    contrataciones = np.diff(tecnicos, axis=1, prepend=(e["av_tecnicos"] + e["otros_tecnicos"]) * fraccion_plantilla_inicial)
+
+    escalon_salarial = (1 + escalamiento_salarial_anual) ** (t // 12)
+    capacidad, costo_nomina = calcular_nomina_compleja(tecnicos, e["salario_tecnico_base"] * escalon_salarial, e["he_15"], e["he_20"])
+    admin = calcular_costos_admin(e["salario_gg"], e["cant_gtes_area"], e["salario_gte_area"], e["cant_pms"], e["salario_pm"],
+                                  e["av_encargados"], e["av_jefatura"])
+    costo_admin = np.broadcast_to(admin["costo_admin_mensual"] * escalon_salarial, (n_escenarios, meses))
+
+    ingreso = np.minimum(demanda_mensual, capacidad) * e["tarifa_venta"] * (1 + escalamiento_tarifa_anual) ** (t // 12)
+    gastos_fijos = np.broadcast_to(e["gastos_fijos"], (n_escenarios, meses)).astype(float)
+    utilidad = ingreso - costo_nomina - costo_admin - gastos_fijos - contrataciones * costo_contratacion
+
+    cobros = _desfasar_meses(ingreso, dias_cobro)
+    pagos_fijos = _desfasar_meses(gastos_fijos, dias_pago)
+    flujo_neto = cobros - costo_nomina - costo_admin - pagos_fijos - contrataciones * costo_contratacion
+
+    caja_acumulada = np.cumsum(flujo_neto, axis=1) - inversion_inicial
+    recuperado = caja_acumulada >= 0
+    tasa_mensual = (1 + tasa_descuento_anual) ** (1 / 12) - 1
+    tir_mensual = tasa_interna_retorno(flujo_neto, inversion_inicial)
+    return {
+        "ingreso": ingreso,
+        "cobros": cobros,
+        "costo_nomina": costo_nomina,
+        "costo_admin": costo_admin,
+        "pagos_fijos": pagos_fijos,
+        "costo_contratacion": contrataciones * costo_contratacion,
+        "utilidad": utilidad,
+        "flujo_neto": flujo_neto,
+        "caja_acumulada": caja_acumulada,
+        "vpn": valor_presente(flujo_neto, tasa_mensual, inversion_inicial),
+        "tir_anual": (1 + tir_mensual) ** 12 - 1,
+        "mes_recuperacion": np.where(recuperado.any(axis=1), recuperado.argmax(axis=1) + 1, -1),
+        "caja_minima": np.minimum(caja_acumulada.min(axis=1), -inversion_inicial),
+    }
+
+
+# --- OPTIMIZADOR DE PLANTILLA ---
+
+# Límites por defecto (mínimo, máximo) de cada variable de decisión
+LIMITES_OPTIMIZADOR = {
+    "av_tecnicos": (0, 5000),
+    "otros_tecnicos": (0, 20000),
+    "he_15": (0, 15),
+    "he_20": (0, 4),
+    "cant_pms": (0, 200),
+    "cant_gtes_area": (1, 50),
+}
+
+
+def optimizar_plantilla(demanda_total_horas, demanda_avionica_horas, salario_tecnico_base, tarifa_venta,
+                        salario_gg, salario_gte_area, salario_pm, gastos_fijos, cantidad_aviones,
+                        limites=None, objetivo="costo", demanda_horizonte=None,
+                        aviones_por_pm=2, tecnicos_por_gerente=200, cubrir_demanda_total=True):
+    """
+    Busca la mezcla entera de plantilla y horas extra de menor costo (objetivo="costo") o mayor
+    utilidad neta (objetivo="utilidad") que cubra la demanda.
+
+    Como el costo crece con cada técnico contratado, para cada combinación de horas extra basta con
+    la plantilla mínima que cubre la demanda: la dimensión de personal se poda de forma analítica y solo
+    se evalúa en lote la malla de horas extra (más los quiebres de la utilidad en modo "utilidad").
+    PMs y gerentes de área se dimensionan con los tramos de control aviones_por_pm y tecnicos_por_gerente.
+
+    Restricciones: la demanda de aviónica y la demanda total siempre se cubren en modo "costo"; en modo
+    "utilidad" la total también, salvo con cubrir_demanda_total=False (se deja sin cubrir la parte que no
+    convenga atender); si se pasa demanda_horizonte (horas por mes), la capacidad debe cubrir su pico.
+
+    Devuelve un dict de arrays con todas las alternativas factibles ordenadas de mejor a peor.
+    """
+    lim = {**LIMITES_OPTIMIZADOR, **(limites or {})}
+
+    he_15, he_20 = np.meshgrid(np.arange(lim["he_15"][0], lim["he_15"][1] + 1),
+                               np.arange(lim["he_20"][0], lim["he_20"][1] + 1), indexing="ij")
+    he_15, he_20 = he_15.ravel(), he_20.ravel()
+    horas_por_tecnico, _ = calcular_nomina_compleja(1, salario_tecnico_base, he_15, he_20)
+
+    # Aviónica: plantilla mínima que cubre su demanda
+    av_tecnicos = np.maximum(np.ceil(demanda_avionica_horas / horas_por_tecnico), lim["av_tecnicos"][0])
+    factible = av_tecnicos <= lim["av_tecnicos"][1]
+
+    # Plantilla total mínima obligatoria
+    minimo_total = av_tecnicos + lim["otros_tecnicos"][0]
+    if objetivo == "costo" or cubrir_demanda_total:
+        minimo_total = np.maximum(minimo_total, np.ceil(demanda_total_horas / horas_por_tecnico))
+    if demanda_horizonte is not None:
+        pico_horizonte = float(np.max(demanda_horizonte))
+        minimo_total = np.maximum(minimo_total, np.ceil(pico_horizonte / horas_por_tecnico))
+    maximo_total = av_tecnicos + lim["otros_tecnicos"][1]
+
+    # Candidatos de plantilla total: el mínimo y, en modo utilidad, los quiebres de min(demanda, capacidad)
+    if objetivo == "utilidad":
+        quiebres = [np.floor(demanda_total_horas / horas_por_tecnico), np.ceil(demanda_total_horas / horas_por_tecnico)]
+        candidatos = np.stack([minimo_total] + [np.clip(q, minimo_total, maximo_total) for q in quiebres])
+    else:
+        candidatos = minimo_total[None, :]
+
+    forma = candidatos.shape
+    total_tecnicos = candidatos.ravel()
+    he_15 = np.broadcast_to(he_15, forma).ravel()
+    he_20 = np.broadcast_to(he_20, forma).ravel()
+    av_tecnicos = np.broadcast_to(av_tecnicos, forma).ravel()
+    factible = np.broadcast_to(factible, forma).ravel() & (total_tecnicos - av_tecnicos <= lim["otros_tecnicos"][1])
+    otros_tecnicos = total_tecnicos - av_tecnicos
+
+    # Estructura administrativa por tramos de control
+    cant_pms = np.full(total_tecnicos.shape, max(np.ceil(cantidad_aviones / aviones_por_pm), lim["cant_pms"][0]))
+    cant_gtes_area = np.maximum(np.ceil(total_tecnicos / tecnicos_por_gerente), lim["cant_gtes_area"][0])
+    factible &= (cant_pms <= lim["cant_pms"][1]) & (cant_gtes_area <= lim["cant_gtes_area"][1])
+    costo_admin_mensual = salario_gg + cant_gtes_area * salario_gte_area + cant_pms * salario_pm
+
+    resultado = evaluar_plantilla(av_tecnicos, otros_tecnicos, he_15, he_20, salario_tecnico_base,
+                                  demanda_total_horas, demanda_avionica_horas, tarifa_venta,
+                                  costo_admin_mensual, gastos_fijos)
+    costo_total = resultado["costo_nomina_total"] + costo_admin_mensual
+
+    puntaje = costo_total if objetivo == "costo" else -resultado["utilidad_neta"]
+    orden = np.lexsort((total_tecnicos, puntaje))
+    orden = orden[factible[orden]]
+
+    alternativas = {
+        "av_tecnicos": av_tecnicos, "otros_tecnicos": otros_tecnicos, "he_15": he_15, "he_20": he_20,
+        "cant_pms": cant_pms, "cant_gtes_area": cant_gtes_area, "costo_admin_mensual": costo_admin_mensual,
+        "costo_total": costo_total, **resultado,
+    }
+    # Se eliminan duplicados (los candidatos pueden coincidir tras el recorte a los límites)
+    alternativas = {k: np.asarray(v)[orden] for k, v in alternativas.items()}
+    _, unicos = np.unique(np.stack([alternativas["av_tecnicos"], alternativas["otros_tecnicos"],
+                                    alternativas["he_15"], alternativas["he_20"]]), axis=1, return_index=True)
+    unicos = np.sort(unicos)
+    return {k: v[unicos] for k, v in alternativas.items()}
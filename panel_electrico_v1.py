@@ -1,5 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from motor_electrico import (
+    BREAKERS_COMERCIALES, asignacion_alternada, balancear_fases, calc_motor_bomba, carga_calculada_220_84,
+    corrientes_por_fase, factor_demanda_multifamiliar, formatear_breaker, seleccionar_breaker_comercial,
+)
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(page_title="Calculadora de Cargas Condominio - CNFL", layout="wide")
@@ -47,8 +53,8 @@ def calcular_areas_comunes(datos_comunes):
     detalles.append(f"Iluminación Parqueo: {datos_comunes['luces_parqueo'] * datos_comunes['watts_por_luz']} W")
     
     # Portones y Seguridad
-    total_watts += (datos_comunes['portones'] * 300) + 150 # 300W estimado por motor, 150W malla
-    detalles.append(f"Portones y Malla: {(datos_comunes['portones'] * 300) + 150} W")
+    total_watts += (datos_comunes['portones'] * datos_comunes['watts_porton']) + 150 # FLC NEC 430.248 por motor, 150W malla
+    detalles.append(f"Portones y Malla: {(datos_comunes['portones'] * datos_comunes['watts_porton']) + 150:.0f} W")
     
     return total_watts, detalles
 
@@ -84,8 +90,11 @@ tomas_pasillo = st.sidebar.number_input("Tomas totales pasillos", value=n_pasill
 watts_ascensor = st.sidebar.number_input("Potencia Ascensor (Watts)", value=7500)
 n_bombas = st.sidebar.number_input("Cantidad Bombas Agua", value=2)
 hp_bomba = st.sidebar.number_input("HP por Bomba", value=1.5)
-watts_bombas = n_bombas * hp_bomba * 746 # 746 W por HP
+watts_bomba, _ = calc_motor_bomba(hp_bomba, voltage_sys) # FLC de tabla NEC 430.248 x voltaje
+watts_bombas = n_bombas * watts_bomba
 n_portones = st.sidebar.number_input("Portones Eléctricos", value=5)
+hp_porton = st.sidebar.number_input("HP por Portón (120V)", value=0.5)
+watts_porton, _ = calc_motor_bomba(hp_porton, 120)
 
 # --- CÁLCULOS ---
 
@@ -97,6 +106,15 @@ load_std, amps_std = calcular_apartamento_estandar(voltage_sys, qty_outlets, wat
 load_ph = (qty_outlets * 180 * factor_ph) + watts_cocina + watts_lavado + watts_refri + watts_calentador + watts_jacuzzi
 amps_ph = load_ph / voltage_sys
 
+# 2b. Carga calculada NEC 220.84(C) de cada tipo de unidad (base del factor multifamiliar). Sin áreas en la
+# barra lateral, la iluminación de (C)(1) se estima con salidas x 180 VA en lugar de 3 VA/pie².
+calc_std, calc_ph = carga_calculada_220_84(
+    salidas=np.array([qty_outlets, qty_outlets * factor_ph]),
+    watts_equipos=np.array([[watts_cocina, watts_lavado, watts_refri, watts_calentador, 0],
+                            [watts_cocina, watts_lavado, watts_refri, watts_calentador, watts_jacuzzi]]),
+    equipos=["cocina", "lavado", "refri", "calentador", "jacuzzi"],
+)
+
 # 3. Áreas Comunes
 datos_comunes = {
     'tomas_pasillo': tomas_pasillo,
@@ -104,7 +122,8 @@ datos_comunes = {
     'bombas_watts': watts_bombas,
     'luces_parqueo': 13,
     'watts_por_luz': 50, # LED
-    'portones': n_portones
+    'portones': n_portones,
+    'watts_porton': watts_porton
 }
 load_common, detalles_common = calcular_areas_comunes(datos_comunes)
 
@@ -132,28 +151,45 @@ with col1:
 
 with col2:
     st.subheader("📉 Carga Estimada con Factores de Demanda")
-    st.info("El CSCR permite no sumar el 100% de todo. Aplicando una estimación típica para multifamiliares:")
-    
-    # Cálculo simplificado de demanda (Simulación)
-    # 100% de las cargas mayores (Ascensor, Bombas, Jacuzzi)
-    # 35% de la iluminación general y tomas (excedente de 3000VA)
-    # Factor de coincidencia para cocinas (aprox 40-50% para 13 unidades)
-    
-    carga_motores = watts_ascensor + watts_bombas + (n_portones*300)
-    carga_cocinas_total = watts_cocina * 13
-    demanda_cocinas = carga_cocinas_total * 0.40 # NEC Tabla 220.55 col C aprox
-    
-    carga_resto = total_instalado - carga_motores - carga_cocinas_total
-    demanda_resto = 3000 + (carga_resto - 3000) * 0.35
-    
-    total_demanda = carga_motores + demanda_cocinas + demanda_resto
+    st.info("NEC/CSCR 220.84 (método opcional para multifamiliares con 3 o más unidades con cocina eléctrica): "
+            "la carga calculada de 220.84(C) de cada unidad (salidas x 180 VA, 1500 VA por los 2 ramales de pequeños artefactos "
+            "y el de lavandería, placa de los equipos) se multiplica por el factor de la tabla según la cantidad de unidades.")
+    
+    # Unidades (estándar + PH): carga calculada 220.84(C) x factor de la Tabla 220.84
+    # Áreas comunes (ascensor, bombas, pasillos): cargas de la casa, se suman al 100%
+    es_unidad = df["Unidad"] != "Áreas Comunes"
+    n_unidades = int(df.loc[es_unidad, "Cantidad"].sum())
+    factor_220_84 = factor_demanda_multifamiliar(n_unidades)
+    carga_calculada_unidades = np.array([calc_std, calc_ph])
+    demanda_unidades = (carga_calculada_unidades * df.loc[es_unidad, "Cantidad"].to_numpy()).sum() * factor_220_84
+    
+    total_demanda = demanda_unidades + load_common
     amps_demanda = total_demanda / voltage_sys
     
+    st.metric(label=f"Factor 220.84 ({n_unidades} unidades)", value=f"{factor_220_84:.0%}")
     st.metric(label="Demanda Real Estimada (kVA)", value=f"{total_demanda/1000:,.2f} kVA")
     st.metric(label="Amperaje Acometida Principal (Estimado)", value=f"{amps_demanda:,.1f} A")
+    st.metric(label="Breaker Principal (125% Carga Continua)", value=formatear_breaker(seleccionar_breaker_comercial(amps_demanda)))
     
-    if amps_demanda > 400:
+    if amps_demanda > BREAKERS_COMERCIALES[-1]:
         st.warning("⚠️ La demanda supera los 400A. Probablemente requieras Transformador propio o TC (Transformadores de Corriente) en la medición.")
+    
+    # Balance de fases: unidades (2 polos, al factor 220.84) y circuitos comunes repartidos por el optimizador
+    cargas_fase = np.concatenate([
+        np.repeat(carga_calculada_unidades * factor_220_84, df.loc[es_unidad, "Cantidad"].to_numpy()),
+        [watts_ascensor], np.full(int(n_bombas), watts_bomba),
+        [tomas_pasillo * 180, datos_comunes['luces_parqueo'] * datos_comunes['watts_por_luz'], n_portones * watts_porton + 150],
+    ])
+    polos_fase = np.concatenate([np.full(n_unidades, 2), [2], np.full(int(n_bombas), 2), [1, 1, 1]])
+    balance = balancear_fases(cargas_fase, polos_fase, voltage_sys)
+    _, neutro_alternado = corrientes_por_fase(cargas_fase, asignacion_alternada(polos_fase, voltage_sys), voltage_sys)
+    
+    st.markdown("**Corriente por Fase (asignación optimizada)**")
+    cols_fase = st.columns(len(balance["fases"]) + 1)
+    for col, fase, amps in zip(cols_fase, balance["fases"], balance["corrientes"]):
+        col.metric(f"Fase {fase}", f"{amps:,.1f} A")
+    cols_fase[-1].metric("Neutro", f"{balance['neutro']:,.1f} A", delta=f"{balance['neutro'] - neutro_alternado:,.1f} A vs alternado", delta_color="inverse")
+    st.caption(f"Breaker principal por fase más cargada (125%): {formatear_breaker(seleccionar_breaker_comercial(balance['corrientes'].max()))}")
 
 # --- RECOMENDACIONES ---
 st.markdown("---")
@@ -170,7 +206,12 @@ with rec_col1:
     st.write("Se recomienda sistema **dúplex alternado**. Si una falla, la otra entra. Deben tener protecciones térmicas independientes.")
 
     st.markdown("**2. Balanceo de Fases**")
-    st.write("Al conectar los 13 medidores en el panel principal, asegúrate de distribuir: Apto 1 (L1-L2), Apto 2 (L2-L1), etc. para que el neutro no se sobrecargue.")
+    st.write("Conecta los medidores y circuitos comunes según la asignación optimizada para que el neutro no se sobrecargue:")
+    st.dataframe(pd.DataFrame({
+        "Carga": [f"Apto {i + 1}" for i in range(n_unidades)] + ["Ascensor"] + [f"Bomba {i + 1}" for i in range(int(n_bombas))]
+                 + ["Tomas Pasillo", "Luces Parqueo", "Portones y Malla"],
+        "Conexión": balance["nombres_conexion"],
+    }), hide_index=True)
 
 with rec_col2:
     st.markdown("**3. Protecciones Eléctricas**")
@@ -1,9 +1,21 @@
 import streamlit as st
 import pandas as pd
 import math
+import numpy as np
+
+from motor_electrico import (
+    ANTIGUEDAD_MAXIMA_PERFILES_H, RUTA_CATALOGO_HARDWARE, RUTA_EDIFICIO_EJEMPLO, VA_CIRCUITO_GENERAL,
+    asignacion_alternada, balancear_fases, calc_motor_bomba, calcular_edificio, cargas_para_perfiles,
+    circuitos_unidades, configuracion_hardware, corriente_cortocircuito, corrientes_por_fase, dimensionar_conductores,
+    dimensionar_motores, dimensionar_unidades, edificio_sintetico, factor_demanda_multifamiliar, formatear_breaker,
+    formatear_conductor, generar_cuadros, leer_catalogo_hardware, leer_edificio, limpiar_perfiles_temporales,
+    riesgo_disparo, seleccionar_breaker_comercial, simular_perfiles_anuales,
+)
+from perfilador import obtener_perfilador, panel_perfilado
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Ingeniería Eléctrica Condominio - Master V3", layout="wide", initial_sidebar_state="expanded")
+perfil = obtener_perfilador("electrico_v3")
 
 # --- ESTILOS CSS PARA INGENIERÍA ---
 st.markdown("""
@@ -15,52 +27,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- FUNCIONES DE CÁLCULO NORMATIVO (NEC/CSCR) ---
-
-def seleccionar_breaker_comercial(amperios_requeridos, tipo="main"):
-    """
-    Selecciona el breaker comercial inmediatamente superior.
-    Para cargas continuas, se asume que el input ya viene mayorado al 125% o se aplica aquí.
-    """
-    # Lista estándar de breakers comerciales (Amps)
-    comerciales = [15, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 125, 150, 175, 200, 225, 250, 300, 400]
-    
-    # Regla de seguridad: El breaker no debe operar a más del 80% de su capacidad en carga continua
-    # O bien, la capacidad debe ser 125% de la carga continua.
-    capacidad_target = amperios_requeridos * 1.25 
-    
-    for b in comerciales:
-        if b >= capacidad_target:
-            return b
-    return ">400A (Req. Estudio Especial)"
-
-def calc_demanda_iluminacion(watts_totales):
-    """
-    NEC 220.42: Primeros 3000VA al 100%, resto al 35% (para vivienda).
-    """
-    if watts_totales <= 3000:
-        return watts_totales
-    else:
-        return 3000 + ((watts_totales - 3000) * 0.35)
-
-def calc_motor_bomba(hp, voltaje, es_motor_mayor=False):
-    """
-    Estima watts y aplica factor NEC 430.24 (125% al motor mayor).
-    1 HP approx 746W (mecánico) -> ~1000W-1200W eléctrico (eficiencia/fp).
-    Usamos tablas NEC 430.248 aprox para monofásico 230V: 1.5HP = 10A.
-    """
-    # Estimación conservadora basada en amperaje de tabla NEC
-    if voltaje == 208:
-        amps_tabla = {1: 8.8, 1.5: 11.0, 2: 13.2, 3: 18.7}
-    else: # 230V/240V
-        amps_tabla = {1: 8.0, 1.5: 10.0, 2: 12.0, 3: 17.0}
-    
-    amps = amps_tabla.get(hp, hp * 7) # fallback
-    watts_reales = amps * voltaje
-    
-    factor = 1.25 if es_motor_mayor else 1.0
-    return watts_reales, watts_reales * factor
-
 # --- INTERFAZ DE USUARIO ---
 
 st.title("⚡ Diseño Maestro de Cargas: Condominio Nunciatura")
@@ -99,61 +65,130 @@ with st.sidebar:
         ac_luces_pasillo = st.number_input("Tomas/Luces Pasillos (Total W)", 2000)
         ac_luces_parqueo = st.number_input("Luces Parqueo (Total W)", 1000)
         ac_portones = st.number_input("Cantidad Portones Eléctricos", 5)
+        ac_porton_hp = st.number_input("HP por Portón", 0.5, help="Motor monofásico a 120V")
         ac_bombas_qty = st.number_input("Cantidad Bombas Agua", 2)
         ac_bombas_hp = st.number_input("HP por Bomba", 1.5)
-        ac_ascensor = st.number_input("Ascensor (Watts)", 7500, help="Verificar si es trifásico. Aquí asumimos monofásico para carga.")
+        ac_ascensor_hp = st.number_input("Ascensor (HP)", 7.5, help="Potencia de placa del motor de tracción")
+        ac_ascensor_trifasico = st.checkbox("Ascensor Trifásico", value=False, disabled=voltaje != 208,
+                                            help="Solo con servicio 208Y/120V. En 120/240V el ascensor es monofásico.")
         ac_malla = st.number_input("Malla Eléctrica (Watts)", 100, help="Consumo bajo, requiere circuito dedicado")
 
     st.header("5. Hardware Comprado (Cotización)")
     hw_slots = st.number_input("Espacios Medidor (EZM)", value=12)
     hw_breaker_amp = st.selectbox("Amperaje Breakers Comprados", [70, 100, 125], index=1)
 
+    st.header("6. Conductores (NEC 310.16)")
+    with st.expander("Canalización y Recorridos"):
+        material_conductor = st.selectbox("Material", ["cu", "al"], format_func={"cu": "Cobre", "al": "Aluminio"}.get)
+        temp_aislamiento = st.selectbox("Aislamiento (°C)", [75, 90], help="THHN/THWN-2 = 90°C; terminales a 75°C")
+        temp_ambiente = st.number_input("Temperatura Ambiente (°C)", 10, 60, 30)
+        portadores = st.number_input("Conductores Portadores por Tubo", 2, 50, 3)
+        caida_max_pct = st.number_input("Caída de Tensión Máx. (%)", 1.0, 5.0, 3.0, step=0.5)
+        altura_piso = st.number_input("Altura por Piso (m)", 2.5, 6.0, 3.0)
+        recorrido_horizontal = st.number_input("Recorrido Horizontal a Unidad (m)", 1, 200, 15)
+        longitud_torre = st.number_input("Alimentador por Torre (m)", 1, 500, 40)
+        longitud_comunes = st.number_input("Circuitos Áreas Comunes (m)", 1, 300, 30)
+
+    st.header("7. Cortocircuito (Punto a Punto)")
+    with st.expander("Transformador y Capacidad Interruptiva"):
+        kva_transformador = st.number_input("Transformador (kVA)", 10, 5000, 300 if voltaje == 208 else 167,
+                                            help="Trifásico con 208Y/120V, monofásico con 120/240V")
+        z_transformador = st.number_input("Impedancia Transformador (%Z)", 1.0, 10.0, 4.5 if voltaje == 208 else 2.0, step=0.1)
+        longitud_secundario = st.number_input("Secundario a Principal (m)", 1, 300, 10)
+        canalizacion = st.selectbox("Canalización", ["no_magnetico", "acero"],
+                                    format_func={"no_magnetico": "PVC / No magnética", "acero": "Tubo de acero"}.get)
+        aic_principal = st.number_input("AIC Principal (kA)", 5, 200, 65)
+        aic_alimentador = st.number_input("AIC Alimentadores de Torre (kA)", 5, 200, 25)
+        aic_centro_carga = st.number_input("AIC Centros de Carga (kA)", 5, 200, 10, help="Breaker principal de cada panel de unidad y del panel común")
+
+perfil.marcar("entradas (sidebar)")
+
+parametros_conductor = dict(material=material_conductor, temperatura_aislamiento=temp_aislamiento, temperatura_ambiente=temp_ambiente,
+                            conductores_portadores=portadores, caida_maxima=caida_max_pct / 100)
+
 # ---------------- LÓGICA DE CÁLCULO ----------------
 
-# A. CÁLCULO APARTAMENTO ESTÁNDAR
-# Carga Instalada
-w_std_ilum = std_outlets * 180 # 180VA por salida según NEC
-w_std_total_instalada = w_std_ilum + std_cocina + std_lavado + std_refri + std_heater + std_micro
-
-# Carga Demandada (Simplificada Método Estándar)
-# 1. Iluminación
-dem_std_ilum = calc_demanda_iluminacion(w_std_ilum)
-# 2. Cocina (NEC permite factores, usaremos 80% conservador para 1 unidad unitaria o 100% seguridad)
-dem_std_cocina = std_cocina * 0.8 
-# 3. Resto al 100% para cálculo de acometida individual
-dem_std_total = dem_std_ilum + dem_std_cocina + std_lavado + std_refri + std_heater + std_micro
-amp_std_demanda = dem_std_total / voltaje
-breaker_std_recomendado = seleccionar_breaker_comercial(amp_std_demanda)
-
-# B. CÁLCULO PENTHOUSE
-w_ph_ilum = (std_outlets * ph_factor) * 180
-w_ph_total_instalada = w_ph_ilum + std_cocina + std_lavado + std_refri + std_heater + ph_jacuzzi + ph_ac
-# Demanda
-dem_ph_ilum = calc_demanda_iluminacion(w_ph_ilum)
-dem_ph_total = dem_ph_ilum + (std_cocina * 0.8) + std_lavado + std_refri + std_heater + ph_jacuzzi + ph_ac
-amp_ph_demanda = dem_ph_total / voltaje
-breaker_ph_recomendado = seleccionar_breaker_comercial(amp_ph_demanda)
+# A/B. APARTAMENTO ESTÁNDAR Y PENTHOUSE (un solo llamado vectorizado: fila 0 = estándar, fila 1 = PH)
+# Carga instalada: 180VA por salida según NEC + equipos.
+# Carga demandada (método estándar simplificado): iluminación NEC 220.42, cocina al 80% (NEC permite
+# factores; conservador para 1 unidad) y el resto al 100% para el cálculo de acometida individual.
+unidades = dimensionar_unidades(
+    salidas=np.array([std_outlets, std_outlets * ph_factor]),
+    cocina=std_cocina,
+    otras_cargas=np.array([std_lavado + std_refri + std_heater + std_micro,
+                           std_lavado + std_refri + std_heater + ph_jacuzzi + ph_ac]),
+    voltaje=voltaje,
+)
+w_std_total_instalada, w_ph_total_instalada = unidades["carga_instalada"]
+amp_std_demanda, amp_ph_demanda = unidades["amperios"]
+breaker_std_recomendado, breaker_ph_recomendado = unidades["breaker"]
 
-# C. CÁLCULO ÁREAS COMUNES (PANEL SEPARADO)
-# Motores
-w_bomba_real, w_bomba_demanda = calc_motor_bomba(ac_bombas_hp, voltaje, es_motor_mayor=True)
-# Si hay 2 bombas, se asume alternancia o simultaneidad. Diseñamos para simultaneidad (peor caso)
-# Bomba 1 (125%) + Bomba 2 (100%)
-demanda_bombas = w_bomba_demanda + (w_bomba_real * (ac_bombas_qty - 1))
+# B2. RIESGO DE DISPARO (MONTE CARLO, 1M INSTANTES POR TIPO)
+# Estados encendido/apagado y duraciones de cada equipo según datos/perfiles_equipos.csv
+riesgo_disparo_cache = st.cache_data(max_entries=16)(riesgo_disparo)
+equipos_riesgo = ["iluminacion", "cocina", "lavado", "refri", "calentador", "microondas", "jacuzzi", "ac"]
+watts_riesgo = np.array([
+    [unidades["watts_iluminacion"][0], std_cocina, std_lavado, std_refri, std_heater, std_micro, 0, 0],
+    [unidades["watts_iluminacion"][1], std_cocina, std_lavado, std_refri, std_heater, 0, ph_jacuzzi, ph_ac],
+])
+breakers_candidatos = np.unique([b for b in [60, 70, 80, 90, 100, 125, 150, hw_breaker_amp, breaker_std_recomendado,
+                                             breaker_ph_recomendado] if np.isfinite(b)])
+with perfil.etapa("monte carlo disparos"):
+    riesgo = riesgo_disparo_cache(watts_riesgo, equipos_riesgo, breakers_candidatos, voltaje, semilla=0)
+indice_hw = int(np.flatnonzero(breakers_candidatos == hw_breaker_amp)[0])
+disparos_std_hw, disparos_ph_hw = riesgo["disparos_anuales"][:, indice_hw]
 
-# Portones (Motores pequeños, ~300W c/u)
-demanda_portones = ac_portones * 300 
+# C. CÁLCULO ÁREAS COMUNES (PANEL SEPARADO)
+# Motores (NEC 430): ascensor, bombas y portones forman un solo grupo del panel común.
+# FLC de tablas 430.248/430.250, protección de cada ramal por 430.52 y alimentador por 430.24/430.62.
+n_bombas = int(ac_bombas_qty)
+n_portones = int(ac_portones)
+fases_ascensor = 3 if ac_ascensor_trifasico and voltaje == 208 else 1
+nombres_motores = ["Ascensor"] + [f"Bomba {i + 1}" for i in range(n_bombas)] + [f"Portón {i + 1}" for i in range(n_portones)]
+motores_comunes = dimensionar_motores(
+    hp=np.array([ac_ascensor_hp] + [ac_bombas_hp] * n_bombas + [ac_porton_hp] * n_portones),
+    voltaje=np.array([voltaje] * (1 + n_bombas) + [120] * n_portones),
+    fases=np.array([fases_ascensor] + [1] * (n_bombas + n_portones)),
+    otras_cargas_a=(ac_luces_pasillo + ac_luces_parqueo + ac_malla) / voltaje,
+)
+ac_ascensor = motores_comunes["va"][0]
+w_bomba_real, _ = calc_motor_bomba(ac_bombas_hp, voltaje)
+demanda_portones = motores_comunes["va"][1 + n_bombas:].sum()
+# 430.24 en VA (mezcla motores de 120V y de voltaje de línea): motor mayor al 125% + demás al 100%
+demanda_motores = motores_comunes["va_alimentador"][0]
 
 # Total Común
-demanda_comun_total = demanda_bombas + demanda_portones + ac_luces_pasillo + ac_luces_parqueo + ac_ascensor + ac_malla
+demanda_comun_total = demanda_motores + ac_luces_pasillo + ac_luces_parqueo + ac_malla
 amp_comun_demanda = demanda_comun_total / voltaje
 breaker_comun_recomendado = seleccionar_breaker_comercial(amp_comun_demanda)
 
+# Cuadro de carga del panel común: un ramal por motor (430.52), luces en circuitos de 20A (1920 VA al 80%),
+# malla en 15A dedicado y tomas de servicio en 20A. Se empacan en el centro de carga balanceando fases.
+n_luces_pasillo = max(1, math.ceil(ac_luces_pasillo / VA_CIRCUITO_GENERAL))
+n_luces_parqueo = max(1, math.ceil(ac_luces_parqueo / VA_CIRCUITO_GENERAL))
+n_circuitos_comunes = len(nombres_motores) + n_luces_pasillo + n_luces_parqueo + 2
+cuadro_comun, resumen_comun = generar_cuadros(
+    tablero=np.zeros(n_circuitos_comunes, dtype=int),
+    descripcion=np.array(nombres_motores + [f"Luces Pasillos {i + 1}" for i in range(n_luces_pasillo)]
+                         + [f"Luces Parqueo {i + 1}" for i in range(n_luces_parqueo)] + ["Malla Seguridad", "Tomacorrientes Servicio"]),
+    polos=np.concatenate([[fases_ascensor if fases_ascensor == 3 else 2], np.full(n_bombas, 2), np.ones(n_portones + n_luces_pasillo
+                                                                                                      + n_luces_parqueo + 2)]).astype(int),
+    va=np.concatenate([motores_comunes["va"], np.full(n_luces_pasillo, ac_luces_pasillo / n_luces_pasillo),
+                       np.full(n_luces_parqueo, ac_luces_parqueo / n_luces_parqueo), [ac_malla, 1500]]),
+    breaker=np.concatenate([motores_comunes["proteccion_ramal"], np.full(n_luces_pasillo + n_luces_parqueo, 20.0), [15.0, 20.0]]),
+    voltaje=voltaje,
+    nombres_tableros=np.array(["Áreas Comunes"]),
+)
+espacios_comunes = int(resumen_comun["Centro de Carga (espacios)"].iloc[0])
+
+
+perfil.marcar("cálculo")
 
 # ---------------- VISUALIZACIÓN DE RESULTADOS ----------------
 
 # TABS PARA ORGANIZAR LA INFORMACIÓN
-tab1, tab2, tab3 = st.tabs(["📊 Análisis Panel Principal", "🏗️ Áreas Comunes (Detalle)", "📜 Normativa & Hardware"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Análisis Panel Principal", "🏗️ Áreas Comunes (Detalle)", "📜 Normativa & Hardware",
+                                        "🏢 Edificio (NEC 220.84)", "📈 Perfil Anual (8760)"])
 
 with tab1:
     st.subheader("Balance de Cargas y Breakers (Apartamentos)")
@@ -167,11 +202,12 @@ with tab1:
         st.metric("Demanda Estimada", f"{amp_std_demanda:.1f} A")
         
         if breaker_std_recomendado > hw_breaker_amp:
-            st.error(f"Breaker Req: {breaker_std_recomendado}A")
+            st.error(f"Breaker Req: {formatear_breaker(breaker_std_recomendado)}")
             st.caption(f"⚠️ El breaker comprado de {hw_breaker_amp}A es insuficiente.")
         else:
-            st.success(f"Breaker Req: {breaker_std_recomendado}A")
+            st.success(f"Breaker Req: {formatear_breaker(breaker_std_recomendado)}")
             st.caption(f"✅ El de {hw_breaker_amp}A funciona.")
+        st.caption(f"🎲 Monte Carlo: {disparos_std_hw:.2f} disparos/año esperados con {hw_breaker_amp}A.")
 
     # DATOS PENTHOUSE
     with col2:
@@ -180,10 +216,12 @@ with tab1:
         st.metric("Demanda Estimada", f"{amp_ph_demanda:.1f} A")
         
         if breaker_ph_recomendado > hw_breaker_amp:
-            st.warning(f"Breaker Req: {breaker_ph_recomendado}A")
-            st.write(f"⚠️ **ATENCIÓN:** El PH necesita un breaker de **{breaker_ph_recomendado}A**. El de {hw_breaker_amp}A de la cotización se disparará si usan Jacuzzi + Cocina + AC.")
+            st.warning(f"Breaker Req: {formatear_breaker(breaker_ph_recomendado)}")
+            st.write(f"⚠️ **ATENCIÓN:** El PH necesita un breaker de **{formatear_breaker(breaker_ph_recomendado)}**. El de {hw_breaker_amp}A de la cotización se disparará si usan Jacuzzi + Cocina + AC.")
         else:
-            st.success(f"Breaker Req: {breaker_ph_recomendado}A")
+            st.success(f"Breaker Req: {formatear_breaker(breaker_ph_recomendado)}")
+        st.caption(f"🎲 Monte Carlo: {disparos_ph_hw:.2f} disparos/año esperados con {hw_breaker_amp}A "
+                   f"(P(sobrecarga) = {riesgo['prob_sobrecarga'][1, indice_hw]:.4%} del tiempo).")
 
     # RESUMEN TOTAL
     with col3:
@@ -206,6 +244,22 @@ with tab1:
         else:
             st.success("Hardware suficiente en espacios.")
 
+    st.markdown("#### 🎲 Riesgo de Disparo por Breaker Candidato (Monte Carlo)")
+    st.caption("1.000.000 de instantes aleatorios del año por tipo de unidad: cada equipo encendido o apagado según su hora, "
+               "día y temporada, con duración restante aleatoria. Dispara si la sobrecarga dura más que la curva térmica del breaker.")
+    filas_riesgo = []
+    for t, tipo in enumerate(["Apto Estándar", "Penthouse"]):
+        p50, p99, p999, maximo = riesgo["percentiles_corriente"][t]
+        for b, breaker in enumerate(breakers_candidatos):
+            filas_riesgo.append({"Tipo": tipo, "Breaker": f"{breaker:.0f}A", "P(sobrecarga)": riesgo["prob_sobrecarga"][t, b],
+                                 "P(disparo)": riesgo["prob_disparo"][t, b], "Disparos/Año": riesgo["disparos_anuales"][t, b],
+                                 "Corriente p99.9 (A)": p999, "Corriente Máx. (A)": maximo})
+    st.dataframe(pd.DataFrame(filas_riesgo).style.format({"P(sobrecarga)": "{:.4%}", "P(disparo)": "{:.4%}", "Disparos/Año": "{:.2f}",
+                                                          "Corriente p99.9 (A)": "{:.1f}", "Corriente Máx. (A)": "{:.1f}"}),
+                 hide_index=True)
+
+perfil.marcar("pestaña Panel Principal")
+
 with tab2:
     st.subheader("Diseño del Panel de Áreas Comunes (Independiente)")
     st.markdown("Este panel debe ir conectado a un medidor independiente, fuera del banco principal si no hay espacio.")
@@ -214,28 +268,70 @@ with tab2:
     
     with c_comun1:
         st.info(f"**Carga Total Demandada:** {demanda_comun_total/1000:.2f} kVA")
-        st.error(f"**Breaker Principal Requerido:** {breaker_comun_recomendado} A ({voltaje}V)")
+        st.error(f"**Breaker Principal Requerido:** {formatear_breaker(breaker_comun_recomendado)} ({voltaje}V)")
         st.caption("Este breaker protege la acometida del medidor de áreas comunes.")
 
     with c_comun2:
         st.markdown("#### 🛠️ Distribución de Circuitos Recomendada (Sub-panel)")
-        st.markdown("Se recomienda instalar un **Centro de Carga de 8 a 12 espacios** para áreas comunes con los siguientes breakers:")
+        st.markdown(f"Se recomienda instalar un **Centro de Carga de {espacios_comunes} espacios** para áreas comunes "
+                    f"({int(resumen_comun['Espacios Usados'].iloc[0])} usados + reserva) con los siguientes breakers:")
         
+        # Motores: un breaker por motor (430.52), el conductor se dimensiona por FLC x 125% (430.22)
+        prot_bomba = motores_comunes["proteccion_ramal"][1] if n_bombas else 0
+        prot_porton = motores_comunes["proteccion_ramal"][-1] if n_portones else 0
         data_circuitos = {
             "Circuito": ["Ascensor", "Bombas de Agua (Dúplex)", "Portones Eléctricos", "Luces Pasillos/Parqueo", "Malla Seguridad", "Tomacorrientes Servicio"],
             "Carga (Watts)": [ac_ascensor, w_bomba_real*ac_bombas_qty, demanda_portones, ac_luces_pasillo+ac_luces_parqueo, ac_malla, 1500],
-            "Polos": [2, 2, 1, 1, 1, 1],
+            "Polos": [fases_ascensor if fases_ascensor == 3 else 2, 2, 1, 1, 1, 1],
             "Breaker Sugerido": [
-                f"{seleccionar_breaker_comercial(ac_ascensor/voltaje)}A (Verificar motor)", 
-                f"{seleccionar_breaker_comercial((w_bomba_real*ac_bombas_qty)/voltaje)}A", 
-                "20A", 
+                f"{motores_comunes['proteccion_ramal'][0]:.0f}A (430.52)",
+                f"{n_bombas}x {prot_bomba:.0f}A",
+                f"{n_portones}x {prot_porton:.0f}A",
                 "20A", 
                 "15A", 
                 "20A"
             ]
         }
-        st.dataframe(pd.DataFrame(data_circuitos), hide_index=True)
-        st.warning("**Nota Ascensor:** Si el ascensor es trifásico, requerirá un banco de medidores trifásico totalmente distinto. Si es monofásico (220V), usar recomendación anterior.")
+        # Conductor de cada circuito: 2-3 polos a voltaje de línea, 1 polo a 120V; motores con la FLC de un motor
+        voltaje_circuitos = np.where(np.array(data_circuitos["Polos"]) >= 2, voltaje, 120)
+        amps_circuitos = np.array(data_circuitos["Carga (Watts)"], dtype=float) / voltaje_circuitos
+        amps_circuitos[:3] = [motores_comunes["flc"][0], motores_comunes["flc"][1] if n_bombas else 0,
+                              motores_comunes["flc"][-1] if n_portones else 0]
+        breakers_circuitos = np.array([np.inf, np.inf, np.inf, 20, 15, 20])  # 430.52 permite ramal de motor sobre la ampacidad
+        conductores_comunes = dimensionar_conductores(amps_circuitos, longitud_comunes, voltaje_circuitos,
+                                                      fases=np.where(np.array(data_circuitos["Polos"]) == 3, 3, 1),
+                                                      breakers=breakers_circuitos, **parametros_conductor)
+        with perfil.etapa("render: dataframe"):
+            st.dataframe(pd.DataFrame({
+                **data_circuitos,
+                "Conductor": [formatear_conductor(c, n, material_conductor) for c, n in
+                              zip(conductores_comunes["calibre"], conductores_comunes["conductores_paralelo"])],
+                "Caída %": conductores_comunes["caida_pct"].round(2),
+            }), hide_index=True)
+        if fases_ascensor == 3:
+            st.info("**Ascensor trifásico:** alimentado desde el servicio 208Y/120V; su FLC es de la Tabla 430.250.")
+        else:
+            st.warning("**Nota Ascensor:** Si el ascensor es trifásico, requerirá un banco de medidores trifásico totalmente distinto. Si es monofásico (220V), usar recomendación anterior.")
+
+        st.markdown("#### 📋 Cuadro de Carga del Panel Común")
+        st.dataframe(cuadro_comun.drop(columns="Tablero"), hide_index=True)
+        corrientes_comun = resumen_comun.filter(like="Fase").iloc[0]
+        st.caption("Fases del panel: " + ", ".join(f"{fase.removesuffix(' (A)')} {amps:.1f} A" for fase, amps in corrientes_comun.items())
+                   + f". Desbalance: {resumen_comun['Desbalance (A)'].iloc[0]:.1f} A.")
+
+        st.markdown("#### ⚙️ Motores (NEC 430)")
+        st.dataframe(pd.DataFrame({
+            "Motor": nombres_motores,
+            "FLC (A)": motores_comunes["flc"],
+            "Conductor Ramal ≥ (A)": motores_comunes["conductor_ramal_a"],
+            "Sobrecarga (A)": motores_comunes["sobrecarga_a"],
+            "Protección Ramal": [f"{b:.0f}A" for b in motores_comunes["proteccion_ramal"]],
+        }).style.format({"FLC (A)": "{:.1f}", "Conductor Ramal ≥ (A)": "{:.1f}", "Sobrecarga (A)": "{:.1f}"}), hide_index=True)
+        st.caption(f"Alimentador (430.24): {motores_comunes['amperios_alimentador'][0]:.1f} A con el motor mayor "
+                   f"({nombres_motores[motores_comunes['motor_mayor'][0]]}) al 125%. Protección máxima del alimentador (430.62): "
+                   f"{motores_comunes['proteccion_alimentador'][0]:.0f}A.")
+
+perfil.marcar("pestaña Áreas Comunes")
 
 with tab3:
     st.subheader("Referencias Normativas y Hardware")
@@ -256,4 +352,366 @@ with tab3:
     2.  **Apartamento 13:** Instalar una base de medidor individual (Tipo 100A redonda) adyacente al banco principal.
     3.  **Áreas Comunes:** Instalar base de medidor individual (Tipo 100A o 200A según cálculo en Tab 2) adyacente.
     4.  **Penthouse:** Si la carga calculada en la Tab 1 supera los 80A, **sustituir** el breaker QDP de 100A por uno de **125A** (Modelo QDP22125TM) en el módulo EZM.
-    """)
\ No newline at end of file
+    """)
+
+perfil.marcar("pestaña Normativa")
+
+
+def tabla_desde_barra_lateral():
+    """
+    Tabla de unidades equivalente a los datos de la barra lateral: cant_apt_std apartamentos estándar
+    y el penthouse, en una sola torre, 4 apartamentos por piso.
+    """
+    filas = [{"unidad": f"Apto {i + 1}", "torre": "Torre A", "piso": i // 4 + 1, "salidas": std_outlets,
+              "w_cocina": std_cocina, "w_lavado": std_lavado, "w_refri": std_refri, "w_calentador": std_heater,
+              "w_microondas": std_micro, "w_jacuzzi": 0, "w_ac": 0} for i in range(int(cant_apt_std))]
+    filas.append({"unidad": "Penthouse", "torre": "Torre A", "piso": int(cant_apt_std) // 4 + 1, "salidas": std_outlets * ph_factor,
+                  "w_cocina": std_cocina, "w_lavado": std_lavado, "w_refri": std_refri, "w_calentador": std_heater,
+                  "w_microondas": 0, "w_jacuzzi": ph_jacuzzi, "w_ac": ph_ac})
+    return pd.DataFrame(filas)
+
+
+edificio_sintetico_cache = st.cache_data(max_entries=8)(edificio_sintetico)
+balancear_fases_cache = st.cache_data(max_entries=16)(balancear_fases)
+# El resultado guarda la ruta de su archivo de perfiles: la caché no debe durar más que el archivo
+simular_perfiles_cache = st.cache_data(max_entries=4, ttl=ANTIGUEDAD_MAXIMA_PERFILES_H * 3600)(simular_perfiles_anuales)
+generar_cuadros_cache = st.cache_data(max_entries=8)(generar_cuadros)
+configuracion_hardware_cache = st.cache_data(max_entries=16)(configuracion_hardware)
+corriente_cortocircuito_cache = st.cache_data(max_entries=16)(corriente_cortocircuito)
+
+with tab4:
+    st.subheader("Modelo del Edificio Unidad por Unidad")
+    st.markdown("Cada fila es un apartamento (torre, piso, salidas, `area_m2` opcional y watts de placa de cada equipo `w_*`). "
+                "Los alimentadores por torre y la acometida general aplican la **Tabla 220.84** según la cantidad de unidades servidas "
+                "a la carga calculada de **220.84(C)**: 3 VA/pie², 1500 VA por los 2 ramales de pequeños artefactos y el de lavandería, "
+                "placa de los equipos y el mayor entre calefacción y A/C. Las filas sin área estiman la iluminación con salidas x 180 VA. "
+                "Cada unidad conserva su cálculo individual para el breaker del medidor.")
+
+    fuente = st.radio("Origen de las unidades", ["Barra lateral (Estándar + PH)", "Archivo CSV", "Proyecto sintético"], horizontal=True)
+    if fuente == "Archivo CSV":
+        archivo = st.file_uploader("Tabla de unidades (CSV)", type="csv", help=f"Formato de ejemplo: datos/{RUTA_EDIFICIO_EJEMPLO.name}")
+        tabla_unidades = pd.read_csv(archivo if archivo is not None else RUTA_EDIFICIO_EJEMPLO)
+    elif fuente == "Proyecto sintético":
+        c_sint1, c_sint2, c_sint3 = st.columns(3)
+        n_unidades_sint = c_sint1.number_input("Unidades", 3, 100000, 2000, step=100)
+        n_torres_sint = c_sint2.number_input("Torres", 1, 50, 4)
+        semilla_sint = c_sint3.number_input("Semilla", 0, 10000, 7)
+        tabla_unidades = edificio_sintetico_cache(int(n_unidades_sint), int(n_torres_sint), semilla=int(semilla_sint))
+    else:
+        tabla_unidades = tabla_desde_barra_lateral()
+
+    if len(tabla_unidades) <= 200:
+        tabla_unidades = st.data_editor(tabla_unidades, num_rows="dynamic", hide_index=True, key=f"unidades_{fuente}")
+
+    try:
+        edificio = leer_edificio(tabla_unidades)
+    except ValueError as error:
+        st.error(str(error))
+        st.stop()
+
+    with perfil.etapa("cálculo edificio 220.84"):
+        resultado_edificio = calcular_edificio(edificio, voltaje, cargas_comunes_w=demanda_comun_total)
+    acometida = resultado_edificio["acometida"]
+    por_unidad = resultado_edificio["unidades"]
+    suma_individual = por_unidad["demanda"].sum() + demanda_comun_total
+
+    c_edif1, c_edif2, c_edif3, c_edif4 = st.columns(4)
+    c_edif1.metric("Unidades", f"{acometida['unidades']:,}")
+    c_edif2.metric("Carga Calculada (220.84(C))", f"{acometida['carga_calculada']/1000:,.1f} kVA")
+    c_edif3.metric("Demanda Acometida (220.84)", f"{acometida['demanda']/1000:,.1f} kVA",
+                   delta=f"{acometida['demanda'] - suma_individual:,.0f} VA vs suma individual", delta_color="inverse")
+    c_edif4.metric("Corriente Acometida", f"{acometida['amperios']:,.0f} A",
+                   help=f"Factor 220.84: {acometida['factor']:.0%} sobre la carga calculada de las unidades; áreas comunes al 100%.")
+    if acometida["amperios"] * 1.25 > 1200:
+        st.warning(f"La acometida requiere {acometida['amperios'] * 1.25:,.0f} A (125%): supera el main de 1200A de la cotización EZM.")
+
+    st.markdown("#### Balance de Fases del Banco de Medidores")
+    sistema = "208Y/120V trifásico (pares A-B, B-C, C-A)" if voltaje == 208 else "120/240V monofásico (L1-L2)"
+    st.caption(f"Sistema: {sistema}. Cada unidad (2 polos) y cada circuito común se asigna a fase o par de fases; "
+               "las corrientes se suman como fasores. Unidades al factor 220.84, circuitos comunes al 100%.")
+    busqueda_local = st.checkbox("Búsqueda local (movimientos e intercambios)", value=True)
+    cargas_balance = np.concatenate([resultado_edificio["carga_calculada"] * acometida["factor"], data_circuitos["Carga (Watts)"]])
+    polos_balance = np.concatenate([np.full(acometida["unidades"], 2), data_circuitos["Polos"]])
+    with perfil.etapa("balance de fases"):
+        balance = balancear_fases_cache(cargas_balance, polos_balance, voltaje, busqueda_local=busqueda_local)
+    corrientes_alternadas, neutro_alternado = corrientes_por_fase(cargas_balance, asignacion_alternada(polos_balance, voltaje), voltaje)
+
+    columnas_fase = st.columns(len(balance["fases"]) + 2)
+    for col, fase, amps, amps_alt in zip(columnas_fase, balance["fases"], balance["corrientes"], corrientes_alternadas):
+        col.metric(f"Fase {fase}", f"{amps:,.1f} A", delta=f"{amps - amps_alt:,.1f} A vs alternado", delta_color="inverse")
+    columnas_fase[-2].metric("Neutro", f"{balance['neutro']:,.1f} A", delta=f"{balance['neutro'] - neutro_alternado:,.1f} A vs alternado", delta_color="inverse")
+    breaker_por_fase = seleccionar_breaker_comercial(balance["corrientes"].max())
+    columnas_fase[-1].metric("Main por Fase (125%)", formatear_breaker(breaker_por_fase),
+                             help=f"Fase más cargada x 125% = {balance['corrientes'].max() * 1.25:,.0f} A; main EZM de la cotización: 1200A.")
+    if balance["corrientes"].max() * 1.25 > 1200:
+        st.error(f"La fase más cargada requiere {balance['corrientes'].max() * 1.25:,.0f} A: el main de 1200A no alcanza.")
+    else:
+        st.success(f"Fase más cargada a {balance['corrientes'].max() * 1.25:,.0f} A (125%): el main de 1200A alcanza. "
+                   f"Desbalance entre fases: {balance['desbalance']:,.1f} A ({balance['iteraciones']} mejoras de búsqueda local).")
+    with st.expander("Asignación de fases por medidor"):
+        st.dataframe(pd.DataFrame({
+            "Carga": np.concatenate([edificio["unidades"], data_circuitos["Circuito"]]),
+            "Demanda (VA)": cargas_balance.round(0),
+            "Polos": polos_balance,
+            "Conexión": balance["nombres_conexion"],
+        }), hide_index=True)
+
+    # Conductores: unidades (medidor -> apartamento, monofásicas), alimentadores por torre y acometida
+    fases_servicio = 3 if voltaje == 208 else 1
+    torres = resultado_edificio["torres"]
+    with perfil.etapa("conductores"):
+        conductores_unidad = dimensionar_conductores(por_unidad["amperios"], recorrido_horizontal + edificio["pisos"] * altura_piso,
+                                                     voltaje, breakers=por_unidad["breaker"], **parametros_conductor)
+        conductores_torre = dimensionar_conductores(torres["amperios"], longitud_torre, voltaje, fases=fases_servicio, **parametros_conductor)
+        conductor_acometida = dimensionar_conductores(acometida["amperios"], longitud_torre, voltaje, fases=fases_servicio, **parametros_conductor)
+    texto_conductor = lambda r: [formatear_conductor(c, n, material_conductor) for c, n in
+                                 zip(np.ravel(r["calibre"]), np.ravel(r["conductores_paralelo"]))]
+    st.caption(f"Conductor de acometida ({longitud_torre} m): **{texto_conductor(conductor_acometida)[0]}**, "
+               f"caída {float(conductor_acometida['caida_pct']):.2f}%.")
+
+    df_torres = pd.DataFrame({
+        "Torre": torres["torre"],
+        "Unidades": torres["unidades"],
+        "Carga Calculada (kVA)": torres["carga_calculada"] / 1000,
+        "Factor 220.84": torres["factor"],
+        "Demanda (kVA)": torres["demanda"] / 1000,
+        "Corriente (A)": torres["amperios"],
+        "Breaker Alimentador": [formatear_breaker(b) for b in torres["breaker"]],
+        "Conductor": texto_conductor(conductores_torre),
+        "Caída %": conductores_torre["caida_pct"],
+    })
+    st.markdown("#### Alimentadores por Torre")
+    st.dataframe(df_torres.style.format({"Carga Calculada (kVA)": "{:,.1f}", "Factor 220.84": "{:.0%}",
+                                         "Demanda (kVA)": "{:,.1f}", "Corriente (A)": "{:,.0f}", "Caída %": "{:.2f}"}), hide_index=True)
+
+    st.markdown("#### Conductores de Unidades")
+    df_conductores = pd.DataFrame({"Conductor": texto_conductor(conductores_unidad), "Caída %": conductores_unidad["caida_pct"]})
+    st.dataframe(df_conductores.groupby("Conductor", sort=False)["Caída %"].agg(Unidades="size", **{"Caída Máx. %": "max"})
+                 .reset_index().style.format({"Caída Máx. %": "{:.2f}"}), hide_index=True)
+    sin_conductor = int((~conductores_unidad["cumple"]).sum())
+    if sin_conductor:
+        st.error(f"{sin_conductor:,} unidades sin conductor que cumpla ampacidad y caída de tensión dentro de la tabla.")
+
+    st.markdown("#### Cuadros de Carga por Unidad")
+    with perfil.etapa("cuadros de carga"):
+        cuadros_unidades, resumen_cuadros = generar_cuadros_cache(**circuitos_unidades(edificio, voltaje), voltaje=voltaje,
+                                                                  nombres_tableros=edificio["unidades"], monofasico=True)
+    st.caption("Circuitos ramales NEC 210.11(C) y dedicados por equipo, empacados en el centro de carga de cada unidad "
+               "balanceando sus dos fases; reserva del 20% de espacios.")
+    st.dataframe(resumen_cuadros.groupby("Centro de Carga (espacios)").agg(
+        Unidades=("Tablero", "size"), **{"Circuitos Máx.": ("Circuitos", "max"), "Desbalance Máx. (A)": ("Desbalance (A)", "max")})
+        .reset_index().style.format({"Desbalance Máx. (A)": "{:.1f}"}), hide_index=True)
+    unidad_cuadro = st.selectbox("Ver cuadro de la unidad", edificio["unidades"], index=len(edificio["unidades"]) - 1)
+    st.dataframe(cuadros_unidades[cuadros_unidades["Tablero"] == unidad_cuadro].drop(columns="Tablero"), hide_index=True)
+
+    st.markdown("#### Breakers de Medidor por Unidad")
+    breakers_unidad, conteo_breakers = np.unique(por_unidad["breaker"], return_counts=True)
+    st.dataframe(pd.DataFrame({"Breaker": [formatear_breaker(b) for b in breakers_unidad], "Unidades": conteo_breakers}), hide_index=True)
+    excedidas = int((por_unidad["breaker"] > hw_breaker_amp).sum())
+    if excedidas:
+        st.error(f"{excedidas:,} unidades requieren un breaker mayor al de {hw_breaker_amp}A cotizado.")
+    else:
+        st.success(f"El breaker de {hw_breaker_amp}A cubre todas las unidades.")
+
+    st.markdown("#### 🛒 Hardware de Menor Costo (Catálogo)")
+    st.caption(f"Cotización actual: {hw_slots} espacios EZM con QDP de {hw_breaker_amp}A. La búsqueda evalúa cada familia de "
+               "módulos y cantidad por banco: cada medidor va en posición de módulo (breaker QDP) o en base individual, con "
+               "breaker >= el requerido y <= lo que permite su conductor (240.4(B)); máximo 6 desconexiones por acometida (230.71).")
+    c_hw1, c_hw2 = st.columns([1, 2])
+    agrupacion_bancos = c_hw1.radio("Bancos de medidores", ["Uno por edificio", "Uno por torre", "Uno por piso"])
+    archivo_catalogo = c_hw2.file_uploader("Catálogo con precios (CSV)", type="csv",
+                                           help=f"Formato de ejemplo: datos/{RUTA_CATALOGO_HARDWARE.name}")
+    tabla_catalogo = pd.read_csv(archivo_catalogo if archivo_catalogo is not None else RUTA_CATALOGO_HARDWARE)
+    with st.expander("Editar catálogo y precios"):
+        tabla_catalogo = st.data_editor(tabla_catalogo, num_rows="dynamic", hide_index=True, key="catalogo_hardware")
+    try:
+        catalogo = leer_catalogo_hardware(tabla_catalogo)
+    except ValueError as error:
+        st.error(str(error))
+        st.stop()
+
+    # Un banco por grupo; el medidor del panel común va en el primero. Principal de cada banco por 220.84
+    # sobre la carga calculada 220.84(C) de sus unidades (comunes al 100%) x 125%.
+    if agrupacion_bancos == "Uno por torre":
+        claves_banco = edificio["torres"]
+    elif agrupacion_bancos == "Uno por piso":
+        claves_banco = np.char.add(np.char.add(edificio["torres"].astype(str), " - Piso "), edificio["pisos"].astype(str))
+    else:
+        claves_banco = np.full(acometida["unidades"], "Edificio")
+    nombres_banco, banco = np.unique(claves_banco, return_inverse=True)
+    unidades_banco = np.bincount(banco)
+    amperios_banco = (factor_demanda_multifamiliar(unidades_banco) * np.bincount(banco, weights=resultado_edificio["carga_calculada"])
+                      / voltaje)
+    amperios_banco[0] += amp_comun_demanda
+    with perfil.etapa("búsqueda de hardware"):
+        hardware = configuracion_hardware_cache(
+            np.append(por_unidad["breaker"], breaker_comun_recomendado), catalogo,
+            polos=np.append(np.full(acometida["unidades"], 2), 3 if fases_ascensor == 3 else 2),
+            ampacidad_conductor=np.append(conductores_unidad["ampacidad"], np.inf),
+            calibre_conductor=np.append(conductores_unidad["calibre"], ""), material=material_conductor,
+            grupo=np.append(banco, 0), amperios_principal=amperios_banco * 1.25,
+        )
+
+    c_hw3, c_hw4, c_hw5 = st.columns(3)
+    c_hw3.metric("Costo Mínimo", f"${hardware['costo_total']:,.0f}")
+    c_hw4.metric("Medidores en Módulos", f"{int(hardware['en_modulo'].sum()):,}")
+    c_hw5.metric("Bases Individuales", f"{int((~hardware['en_modulo']).sum()) - len(hardware['sin_opcion']):,}")
+    if len(hardware["sin_opcion"]):
+        nombres_medidor = np.append(edificio["unidades"], "Áreas Comunes")
+        st.error(f"Sin breaker conforme en el catálogo: {', '.join(nombres_medidor[hardware['sin_opcion']][:10])}"
+                 + (" ..." if len(hardware["sin_opcion"]) > 10 else ""))
+    if not hardware["factible"].all():
+        st.error(f"{int((~hardware['factible']).sum()):,} bancos sin configuración posible (principal insuficiente o más de "
+                 "6 desconexiones): probar con bancos más pequeños.")
+
+    # Lista de materiales: módulos, principales y el breaker o base de cada medidor
+    modelos_lista = np.concatenate([np.repeat(hardware["modulo"], hardware["cantidad_modulos"]), hardware["principal"],
+                                    hardware["componente"]])
+    modelos_lista, cantidades_lista = np.unique(modelos_lista[modelos_lista != ""], return_counts=True)
+    materiales = pd.DataFrame({"Modelo": modelos_lista, "Cantidad": cantidades_lista}).merge(
+        tabla_catalogo[["modelo", "descripcion", "precio"]].drop_duplicates("modelo"), left_on="Modelo", right_on="modelo", how="left")
+    materiales = materiales.assign(Subtotal=materiales["Cantidad"] * materiales["precio"]).rename(
+        columns={"descripcion": "Descripción", "precio": "Precio Unitario"}).drop(columns="modelo")
+    st.dataframe(materiales.style.format({"Precio Unitario": "${:,.0f}", "Subtotal": "${:,.0f}"}), hide_index=True)
+
+    c_hw6, c_hw7 = st.columns(2)
+    with c_hw6:
+        st.markdown("**Costo por familia de módulos**")
+        st.dataframe(pd.DataFrame({"Módulo": hardware["modelos_modulo"], "Costo Total": hardware["costo_por_modulo"]})
+                     .sort_values("Costo Total").style.format({"Costo Total": "${:,.0f}"}), hide_index=True)
+    with c_hw7:
+        st.markdown("**Configuración por banco**")
+        st.dataframe(pd.DataFrame({
+            "Banco": nombres_banco,
+            "Medidores": unidades_banco + (np.arange(len(nombres_banco)) == 0),
+            "Módulo": hardware["modulo"],
+            "Cantidad": hardware["cantidad_modulos"],
+            "Posiciones Libres": hardware["posiciones_libres"],
+            "Principal": hardware["principal"],
+            "Costo": hardware["costo_grupo"],
+        }).style.format({"Costo": "${:,.0f}"}), hide_index=True)
+
+    st.markdown("#### ⚡ Corriente de Cortocircuito Disponible (Punto a Punto)")
+    # Red de nodos: principal <- secundario del transformador; alimentador de cada torre <- principal; posición de
+    # medidor de cada unidad al final del alimentador de su torre (sin tramo); centro de carga <- medidor.
+    # El medidor y el panel común cuelgan de la primera torre.
+    n_torres = len(torres["torre"])
+    n_medidores = acometida["unidades"]
+    _, torre_unidad = np.unique(edificio["torres"], return_inverse=True)
+    fases_comun = 3 if fases_ascensor == 3 else 1
+    conductor_comun = dimensionar_conductores(amp_comun_demanda, longitud_comunes, voltaje, fases=fases_comun,
+                                              breakers=breaker_comun_recomendado, **parametros_conductor)
+    inicio_medidores = 1 + n_torres
+    inicio_paneles = inicio_medidores + n_medidores + 1
+    aic_catalogo = dict(zip(tabla_catalogo["modelo"].astype(str), tabla_catalogo["aic_ka"] if "aic_ka" in tabla_catalogo
+                            else np.full(len(tabla_catalogo), np.nan)))
+    # AIC de cada posición de medidor: el del breaker o base elegido en la búsqueda de hardware (sin dato si su banco no es factible)
+    tipos_nodo = np.repeat(["Principal", "Alimentador Torre", "Posición Medidor", "Centro de Carga"],
+                           [1, n_torres, n_medidores + 1, n_medidores + 1])
+    with perfil.etapa("cortocircuito"):
+        falla = corriente_cortocircuito_cache(
+            kva_transformador, z_transformador, voltaje,
+            padre=np.concatenate([[-1], np.zeros(n_torres, dtype=int), 1 + torre_unidad, [1],
+                                  inicio_medidores + np.arange(n_medidores + 1)]),
+            longitud_m=np.concatenate([[longitud_secundario], np.full(n_torres, longitud_torre), np.zeros(n_medidores + 1),
+                                       recorrido_horizontal + edificio["pisos"] * altura_piso, [longitud_comunes]]),
+            calibre=np.concatenate([np.ravel(conductor_acometida["calibre"]), conductores_torre["calibre"],
+                                    np.full(n_medidores + 1, ""), conductores_unidad["calibre"], np.ravel(conductor_comun["calibre"])]),
+            conductores_paralelo=np.concatenate([np.ravel(conductor_acometida["conductores_paralelo"]), conductores_torre["conductores_paralelo"],
+                                                 np.ones(n_medidores + 1), conductores_unidad["conductores_paralelo"],
+                                                 np.ravel(conductor_comun["conductores_paralelo"])]),
+            fases=np.concatenate([np.full(1 + n_torres, fases_servicio), np.ones(n_medidores), [fases_comun],
+                                  np.ones(n_medidores), [fases_comun]]).astype(int),
+            fases_transformador=fases_servicio, material=material_conductor, canalizacion=canalizacion,
+            aporte_motores_a=motores_comunes["flc"].sum(),
+            aic_ka=np.concatenate([[aic_principal], np.full(n_torres, aic_alimentador),
+                                   np.where(hardware["factible"][np.append(banco, 0)],
+                                            [aic_catalogo.get(c, np.nan) for c in hardware["componente"]], np.nan),
+                                   np.full(n_medidores + 1, aic_centro_carga)]),
+        )
+
+    c_cc1, c_cc2, c_cc3, c_cc4 = st.columns(4)
+    c_cc1.metric("Bornes del Transformador", f"{falla['isc_bornes'] / 1000:,.1f} kA",
+                 help=f"FLA {falla['fla_transformador']:,.0f} A, %Z x 0.9 (UL 1561) + 4 x FLC de motores comunes")
+    c_cc2.metric("Principal", f"{falla['isc_a'][0] / 1000:,.1f} kA")
+    c_cc3.metric("Posición de Medidor (máx.)", f"{np.nanmax(falla['isc_a'][inicio_medidores:inicio_paneles]) / 1000:,.1f} kA")
+    c_cc4.metric("Centro de Carga (máx.)", f"{np.nanmax(falla['isc_a'][inicio_paneles:]) / 1000:,.1f} kA")
+    df_falla = pd.DataFrame({"Tipo": tipos_nodo, "Isc (kA)": falla["isc_a"] / 1000, "AIC Mín. (kA)": falla["aic_minimo_ka"],
+                             "No Cumple": ~falla["cumple_aic"]})
+    st.dataframe(df_falla.groupby("Tipo", sort=False).agg(
+        Nodos=("Isc (kA)", "size"), **{"Isc Máx. (kA)": ("Isc (kA)", "max"), "AIC Mín. (kA)": ("AIC Mín. (kA)", "max"),
+                                       "AIC Insuficiente": ("No Cumple", "sum")})
+        .reset_index().style.format({"Isc Máx. (kA)": "{:,.1f}", "AIC Mín. (kA)": "{:.0f}"}), hide_index=True)
+    insuficientes = int((~falla["cumple_aic"]).sum())
+    if insuficientes:
+        nombres_nodo = np.concatenate([["Principal"], torres["torre"], edificio["unidades"], ["Áreas Comunes"],
+                                       edificio["unidades"], ["Áreas Comunes"]])
+        st.error(f"{insuficientes:,} interruptores con capacidad interruptiva menor a la corriente de falla disponible.")
+        with st.expander("Interruptores con AIC insuficiente"):
+            st.dataframe(df_falla.assign(Nodo=nombres_nodo)[~falla["cumple_aic"]][["Tipo", "Nodo", "Isc (kA)", "AIC Mín. (kA)"]]
+                         .style.format({"Isc (kA)": "{:,.1f}", "AIC Mín. (kA)": "{:.0f}"}), hide_index=True)
+    else:
+        st.success("Todos los interruptores soportan la corriente de falla disponible en su punto.")
+
+perfil.marcar("pestaña Edificio")
+
+with tab5:
+    st.subheader("Simulación Estocástica de un Año Completo")
+    st.markdown("Curvas de carga por equipo (cocina, lavado, calentador, jacuzzi, A/C, bombas, ascensor...) para cada unidad "
+                "del modelo del edificio, con modelos de uso de `datos/perfiles_equipos.csv`. El pico **coincidente** real "
+                "se compara con la demanda estática de la Tabla 220.84.")
+    c_sim1, c_sim2, c_sim3 = st.columns(3)
+    intervalo_sim = c_sim1.radio("Intervalo", [60, 15], format_func=lambda m: f"{m} min ({525600 // m:,} intervalos)", horizontal=True)
+    semilla_perfil = c_sim2.number_input("Semilla Simulación", 0, 10000, 1)
+    simular = c_sim3.checkbox("Simular año completo", value=False, help="Puede tardar unos segundos con miles de unidades")
+
+    if simular:
+        comunes_perfil = {"Ascensor": {"ascensor": ac_ascensor}, "Portones": {"portones": demanda_portones},
+                          "Luces Pasillos/Parqueo": {"iluminacion": ac_luces_pasillo + ac_luces_parqueo}}
+        comunes_perfil.update({f"Bomba {i + 1}": {"bomba": w_bomba_real} for i in range(int(ac_bombas_qty))})
+        nombres_perfil, equipos_perfil, watts_perfil = cargas_para_perfiles(edificio, comunes_perfil)
+        breakers_perfil = np.concatenate([por_unidad["breaker"],
+                                          seleccionar_breaker_comercial(watts_perfil[acometida["unidades"]:].sum(axis=1) / voltaje)])
+        with perfil.etapa("simulación 8760"):
+            limpiar_perfiles_temporales()
+            anual = simular_perfiles_cache(watts_perfil, equipos_perfil, intervalo_min=intervalo_sim, breakers=breakers_perfil,
+                                           voltaje=voltaje, semilla=int(semilla_perfil))
+
+        c_anual1, c_anual2, c_anual3, c_anual4 = st.columns(4)
+        c_anual1.metric("Pico Coincidente", f"{anual['pico_coincidente']/1000:,.1f} kVA",
+                        delta=f"{(anual['pico_coincidente'] - acometida['demanda'])/1000:,.1f} kVA vs 220.84", delta_color="inverse")
+        c_anual2.metric("Factor de Coincidencia", f"{anual['factor_coincidencia']:.1%}", help="Pico coincidente / suma de picos individuales")
+        c_anual3.metric("Energía Anual", f"{anual['energia_kwh']/1000:,.1f} MWh")
+        c_anual4.metric("Momento del Pico", anual["momento_pico"].strftime("%d-%b %H:%M"))
+        excede_servicio = (anual["total"] > acometida["demanda"]).mean()
+        st.caption(f"Fracción del año sobre la demanda 220.84 ({acometida['demanda']/1000:,.1f} kVA): {excede_servicio:.3%}. "
+                   f"Perfiles completos ({anual['forma'][0]:,} x {anual['forma'][1]:,}) en `{anual['ruta_perfiles']}` (memmap).")
+
+        indice_tiempo = anual["inicio"] + pd.to_timedelta(np.arange(len(anual["total"])) * intervalo_sim, unit="min")
+        por_dia_sim = 1440 // intervalo_sim
+        desde = max(0, anual["intervalo_pico"] - 3 * por_dia_sim)
+        semana_pico = slice(desde, desde + 7 * por_dia_sim)
+        c_curva1, c_curva2 = st.columns(2)
+        with c_curva1:
+            st.markdown("#### Semana del Pico (kVA)")
+            st.line_chart(pd.Series(anual["total"][semana_pico] / 1000, index=indice_tiempo[semana_pico], name="Edificio"))
+        with c_curva2:
+            st.markdown("#### Curva de Duración de Carga (kVA)")
+            duracion = np.sort(anual["total"])[::-1]
+            muestras = np.linspace(0, len(duracion) - 1, 500).astype(int)
+            st.line_chart(pd.DataFrame({"% del año": muestras / len(duracion) * 100, "kVA": duracion[muestras] / 1000}),
+                          x="% del año", y="kVA")
+
+        st.markdown("#### Probabilidad de Excedencia por Breaker")
+        df_excedencia = pd.DataFrame({
+            "Carga": nombres_perfil,
+            "Breaker": [formatear_breaker(b) for b in breakers_perfil],
+            "Pico (A)": anual["picos"] / voltaje,
+            "P(> 80% breaker)": anual["excedencia_80"],
+            "P(> breaker)": anual["excedencia_breaker"],
+        }).sort_values(["P(> breaker)", "P(> 80% breaker)", "Pico (A)"], ascending=False).head(20)
+        st.dataframe(df_excedencia.style.format({"Pico (A)": "{:,.1f}", "P(> 80% breaker)": "{:.3%}", "P(> breaker)": "{:.3%}"}),
+                     hide_index=True)
+
+perfil.marcar("pestaña Perfil Anual")
+panel_perfilado(perfil, "electrico_v3")
\ No newline at end of file
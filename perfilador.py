@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# ==========================================
+# PERFILADO POR RERUN (MODO DEBUG)
+# ==========================================
+# Se activa con ?perfil=1 en la URL, con la variable de entorno QURE_PERFIL=1 o con el interruptor
+# de la barra lateral. Inactivo, cada llamado es un no-op y no altera la app.
+#
+# Dos formas de medir:
+#   perfil.marcar("motor")          -> tiempo desde la marca anterior (secciones consecutivas del script)
+#   with perfil.etapa("styler"):    -> tiempo de un bloque puntual (puede anidarse dentro de una sección)
+# Las marcas suman el total del rerun; las etapas son un desglose adicional.
+
+MAX_RERUNS_HISTORIAL = 200
+ARCHIVO_TRAZAS_DEFECTO = "perfil_rerun.jsonl"
+
+
+class PerfiladorRerun:
+    def __init__(self, historial, activo=True):
+        self.historial = historial
+        self.activo = activo
+        self.tiempos = {}
+        self._inicio = time.perf_counter()
+        self._ultima_marca = self._inicio
+
+    def _sumar(self, nombre, segundos):
+        self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + segundos
+
+    def marcar(self, nombre):
+        if not self.activo:
+            return
+        ahora = time.perf_counter()
+        self._sumar(nombre, ahora - self._ultima_marca)
+        self._ultima_marca = ahora
+
+    @contextmanager
+    def etapa(self, nombre):
+        if not self.activo:
+            yield
+            return
+        t_inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._sumar(nombre, time.perf_counter() - t_inicio)
+
+    def cerrar_rerun(self):
+        """
+        Guarda el rerun actual en el historial (con su total) y devuelve la traza.
+        """
+        if not self.activo:
+            return None
+        traza = {"marca": time.time(), "etapas": {**self.tiempos, "TOTAL": time.perf_counter() - self._inicio}}
+        self.historial.append(traza)
+        return traza
+
+    def resumen(self):
+        """
+        p50/p95/último en milisegundos por etapa sobre el historial acumulado.
+        """
+        etapas = {}
+        for traza in self.historial:
+            for nombre, segundos in traza["etapas"].items():
+                etapas.setdefault(nombre, []).append(segundos * 1000)
+        return pd.DataFrame([
+            {"Etapa": nombre, "Reruns": len(ms), "p50 (ms)": np.percentile(ms, 50), "p95 (ms)": np.percentile(ms, 95), "Último (ms)": ms[-1]}
+            for nombre, ms in etapas.items()
+        ])
+
+    def volcar(self, ruta=ARCHIVO_TRAZAS_DEFECTO):
+        """
+        Agrega como JSON Lines (una traza por línea) las trazas del historial que aún no se volcaron y las
+        marca como volcadas, así volcar dos veces no duplica trazas en el archivo.
+        """
+        pendientes = [traza for traza in self.historial if not traza.get("volcada")]
+        with open(ruta, "a", encoding="utf-8") as f:
+            for traza in pendientes:
+                f.write(json.dumps({"marca": traza["marca"], "etapas": traza["etapas"]}) + "\n")
+                traza["volcada"] = True
+        return len(pendientes)
+
+
+def obtener_perfilador(app, clave_estado="perfilador_historial"):
+    """
+    Crea el perfilador del rerun actual; el historial (rolling) vive en st.session_state.
+    Debe llamarse al inicio del script, después de st.set_page_config.
+    """
+    activo = (
+        st.query_params.get("perfil") == "1"
+        or os.environ.get("QURE_PERFIL") == "1"
+        or st.session_state.get(f"perfil_activo_{app}", False)
+    )
+    historial = st.session_state.setdefault(clave_estado, deque(maxlen=MAX_RERUNS_HISTORIAL))
+    return PerfiladorRerun(historial, activo=activo)
+
+
+def panel_perfilado(perfil, app):
+    """
+    Cierra el rerun y dibuja el interruptor y el expander de depuración. Llamar al final del script.
+    """
+    with st.sidebar:
+        st.divider()
+        st.toggle("🐞 Modo Perfilado", key=f"perfil_activo_{app}", help="Mide cada etapa del rerun (cálculo, Styler, figuras, render)")
+
+    if not perfil.activo:
+        return
+    perfil.cerrar_rerun()
+
+    with st.expander(f"🐞 Perfilado por Rerun ({len(perfil.historial)} reruns)"):
+        st.caption("Tiempos del lado servidor: 'render' mide la serialización hacia el navegador, no el dibujado en el cliente.")
+        st.dataframe(perfil.resumen().style.format({"p50 (ms)": "{:,.1f}", "p95 (ms)": "{:,.1f}", "Último (ms)": "{:,.1f}"}), hide_index=True)
+        col_p1, col_p2, col_p3 = st.columns(3)
+        ruta = col_p1.text_input("Archivo de trazas", value=ARCHIVO_TRAZAS_DEFECTO, key=f"perfil_ruta_{app}")
+        if col_p2.button("Volcar trazas", key=f"perfil_volcar_{app}"):
+            st.success(f"{perfil.volcar(ruta)} trazas agregadas a {ruta}")
+        if col_p3.button("Limpiar historial", key=f"perfil_limpiar_{app}"):
+            perfil.historial.clear()
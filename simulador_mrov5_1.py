@@ -3,10 +3,21 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
-from datetime import datetime, timedelta
+import sqlite3
+import time
+
+from escenarios_mro import KPIS_ESCENARIO, AlmacenEscenarios
+from hangar_eventos import cuadrillas_departamentos, simular_hangar
+from perfilador import obtener_perfilador, panel_perfilado
+from motor_mro import (LIMITES_OPTIMIZADOR, VARIABLES_PLANTILLA, TENDENCIAS_MERCADO, agregar_serie_diaria, analisis_sensibilidad,
+                       calcular_nomina_compleja, cargar_departamentos, cargar_registro_flota, demanda_por_departamento,
+                       evaluar_departamentos, evaluar_mro, evaluar_multisitio, leer_tabla_escenarios, evaluar_plantilla, malla_plantilla, malla_sensibilidad,
+                       motor_prediccion_mercado, optimizar_plantilla, pronostico_diario, proyectar_flujo_caja,
+                       simular_demanda_montecarlo, variables_sensibilidad)
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="MRO Enterprise Architect v5.1", layout="wide")
+perfil = obtener_perfilador("mro")
 
 st.title("✈️ MRO Enterprise Architect v5.1")
 st.markdown("""
@@ -14,22 +25,32 @@ st.markdown("""
 Versión corregida: Control total sobre cantidades de Gerentes y Project Managers para ajustar la carga administrativa.
 """)
 
+# Registro de perfiles de flota y mezcla inicial (clave -> cantidad)
+registro_flota = cargar_registro_flota()
+FLOTA_DEFECTO = {"B757-C": 2, "A320-C": 4, "B737-C": 3, "E190-C": 2}
+
 # ==========================================
 # 1. BARRA LATERAL: INPUTS DE INGENIERÍA
 # ==========================================
 
 with st.sidebar:
     st.header("1. Configuración de Flota (Input Detallado)")
-    st.info("Define la mezcla exacta de aeronaves en el hangar este mes.")
-    
-    # Inputs por modelo específico
-    c1, c2 = st.columns(2)
-    with c1:
-        qty_b757 = st.number_input("Cant. Boeing 757 (Heavy)", 0, 10, 2)
-        qty_a320 = st.number_input("Cant. Airbus A320 (Narrow)", 0, 15, 4)
-    with c2:
-        qty_b737 = st.number_input("Cant. Boeing 737 (Narrow)", 0, 15, 3)
-        qty_e190 = st.number_input("Cant. Embraer 190 (Regional)", 0, 10, 2)
+    st.info("Define la mezcla exacta de aeronaves y nivel de check en el hangar este mes.")
+
+    # Inputs por variante y check, tomados del registro de perfiles (datos/perfiles_flota.csv)
+    df_flota = pd.DataFrame({
+        "Clave": registro_flota["claves"],
+        "Modelo": registro_flota["modelos"],
+        "Check": registro_flota["checks"],
+        "Hrs/Check": registro_flota["horas"],
+        "Cantidad": [FLOTA_DEFECTO.get(c, 0) for c in registro_flota["claves"]],
+    })
+    df_flota = st.data_editor(
+        df_flota, hide_index=True, num_rows="fixed", height=280,
+        disabled=["Clave", "Modelo", "Check", "Hrs/Check"],
+        column_config={"Cantidad": st.column_config.NumberColumn(min_value=0, max_value=50, step=1)},
+    )
+    cantidades_flota = df_flota["Cantidad"].fillna(0).to_numpy(dtype=float)
         
     st.divider()
 
@@ -84,91 +105,154 @@ with st.sidebar:
     tarifa_venta = st.number_input("Tarifa Venta Promedio ($/hr)", value=65.0)
     gastos_fijos = st.number_input("Gastos Fijos Planta ($)", value=250000)
 
+    st.divider()
+
+    st.header("5. Pronóstico Monte Carlo")
+    with st.expander("Parámetros de Simulación"):
+        mc_meses = st.slider("Horizonte (Meses)", 6, 36, 24)
+        mc_trayectorias = st.select_slider("Trayectorias Simuladas", [1_000, 10_000, 50_000, 100_000], value=100_000)
+        mc_tendencia = st.number_input("Factor Tendencia (Flota Envejecida)", value=TENDENCIAS_MERCADO["Flota Envejecida"], step=0.05)
+        mc_dispersion = st.slider("Sobre-dispersión de Llegadas", 0.0, 1.0, 0.0, help="0 = Poisson. Valores mayores generan meses más volátiles (binomial negativa)")
+        mc_cv_horas = st.slider("Variabilidad Horas por Check (CV)", 0.0, 0.5, 0.15)
+        mc_prob_escasez = st.slider("Prob. Mensual Escasez de Piezas", 0.0, 1.0, 0.30)
+        mc_fraccion_retraso = st.slider("Fracción de Horas Retrasadas por Escasez", 0.0, 0.8, 0.25)
+        mc_semilla = st.number_input("Semilla Aleatoria", value=42, min_value=0)
+
+# Entradas numéricas de la barra lateral, con los nombres de ENTRADAS_DEFECTO
+entradas_actuales = {
+    "av_tecnicos": av_tecnicos, "av_encargados": av_encargados, "av_jefatura": av_jefatura, "otros_tecnicos": otros_tecnicos,
+    "salario_gg": salario_gg, "cant_gtes_area": cant_gtes_area, "salario_gte_area": salario_gte_area,
+    "cant_pms": cant_pms, "salario_pm": salario_pm, "salario_tecnico_base": salario_tecnico_base,
+    "he_15": he_15, "he_20": he_20, "tarifa_venta": tarifa_venta, "gastos_fijos": gastos_fijos,
+}
+
+perfil.marcar("entradas (sidebar)")
+
 # ==========================================
 # 2. MOTOR DE CÁLCULO (BACKEND)
 # ==========================================
+# Las secciones A-E viven en motor_mro.py como funciones puras. Aquí solo se memoizan por sus
+# entradas (caché acotado), así un rerun de Streamlit no recalcula lo que no cambió.
+CACHE_MOTOR = {"max_entries": 64, "ttl": 3600, "show_spinner": False}
+CACHE_FIGURAS = {"max_entries": 32, "ttl": 3600, "show_spinner": False}
 
-# --- A. MODELO DE CARGA DE TRABAJO (WORKLOAD) ---
-PERFIL_AVION = {
-    "B757": {"hrs": 7500, "pct_avionica": 0.18}, 
-    "A320": {"hrs": 5500, "pct_avionica": 0.22},
-    "B737": {"hrs": 5800, "pct_avionica": 0.20},
-    "E190": {"hrs": 3500, "pct_avionica": 0.25}
-}
+evaluar_mro_cache = st.cache_data(**CACHE_MOTOR)(evaluar_mro)
+pronostico_cache = st.cache_data(**CACHE_MOTOR)(motor_prediccion_mercado)
+pronostico_diario_cache = st.cache_data(max_entries=8, ttl=3600, show_spinner=False)(pronostico_diario)
+optimizar_cache = st.cache_data(**CACHE_MOTOR)(optimizar_plantilla)
+simular_hangar_cache = st.cache_data(max_entries=16, ttl=3600, show_spinner=False)(simular_hangar)
+multisitio_cache = st.cache_data(**CACHE_MOTOR)(evaluar_multisitio)
+trayectorias_cache = st.cache_data(max_entries=16, ttl=3600, show_spinner=False)(simular_demanda_montecarlo)
+flujo_caja_cache = st.cache_data(max_entries=16, ttl=3600, show_spinner=False)(proyectar_flujo_caja)
+# Almacén SQLite de escenarios: una conexión compartida por proceso
+almacen_escenarios = st.cache_resource(AlmacenEscenarios)()
 
-# Calcular demanda
-demanda_total_horas = (
-    (qty_b757 * PERFIL_AVION["B757"]["hrs"]) +
-    (qty_a320 * PERFIL_AVION["A320"]["hrs"]) +
-    (qty_b737 * PERFIL_AVION["B737"]["hrs"]) +
-    (qty_e190 * PERFIL_AVION["E190"]["hrs"])
+mro = evaluar_mro_cache(
+    cantidades_flota, av_tecnicos, av_encargados, av_jefatura, otros_tecnicos,
+    salario_gg, cant_gtes_area, salario_gte_area, cant_pms, salario_pm,
+    salario_tecnico_base, he_15, he_20, tarifa_venta, gastos_fijos
 )
 
-demanda_avionica_horas = (
-    (qty_b757 * PERFIL_AVION["B757"]["hrs"] * PERFIL_AVION["B757"]["pct_avionica"]) +
-    (qty_a320 * PERFIL_AVION["A320"]["hrs"] * PERFIL_AVION["A320"]["pct_avionica"]) +
-    (qty_b737 * PERFIL_AVION["B737"]["hrs"] * PERFIL_AVION["B737"]["pct_avionica"]) +
-    (qty_e190 * PERFIL_AVION["E190"]["hrs"] * PERFIL_AVION["E190"]["pct_avionica"])
-)
+# --- A. MODELO DE CARGA DE TRABAJO (WORKLOAD) ---
+demanda_total_horas = mro["demanda_total_horas"]
+demanda_avionica_horas = mro["demanda_avionica_horas"]
 
 # --- B. CÁLCULO DE CAPACIDAD Y NÓMINA ---
+capacidad_total, costo_nomina_total = mro["capacidad_total"], mro["costo_nomina_total"]
+capacidad_avionica, costo_nomina_avionica_directa = mro["capacidad_avionica"], mro["costo_nomina_avionica"]
+
+# --- C. COSTOS GERENCIALES Y ADMINISTRATIVOS (DINÁMICO) ---
+costo_gtes_area_total = mro["costo_gtes_area_total"]
+costo_pms_total = mro["costo_pms_total"]
+costo_admin_mensual = mro["costo_admin_mensual"]
+costo_indirecto_avionica = mro["costo_indirecto_avionica"]
 
-def calcular_nomina_compleja(n_tecnicos, rate_base, h_extra, d_domingo):
-    cap_ord = n_tecnicos * 192
-    costo_ord = cap_ord * rate_base
-    cap_15 = n_tecnicos * (h_extra * 4)
-    costo_15 = cap_15 * (rate_base * 1.5)
-    cap_20 = n_tecnicos * (d_domingo * 8)
-    costo_20 = cap_20 * (rate_base * 2.0)
-    return cap_ord + cap_15 + cap_20, costo_ord + costo_15 + costo_20
+# --- D. PRODUCCIÓN REAL ---
+horas_vendidas_total = mro["horas_vendidas_total"]
+horas_vendidas_avionica = mro["horas_vendidas_avionica"]
+ingreso_total = mro["ingreso_total"]
+utilidad_neta = mro["utilidad_neta"]
 
-capacidad_total, costo_nomina_total = calcular_nomina_compleja(total_tecnicos, salario_tecnico_base, he_15, he_20)
-capacidad_avionica, costo_nomina_avionica_directa = calcular_nomina_compleja(av_tecnicos, salario_tecnico_base, he_15, he_20)
+perfil.marcar("motor A-D")
 
-# --- C. COSTOS GERENCIALES Y ADMINISTRATIVOS (DINÁMICO) ---
-# Aquí aplicamos las variables que pediste modificar
-costo_gtes_area_total = cant_gtes_area * salario_gte_area
-costo_pms_total = cant_pms * salario_pm
-costo_admin_mensual = salario_gg + costo_gtes_area_total + costo_pms_total
+# --- E. PREDICCIÓN DE MERCADO (MONTE CARLO) ---
+df_forecast = pronostico_cache(
+    cantidades_flota, capacidad_total, meses=mc_meses, n_trayectorias=mc_trayectorias,
+    factor_tendencia=mc_tendencia, dispersion_llegadas=mc_dispersion, cv_horas=mc_cv_horas,
+    prob_escasez=mc_prob_escasez, fraccion_retraso=mc_fraccion_retraso, semilla=mc_semilla
+)
 
-costo_indirecto_avionica = (av_encargados * 2500) + (av_jefatura * 3500) 
+perfil.marcar("pronóstico Monte Carlo")
 
-# --- D. PRODUCCIÓN REAL ---
-horas_vendidas_total = min(demanda_total_horas, capacidad_total)
-horas_vendidas_avionica = min(demanda_avionica_horas, capacidad_avionica)
+# --- F. FIGURAS (memoizadas por sus propias entradas) ---
+
+@st.cache_data(**CACHE_FIGURAS)
+def figura_saturacion_avionica(saturacion_pct):
+    return go.Figure(go.Indicator(
+        mode = "gauge+number", value = saturacion_pct,
+        title = {'text': "Saturación Aviónica"},
+        gauge = {'axis': {'range': [0, 120]}, 'bar': {'color': "darkblue"},
+                 'steps': [{'range': [0, 80], 'color': "lightgreen"}, {'range': [80, 100], 'color': "yellow"}, {'range': [100, 120], 'color': "red"}]}
+    ))
+
+@st.cache_data(**CACHE_FIGURAS)
+def figura_estructura_costos(salario_gg, costo_gtes_area_total, costo_pms_total, costo_nomina_total, gastos_fijos):
+    labels = ["Total Empresa", "Gerencia General", "Gerencias Área", "Project Managers", "Producción (Técnicos)", "Gastos Fijos"]
+    parents = ["", "Total Empresa", "Total Empresa", "Total Empresa", "Total Empresa", "Total Empresa"]
+    values = [0, salario_gg, costo_gtes_area_total, costo_pms_total, costo_nomina_total, gastos_fijos]
+    return go.Figure(go.Treemap(
+        labels = labels, parents = parents, values = values, textinfo = "label+value+percent parent"
+    ))
 
-ingreso_total = horas_vendidas_total * tarifa_venta
-ingreso_avionica = horas_vendidas_avionica * tarifa_venta 
+@st.cache_data(**CACHE_FIGURAS)
+def figura_pronostico(df_forecast):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df_forecast["Mes Futuro"], y=df_forecast["P90"], mode="lines", line={'width': 0}, name="P90", showlegend=False))
+    fig.add_trace(go.Scatter(x=df_forecast["Mes Futuro"], y=df_forecast["P10"], mode="lines", line={'width': 0}, fill="tonexty",
+                             fillcolor="rgba(31, 119, 180, 0.25)", name="Banda P10-P90"))
+    fig.add_trace(go.Scatter(x=df_forecast["Mes Futuro"], y=df_forecast["Demanda Proyectada"], mode="lines+markers", name="Demanda P50"))
+    fig.add_trace(go.Scatter(x=df_forecast["Mes Futuro"], y=df_forecast["Capacidad Actual"], mode="lines", line={'dash': "dash", 'color': "red"}, name="Capacidad Actual"))
+    fig.update_layout(title=f"Forecast de Demanda a {len(df_forecast)} Meses", yaxis_title="Horas")
+    return fig
 
-gasto_total_operativo = costo_nomina_total + costo_admin_mensual + gastos_fijos
-utilidad_neta = ingreso_total - gasto_total_operativo
+@st.cache_data(**CACHE_FIGURAS)
+def figura_pronostico_diario(agregado_total, agregado_series, nombres_series, capacidad, titulo):
+    """
+    Series ya agregadas por periodo (agregar_serie_diaria) en trazas WebGL: banda mín-máx diaria del total,
+    media diaria por serie y capacidad diaria.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=agregado_total["fechas"], y=agregado_total["maximo"], mode="lines", line={'width': 0}, showlegend=False, name="Máx. diario"))
+    fig.add_trace(go.Scattergl(x=agregado_total["fechas"], y=agregado_total["minimo"], mode="lines", line={'width': 0}, fill="tonexty",
+                               fillcolor="rgba(31, 119, 180, 0.20)", name="Banda Mín-Máx Diaria (Total)"))
+    fig.add_trace(go.Scattergl(x=agregado_total["fechas"], y=agregado_total["media"], mode="lines", line={'color': "#1f77b4"}, name="Total"))
+    for nombre, media in zip(nombres_series, agregado_series["media"]):
+        fig.add_trace(go.Scattergl(x=agregado_series["fechas"], y=media, mode="lines", line={'width': 1}, name=nombre))
+    fig.add_trace(go.Scattergl(x=capacidad["fechas"], y=capacidad["media"], mode="lines", line={'dash': "dash", 'color': "red"}, name="Capacidad Diaria"))
+    fig.update_layout(title=titulo, yaxis_title="Horas / día")
+    return fig
 
-# --- E. PREDICCIÓN DE MERCADO ---
-def motor_prediccion_mercado():
-    meses_futuros = ["Mes +1", "Mes +2", "Mes +3", "Mes +4", "Mes +5", "Mes +6"]
-    tendencias = {"Escasez de Piezas": 0.90, "Flota Envejecida": 1.15, "Modernización Cabinas": 1.05}
-    data_pred = []
-    base_demanda = demanda_total_horas
-    
-    for i, m in enumerate(meses_futuros):
-        if i in [2, 3]: factor_est = 1.10 
-        elif i in [5]: factor_est = 0.85 
-        else: factor_est = 1.0
-        
-        factor_mercado = tendencias["Flota Envejecida"] * tendencias["Escasez de Piezas"]
-        demanda_proyectada = base_demanda * factor_est * factor_mercado
-        estado = "Saturado" if demanda_proyectada > capacidad_total else "Con Capacidad"
-        
-        data_pred.append({
-            "Mes Futuro": m,
-            "Demanda Proyectada": demanda_proyectada,
-            "Capacidad Actual": capacidad_total,
-            "Estado": estado,
-            "Tendencia": "Alta Demanda" if factor_mercado > 1 else "Baja"
-        })
-    return pd.DataFrame(data_pred)
+@st.cache_data(**CACHE_FIGURAS)
+def mapa_utilidad(rangos, eje_x, eje_y, demanda_total_horas, demanda_avionica_horas, tarifa_venta, costo_admin_mensual, gastos_fijos):
+    """
+    Evalúa la malla de plantilla y la reduce a 2D (máximo sobre los ejes no graficados).
+    Devuelve el mapa, la mejor configuración, su utilidad, el total evaluado y el tiempo de cálculo.
+    """
+    t_inicio = time.perf_counter()
+    malla = malla_plantilla(**rangos)
+    resultado_malla = evaluar_plantilla(*malla, demanda_total_horas, demanda_avionica_horas, tarifa_venta, costo_admin_mensual, gastos_fijos)
+    forma_malla = np.broadcast_shapes(*(m.shape for m in malla))
+    utilidad_malla = np.broadcast_to(resultado_malla["utilidad_neta"], forma_malla)
 
-df_forecast = motor_prediccion_mercado()
+    idx_x, idx_y = VARIABLES_PLANTILLA.index(eje_x), VARIABLES_PLANTILLA.index(eje_y)
+    otros_ejes = tuple(i for i in range(len(VARIABLES_PLANTILLA)) if i not in (idx_x, idx_y))
+    mapa = utilidad_malla.max(axis=otros_ejes)
+    if idx_x < idx_y:
+        mapa = mapa.T
+
+    mejor = np.unravel_index(np.argmax(utilidad_malla), forma_malla)
+    mejor_config = {var: float(np.atleast_1d(rangos[var])[i]) for var, i in zip(VARIABLES_PLANTILLA, mejor)}
+    return mapa, mejor_config, float(utilidad_malla[mejor]), utilidad_malla.size, time.perf_counter() - t_inicio
 
 # ==========================================
 # 3. DASHBOARD VISUAL
@@ -182,7 +266,9 @@ c4.metric("Personal Admin/Gcia", f"{1 + cant_gtes_area + cant_pms} px", help="GG
 
 st.markdown("---")
 
-tab_avionica, tab_flota, tab_prediccion = st.tabs(["⚡ Análisis Depto. Aviónica", "✈️ Configuración Flota & Costos", "🔮 Predicción Mercado 6 Meses"])
+tab_avionica, tab_departamentos, tab_flota, tab_prediccion, tab_mapa, tab_optimizador, tab_hangar, tab_sensibilidad, tab_escenarios, tab_multisitio, tab_flujo = st.tabs(["⚡ Análisis Depto. Aviónica", "🏭 Departamentos", "✈️ Configuración Flota & Costos", "🔮 Predicción Mercado (Monte Carlo)", "🗺️ Mapa de Utilidad", "🧮 Optimizador de Plantilla", "🛬 Hangar (Eventos Discretos)", "🌪️ Sensibilidad", "💾 Escenarios", "🏢 Multi-Sitio", "💵 Flujo de Caja"])
+
+perfil.marcar("KPIs")
 
 with tab_avionica:
     st.subheader("Deep Dive: Departamento de Aviónica")
@@ -190,36 +276,79 @@ with tab_avionica:
     
     with col_av1:
         st.markdown(f"**Fuerza Laboral:** {av_tecnicos} Técnicos | {av_encargados} Encargados + {av_jefatura} Jefe")
-        fig_gauge = go.Figure(go.Indicator(
-            mode = "gauge+number", value = (horas_vendidas_avionica / capacidad_avionica) * 100,
-            title = {'text': "Saturación Aviónica"},
-            gauge = {'axis': {'range': [0, 120]}, 'bar': {'color': "darkblue"},
-                     'steps': [{'range': [0, 80], 'color': "lightgreen"}, {'range': [80, 100], 'color': "yellow"}, {'range': [100, 120], 'color': "red"}]}
-        ))
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        with perfil.etapa("figura: saturación aviónica"):
+            fig_gauge = figura_saturacion_avionica((horas_vendidas_avionica / capacidad_avionica) * 100)
+        with perfil.etapa("render: plotly"):
+            st.plotly_chart(fig_gauge, use_container_width=True)
     
     with col_av2:
-        ingreso_av = horas_vendidas_avionica * tarifa_venta
-        gasto_av = costo_nomina_avionica_directa + costo_indirecto_avionica
-        margen_av = ingreso_av - gasto_av
+        ingreso_av = mro["ingreso_avionica"]
+        margen_av = mro["margen_avionica"]
         st.markdown("### P&L Aviónica")
         st.dataframe(pd.DataFrame({
             "Concepto": ["Ingresos (Aviónica)", "Costo Nómina Directa", "Costo Mando Indirecto", "Contribución Neta"],
             "Monto USD": [ingreso_av, -costo_nomina_avionica_directa, -costo_indirecto_avionica, margen_av]
         }).style.format({"Monto USD": "${:,.2f}"}))
 
+perfil.marcar("pestaña Aviónica")
+
+with tab_departamentos:
+    st.subheader("🏭 Carga y Rentabilidad por Departamento")
+    st.markdown("Matriz departamentos x tipos de avión (datos/perfiles_flota.csv) con plantilla y tarifas por departamento (datos/departamentos.csv). Aviónica toma su plantilla de la barra lateral.")
+
+    df_deptos = cargar_departamentos().copy()
+    es_avionica = df_deptos["departamento"] == "avionica"
+    df_deptos.loc[es_avionica, ["tecnicos", "encargados", "jefaturas"]] = [av_tecnicos, av_encargados, av_jefatura]
+    df_deptos = st.data_editor(df_deptos, hide_index=True, num_rows="fixed", disabled=["departamento"], key="editor_departamentos")
+
+    tecnicos_otros_deptos = df_deptos.loc[~es_avionica, "tecnicos"].sum()
+    if tecnicos_otros_deptos != otros_tecnicos:
+        st.caption(f"⚠️ Los departamentos no aviónicos suman {tecnicos_otros_deptos:,.0f} técnicos; la barra lateral indica {otros_tecnicos:,.0f} 'Otros Técnicos'.")
+
+    res_deptos = evaluar_departamentos(
+        demanda_por_departamento(cantidades_flota, registro_flota),
+        df_deptos["tecnicos"].to_numpy(), df_deptos["encargados"].to_numpy(), df_deptos["costo_encargado"].to_numpy(),
+        df_deptos["jefaturas"].to_numpy(), df_deptos["costo_jefatura"].to_numpy(),
+        df_deptos["costo_hora_tecnico"].to_numpy(), df_deptos["tarifa_hora"].to_numpy(), he_15, he_20,
+    )
+    df_res_deptos = pd.DataFrame({
+        "Departamento": df_deptos["nombre"],
+        "Demanda (hrs)": res_deptos["demanda"],
+        "Capacidad (hrs)": res_deptos["capacidad"],
+        "Saturación": res_deptos["saturacion"],
+        "Ingresos": res_deptos["ingreso"],
+        "Nómina Directa": res_deptos["costo_nomina"],
+        "Mando Indirecto": res_deptos["costo_mando"],
+        "Contribución Neta": res_deptos["margen_contribucion"],
+    })
+
+    col_dp1, col_dp2 = st.columns(2)
+    with col_dp1:
+        fig_sat_deptos = px.bar(df_res_deptos, x="Saturación", y="Departamento", orientation="h", title="Saturación por Departamento",
+                                color=np.select([df_res_deptos["Saturación"] > 1.0, df_res_deptos["Saturación"] > 0.8], ["Saturado", "Alerta"], "Con Capacidad"),
+                                color_discrete_map={"Saturado": "red", "Alerta": "gold", "Con Capacidad": "green"})
+        fig_sat_deptos.add_vline(x=1.0, line_dash="dash", line_color="red")
+        fig_sat_deptos.update_layout(xaxis_tickformat=".0%", legend_title_text="")
+        st.plotly_chart(fig_sat_deptos, use_container_width=True)
+    with col_dp2:
+        fig_margen_deptos = px.bar(df_res_deptos, x="Contribución Neta", y="Departamento", orientation="h", title="Contribución Neta por Departamento")
+        st.plotly_chart(fig_margen_deptos, use_container_width=True)
+
+    st.dataframe(df_res_deptos.style.format({
+        "Demanda (hrs)": "{:,.0f}", "Capacidad (hrs)": "{:,.0f}", "Saturación": "{:.1%}", "Ingresos": "${:,.0f}",
+        "Nómina Directa": "${:,.0f}", "Mando Indirecto": "${:,.0f}", "Contribución Neta": "${:,.0f}",
+    }), hide_index=True)
+
+perfil.marcar("pestaña Departamentos")
+
 with tab_flota:
     st.subheader("Estructura de Costos Gerencial vs Operativa")
     
     # Treemap Dinámico actualizado con las variables
-    labels = ["Total Empresa", "Gerencia General", "Gerencias Área", "Project Managers", "Producción (Técnicos)", "Gastos Fijos"]
-    parents = ["", "Total Empresa", "Total Empresa", "Total Empresa", "Total Empresa", "Total Empresa"]
-    values = [0, salario_gg, costo_gtes_area_total, costo_pms_total, costo_nomina_total, gastos_fijos]
-    
-    fig_tree = go.Figure(go.Treemap(
-        labels = labels, parents = parents, values = values, textinfo = "label+value+percent parent"
-    ))
-    st.plotly_chart(fig_tree, use_container_width=True)
+    with perfil.etapa("figura: treemap costos"):
+        fig_tree = figura_estructura_costos(salario_gg, costo_gtes_area_total, costo_pms_total, costo_nomina_total, gastos_fijos)
+    with perfil.etapa("render: plotly"):
+        st.plotly_chart(fig_tree, use_container_width=True)
     
     col_det1, col_det2 = st.columns(2)
     with col_det1:
@@ -232,9 +361,615 @@ with tab_flota:
     with col_det2:
         st.warning(f"**Costo Nómina Técnica Total:** ${costo_nomina_total:,.0f}")
 
+perfil.marcar("pestaña Flota & Costos")
+
 with tab_prediccion:
-    st.subheader("🔮 Forecast de Mercado")
-    fig_line = px.line(df_forecast, x="Mes Futuro", y=["Demanda Proyectada", "Capacidad Actual"], 
-                       markers=True, title="Forecast de Demanda a 6 Meses")
-    st.plotly_chart(fig_line, use_container_width=True)
-    st.dataframe(df_forecast.style.applymap(lambda v: 'color: red;' if v == 'Saturado' else 'color: green;', subset=['Estado']))
\ No newline at end of file
+    st.subheader("🔮 Forecast de Mercado (Monte Carlo)")
+    st.caption(f"{mc_trayectorias:,} trayectorias x {mc_meses} meses. Banda sombreada: P10-P90; línea: mediana (P50).")
+
+    cp1, cp2, cp3 = st.columns(3)
+    cp1.metric("Prob. Saturación Máxima", f"{df_forecast['Prob. Saturación'].max()*100:.1f}%")
+    cp2.metric("Meses con Riesgo > 50%", f"{(df_forecast['Prob. Saturación'] >= 0.5).sum()} / {mc_meses}")
+    cp3.metric("Demanda P90 Pico", f"{df_forecast['P90'].max():,.0f} hrs")
+
+    with perfil.etapa("figura: pronóstico"):
+        fig_line = figura_pronostico(df_forecast)
+    with perfil.etapa("render: plotly"):
+        st.plotly_chart(fig_line, use_container_width=True)
+    with perfil.etapa("styler: pronóstico"):
+        styler_forecast = (df_forecast.style.format({"P10": "{:,.0f}", "Demanda Proyectada": "{:,.0f}", "P90": "{:,.0f}", "Capacidad Actual": "{:,.0f}", "Prob. Saturación": "{:.1%}"})
+                           .applymap(lambda v: 'color: red;' if v == 'Saturado' else 'color: green;', subset=['Estado']))
+    with perfil.etapa("render: dataframe"):
+        st.dataframe(styler_forecast)
+
+    st.divider()
+    st.subheader("📅 Horizonte Largo (Resolución Diaria)")
+    st.caption("Pronóstico esperado día a día por tipo de avión y departamento (float32). El gráfico se agrega en el servidor a días, semanas o meses según el horizonte.")
+
+    cl1, cl2, cl3, cl4 = st.columns(4)
+    largo_anios = cl1.slider("Horizonte (Años)", 1, 15, 10)
+    largo_crecimiento = cl2.number_input("Crecimiento Anual (%)", value=3.0, step=0.5) / 100
+    largo_desglose = cl3.selectbox("Desglose", ["Departamento", "Tipo de Avión"])
+    largo_resolucion = cl4.selectbox("Resolución del Gráfico", ["Automática", "Diaria", "Semanal", "Mensual"])
+    largo_sin_domingos = st.checkbox("Sin inducciones en domingo", value=False, help="Redistribuye la demanda semanal entre lunes y sábado")
+
+    with perfil.etapa("motor: pronóstico diario"):
+        largo = pronostico_diario_cache(
+            cantidades_flota, capacidad_total, anios=largo_anios, factor_tendencia=mc_tendencia,
+            crecimiento_anual=largo_crecimiento, patron_semanal=[1, 1, 1, 1, 1, 1, 0] if largo_sin_domingos else None
+        )
+    frecuencia = {"Automática": None, "Diaria": "D", "Semanal": "W", "Mensual": "M"}[largo_resolucion]
+    if largo_desglose == "Departamento":
+        series_diarias, nombres_series = largo["demanda"].sum(axis=0), [d.capitalize() for d in largo["departamentos"]]
+    else:
+        series_diarias, nombres_series = largo["demanda"].sum(axis=1), list(largo["claves"])
+    total_diario = series_diarias.sum(axis=0)
+
+    with perfil.etapa("figura: pronóstico diario"):
+        agregado_total = agregar_serie_diaria(largo["fechas"], total_diario, frecuencia=frecuencia)
+        agregado_series = agregar_serie_diaria(largo["fechas"], series_diarias, frecuencia=agregado_total["frecuencia"])
+        agregado_capacidad = agregar_serie_diaria(largo["fechas"], largo["capacidad"], frecuencia=agregado_total["frecuencia"])
+        nombre_frecuencia = {"D": "diaria", "W": "semanal", "M": "mensual"}[agregado_total["frecuencia"]]
+        fig_largo = figura_pronostico_diario(agregado_total, agregado_series, nombres_series, agregado_capacidad,
+                                             f"Demanda Diaria Esperada a {largo_anios} Años (agregación {nombre_frecuencia})")
+
+    cl5, cl6, cl7 = st.columns(3)
+    cl5.metric("Días Saturados", f"{(total_diario > largo['capacidad']).sum():,} / {len(largo['fechas']):,}")
+    cl6.metric("Pico Diario", f"{total_diario.max():,.0f} hrs")
+    cl7.metric("Memoria del Pronóstico", f"{largo['demanda'].nbytes / 1e6:,.2f} MB", f"{largo['demanda'].size:,} celdas float32", delta_color="off")
+    with perfil.etapa("render: plotly"):
+        st.plotly_chart(fig_largo, use_container_width=True)
+
+perfil.marcar("pestaña Predicción")
+
+with tab_mapa:
+    st.subheader("🗺️ Mapa de Utilidad por Plantilla y Horas Extra")
+    st.markdown("Evalúa toda la malla de configuraciones de personal en un solo cálculo vectorizado (demanda, admin y gastos fijos según la barra lateral).")
+
+    NOMBRES_PLANTILLA = {
+        "av_tecnicos": "Técnicos Aviónica",
+        "otros_tecnicos": "Otros Técnicos",
+        "he_15": "Extras 1.5x (Hrs/sem/tec)",
+        "he_20": "Domingos 2.0x (Días/mes/tec)",
+        "salario_tecnico_base": "Costo Hora Técnico Base ($)",
+    }
+    valores_actuales = {
+        "av_tecnicos": av_tecnicos, "otros_tecnicos": otros_tecnicos,
+        "he_15": he_15, "he_20": he_20, "salario_tecnico_base": salario_tecnico_base,
+    }
+    # (mínimo, máximo, paso) por defecto de cada eje
+    RANGOS_DEFECTO = {
+        "av_tecnicos": (0.0, 100.0, 1.0),
+        "otros_tecnicos": (0.0, 1000.0, 5.0),
+        "he_15": (0.0, 15.0, 1.0),
+        "he_20": (0.0, 4.0, 1.0),
+        "salario_tecnico_base": (10.0, 20.0, 0.5),
+    }
+
+    col_m1, col_m2, col_m3 = st.columns(3)
+    with col_m1:
+        eje_x = st.selectbox("Eje X", VARIABLES_PLANTILLA, index=1, format_func=NOMBRES_PLANTILLA.get)
+    with col_m2:
+        opciones_y = [v for v in VARIABLES_PLANTILLA if v != eje_x]
+        eje_y = st.selectbox("Eje Y", opciones_y, index=opciones_y.index("he_15") if "he_15" in opciones_y else 0, format_func=NOMBRES_PLANTILLA.get)
+    with col_m3:
+        barrer_resto = st.checkbox("Barrer también el resto", value=False, help="Si se activa, cada celda muestra la mejor utilidad posible sobre las demás variables")
+
+    rangos = {}
+    with st.expander("Rangos del barrido"):
+        for var in VARIABLES_PLANTILLA:
+            if var in (eje_x, eje_y) or barrer_resto:
+                r_min, r_max, r_paso = RANGOS_DEFECTO[var]
+                cr1, cr2, cr3 = st.columns(3)
+                v_min = cr1.number_input(f"{NOMBRES_PLANTILLA[var]} mín.", value=r_min, key=f"mapa_min_{var}")
+                v_max = cr2.number_input(f"{NOMBRES_PLANTILLA[var]} máx.", value=r_max, key=f"mapa_max_{var}")
+                v_paso = cr3.number_input(f"{NOMBRES_PLANTILLA[var]} paso", value=r_paso, min_value=0.01, key=f"mapa_paso_{var}")
+                rangos[var] = np.arange(v_min, v_max + v_paso / 2, v_paso)
+            else:
+                rangos[var] = valores_actuales[var]
+
+    with perfil.etapa("motor: barrido de plantilla"):
+        mapa, mejor_config, mejor_utilidad, n_configuraciones, t_calculo = mapa_utilidad(
+            rangos, eje_x, eje_y, demanda_total_horas, demanda_avionica_horas, tarifa_venta, costo_admin_mensual, gastos_fijos
+        )
+
+    cm1, cm2, cm3 = st.columns(3)
+    cm1.metric("Configuraciones Evaluadas", f"{n_configuraciones:,}")
+    cm2.metric("Tiempo de Cálculo", f"{t_calculo*1000:,.1f} ms")
+    cm3.metric("Mejor Utilidad del Barrido", f"${mejor_utilidad/1000:,.1f}k", delta=f"{(mejor_utilidad-utilidad_neta)/1000:,.1f}k vs actual")
+
+    fig_mapa = go.Figure(go.Heatmap(
+        z=mapa, x=np.atleast_1d(rangos[eje_x]), y=np.atleast_1d(rangos[eje_y]),
+        colorscale="RdYlGn", zmid=0, colorbar={'title': "Utilidad ($)"}
+    ))
+    fig_mapa.add_trace(go.Scatter(
+        x=[valores_actuales[eje_x]], y=[valores_actuales[eje_y]], mode="markers",
+        marker={'symbol': "x", 'size': 14, 'color': "black"}, name="Configuración actual"
+    ))
+    fig_mapa.update_layout(xaxis_title=NOMBRES_PLANTILLA[eje_x], yaxis_title=NOMBRES_PLANTILLA[eje_y])
+    with perfil.etapa("render: plotly"):
+        st.plotly_chart(fig_mapa, use_container_width=True)
+
+    st.info("**Mejor configuración encontrada:** " + " | ".join(f"{NOMBRES_PLANTILLA[v]}: {mejor_config[v]:,.1f}" for v in VARIABLES_PLANTILLA))
+
+perfil.marcar("pestaña Mapa de Utilidad")
+
+with tab_optimizador:
+    st.subheader("🧮 Optimizador de Plantilla y Horas Extra")
+    st.markdown("Busca la mezcla entera de técnicos, horas extra, PMs y gerentes que cubre la demanda del mes al menor costo (o con la mayor utilidad).")
+
+    col_o1, col_o2, col_o3 = st.columns(3)
+    with col_o1:
+        objetivo_opt = st.radio("Objetivo", ["Menor costo", "Mayor utilidad"], help="Ambos objetivos cubren la demanda total y la de aviónica")
+        permitir_sin_cubrir = st.checkbox("Permitir demanda total sin cubrir", value=False, disabled=objetivo_opt != "Mayor utilidad",
+                                          help="Solo en 'Mayor utilidad': se contrata para la demanda total únicamente si el margen por hora es positivo")
+    with col_o2:
+        exigir_horizonte = st.checkbox("Cubrir también el horizonte del pronóstico", value=False)
+        banda_horizonte = st.selectbox("Banda a cubrir", ["Demanda Proyectada", "P90"], format_func=lambda b: "P50" if b == "Demanda Proyectada" else b, disabled=not exigir_horizonte)
+    with col_o3:
+        aviones_por_pm = st.number_input("Aviones por PM (máx.)", value=2, min_value=1)
+        tecnicos_por_gerente = st.number_input("Técnicos por Gte. Área (máx.)", value=200, min_value=1)
+
+    limites_opt = {}
+    with st.expander("Límites de Búsqueda"):
+        for var, (lim_min, lim_max) in LIMITES_OPTIMIZADOR.items():
+            cl1, cl2 = st.columns(2)
+            limites_opt[var] = (
+                cl1.number_input(f"{var} mín.", value=lim_min, min_value=0, key=f"opt_min_{var}"),
+                cl2.number_input(f"{var} máx.", value=lim_max, min_value=0, key=f"opt_max_{var}"),
+            )
+
+    t_inicio = time.perf_counter()
+    alternativas = optimizar_cache(
+        demanda_total_horas, demanda_avionica_horas, salario_tecnico_base, tarifa_venta,
+        salario_gg, salario_gte_area, salario_pm, gastos_fijos,
+        cantidad_aviones=cantidades_flota.sum(),
+        limites=limites_opt, objetivo="costo" if objetivo_opt == "Menor costo" else "utilidad",
+        demanda_horizonte=df_forecast[banda_horizonte].to_numpy() if exigir_horizonte else None,
+        aviones_por_pm=aviones_por_pm, tecnicos_por_gerente=tecnicos_por_gerente,
+        cubrir_demanda_total=not (permitir_sin_cubrir and objetivo_opt == "Mayor utilidad"),
+    )
+    t_calculo = time.perf_counter() - t_inicio
+
+    if len(alternativas["costo_total"]) == 0:
+        st.error("No existe una combinación factible dentro de los límites. Amplía los máximos de personal u horas extra.")
+    else:
+        mejor = {k: v[0] for k, v in alternativas.items()}
+        costo_actual = costo_nomina_total + costo_admin_mensual
+
+        co1, co2, co3 = st.columns(3)
+        co1.metric("Costo Mensual Óptimo", f"${mejor['costo_total']/1000:,.1f}k", delta=f"{(mejor['costo_total']-costo_actual)/1000:,.1f}k vs actual", delta_color="inverse")
+        co2.metric("Utilidad Neta Óptima", f"${mejor['utilidad_neta']/1000:,.1f}k", delta=f"{(mejor['utilidad_neta']-utilidad_neta)/1000:,.1f}k vs actual")
+        co3.metric("Tiempo de Búsqueda", f"{t_calculo*1000:,.1f} ms")
+        if mejor["capacidad_total"] < demanda_total_horas:
+            st.warning(f"Plan sin cubrir la demanda total: quedan {demanda_total_horas - mejor['capacidad_total']:,.0f} hrs/mes sin atender "
+                       "('Permitir demanda total sin cubrir').")
+
+        st.markdown("### Plan Recomendado vs Actual")
+        st.dataframe(pd.DataFrame({
+            "Variable": ["Técnicos Aviónica", "Otros Técnicos", "Extras 1.5x (Hrs/sem/tec)", "Domingos 2.0x (Días/mes/tec)", "Project Managers", "Gerentes de Área"],
+            "Actual": [av_tecnicos, otros_tecnicos, he_15, he_20, cant_pms, cant_gtes_area],
+            "Óptimo": [mejor["av_tecnicos"], mejor["otros_tecnicos"], mejor["he_15"], mejor["he_20"], mejor["cant_pms"], mejor["cant_gtes_area"]],
+        }).style.format({"Actual": "{:,.0f}", "Óptimo": "{:,.0f}"}), hide_index=True)
+
+        st.markdown("### Mejores Alternativas")
+        df_alternativas = pd.DataFrame({
+            "Téc. Aviónica": alternativas["av_tecnicos"], "Otros Téc.": alternativas["otros_tecnicos"],
+            "Extras 1.5x": alternativas["he_15"], "Domingos 2.0x": alternativas["he_20"],
+            "PMs": alternativas["cant_pms"], "Gtes Área": alternativas["cant_gtes_area"],
+            "Capacidad (hrs)": alternativas["capacidad_total"], "Costo Total": alternativas["costo_total"],
+            "Utilidad Neta": alternativas["utilidad_neta"],
+        }).head(10)
+        st.dataframe(df_alternativas.style.format("{:,.0f}"), hide_index=True)
+
+perfil.marcar("pestaña Optimizador")
+
+with tab_hangar:
+    st.subheader("🛬 Programación de Bahías (Eventos Discretos)")
+    st.markdown("Simula inducciones día a día: la mezcla de flota se toma como **inducciones por mes** y cada avión espera bahía libre. Dentro de la bahía, el trabajo de cada departamento espera una cuadrilla libre: la plantilla por departamento (pestaña Departamentos) se reparte en turnos y cuadrillas compartidas por todas las bahías, así que un departamento saturado alarga el check.")
+
+    col_h1, col_h2, col_h3 = st.columns(3)
+    with col_h1:
+        n_bahias = st.number_input("Bahías de Hangar", value=12, min_value=1)
+        turnos_por_dia = st.number_input("Turnos por Día", value=2, min_value=1, max_value=3)
+        max_tecnicos_por_avion = st.number_input("Máx. Técnicos por Avión y Turno (por Depto.)", value=25, min_value=1)
+    with col_h2:
+        anios_hangar = st.slider("Horizonte (Años)", 1, 10, 5)
+        replicas_hangar = st.select_slider("Réplicas", [10, 50, 100, 200], value=100)
+        semilla_hangar = st.number_input("Semilla", value=42, min_value=0, key="semilla_hangar")
+    with col_h3:
+        cv_duracion = st.slider("Variabilidad Duración Check (CV)", 0.0, 0.6, 0.20)
+        prob_escasez_check = st.slider("Prob. Escasez de Piezas por Check", 0.0, 1.0, 0.30)
+        retraso_escasez_dias = st.number_input("Retraso Medio por Escasez (Días)", value=5.0, min_value=0.0)
+
+    horas_tecnico_mes, _ = calcular_nomina_compleja(1, salario_tecnico_base, he_15, he_20)
+    # Solo cuentan los tipos con inducciones: un departamento sin técnicos no bloquea tipos que no llegan
+    horas_hangar = registro_flota["horas_departamento"] * (cantidades_flota > 0)[:, None]
+    try:
+        cuadrillas = cuadrillas_departamentos(
+            horas_hangar, df_deptos["tecnicos"].to_numpy(dtype=float), horas_tecnico_mes=horas_tecnico_mes,
+            turnos_por_dia=turnos_por_dia, max_tecnicos_por_avion=max_tecnicos_por_avion,
+            departamentos=df_deptos["departamento"].to_numpy(),
+        )
+    except ValueError as error:
+        cuadrillas = None
+        st.error(f"{error}. Asigna técnicos en la pestaña Departamentos para simular el hangar.")
+
+    if cuadrillas is not None:
+        t_inicio = time.perf_counter()
+        sim_hangar = simular_hangar_cache(
+            cantidades_flota, horas_hangar, cuadrillas["cuadrillas"], cuadrillas["horas_dia_cuadrilla"], n_bahias,
+            anios=anios_hangar, n_replicas=replicas_hangar, cv_duracion=cv_duracion, prob_escasez=prob_escasez_check,
+            retraso_escasez_dias=retraso_escasez_dias, semilla=semilla_hangar,
+        )
+        t_calculo = time.perf_counter() - t_inicio
+
+        ch1, ch2, ch3, ch4 = st.columns(4)
+        ch1.metric("TAT Medio", f"{sim_hangar['tat_medio']:,.1f} días", help="Desde la llegada hasta la entrega, incluidas las esperas por bahía y por cuadrilla")
+        ch2.metric("TAT P90", f"{sim_hangar['tat_p90']:,.1f} días")
+        ch3.metric("Utilización de Bahías", f"{sim_hangar['utilizacion_bahias'].mean()*100:.1f}%")
+        ch4.metric("Backlog Final (En Cola)", f"{sim_hangar['backlog_cola'][:, -1].mean():,.1f} aviones")
+        st.caption(f"{sim_hangar['inducciones'].mean():,.0f} inducciones promedio por réplica x {replicas_hangar} réplicas en {t_calculo*1000:,.0f} ms.")
+
+        col_hg1, col_hg2 = st.columns(2)
+        with col_hg1:
+            meses_hangar = np.arange(1, sim_hangar["backlog_cola"].shape[1] + 1)
+            p50_cola, p90_cola = np.quantile(sim_hangar["backlog_cola"], [0.5, 0.9], axis=0)
+            fig_backlog = go.Figure()
+            fig_backlog.add_trace(go.Scatter(x=meses_hangar, y=p90_cola, mode="lines", name="Cola P90", line={'dash': "dot"}))
+            fig_backlog.add_trace(go.Scatter(x=meses_hangar, y=p50_cola, mode="lines", name="Cola P50"))
+            fig_backlog.add_trace(go.Scatter(x=meses_hangar, y=sim_hangar["backlog_hangar"].mean(axis=0), mode="lines", name="En Hangar (media)"))
+            fig_backlog.update_layout(title="Backlog al Cierre de Cada Mes", xaxis_title="Mes", yaxis_title="Aviones")
+            st.plotly_chart(fig_backlog, use_container_width=True)
+        with col_hg2:
+            tipos_activos = np.flatnonzero(cantidades_flota > 0)
+            st.markdown("**Duración y TAT por Tipo**")
+            st.dataframe(pd.DataFrame({
+                "Tipo": registro_flota["claves"][tipos_activos],
+                "Inducciones/Mes": cantidades_flota[tipos_activos],
+                "Duración sin Esperas (días)": cuadrillas["duracion_dias"][tipos_activos],
+                "TAT Medio (días)": [sim_hangar["tat"][sim_hangar["tipos_tat"] == t].mean() if np.any(sim_hangar["tipos_tat"] == t) else np.nan for t in tipos_activos],
+            }).style.format({"Inducciones/Mes": "{:,.0f}", "Duración sin Esperas (días)": "{:,.1f}", "TAT Medio (días)": "{:,.1f}"}), hide_index=True)
+            st.markdown("**Cuadrillas por Departamento**")
+            st.dataframe(pd.DataFrame({
+                "Departamento": df_deptos["departamento"],
+                "Cuadrillas": cuadrillas["cuadrillas"],
+                "Horas-Hombre/Día por Cuadrilla": cuadrillas["horas_dia_cuadrilla"],
+                "Utilización": sim_hangar["utilizacion_departamentos"].mean(axis=0),
+                "Espera Media por Cuadrilla (días)": np.nanmean(sim_hangar["espera_departamentos"], axis=0),
+            }).style.format({"Horas-Hombre/Día por Cuadrilla": "{:,.0f}", "Utilización": "{:.0%}",
+                             "Espera Media por Cuadrilla (días)": "{:,.1f}"}), hide_index=True)
+
+perfil.marcar("pestaña Hangar")
+
+with tab_sensibilidad:
+    st.subheader("🌪️ Sensibilidad de la Utilidad Neta")
+    st.markdown("Perturba cada entrada numérica de la barra lateral (y cada tipo de avión de la flota) en un solo cálculo vectorizado del motor.")
+
+    ETIQUETAS_ENTRADAS = {
+        "av_tecnicos": "Técnicos Aviónica", "av_encargados": "Encargados Aviónica", "av_jefatura": "Jefatura Aviónica",
+        "otros_tecnicos": "Otros Técnicos", "salario_gg": "Salario Gerente General", "cant_gtes_area": "Cant. Gtes Área",
+        "salario_gte_area": "Salario Gte Área", "cant_pms": "Cant. Project Managers", "salario_pm": "Salario Project Mgr",
+        "salario_tecnico_base": "Costo Hora Técnico Base", "he_15": "Extras 1.5x", "he_20": "Domingos 2.0x",
+        "tarifa_venta": "Tarifa Venta", "gastos_fijos": "Gastos Fijos Planta",
+    }
+    def etiqueta_sensibilidad(variable):
+        return f"Flota {variable.removeprefix('flota:')}" if variable.startswith("flota:") else ETIQUETAS_ENTRADAS[variable]
+
+    variacion_pct = st.slider("Variación de cada entrada (±%)", 1, 50, 10)
+    sens = analisis_sensibilidad(cantidades_flota, entradas_actuales, variacion_pct / 100)
+    df_sens = pd.DataFrame({
+        "Variable": [etiqueta_sensibilidad(v) for v in sens["variables"]],
+        f"Utilidad -{variacion_pct}%": sens["utilidad_baja"],
+        f"Utilidad +{variacion_pct}%": sens["utilidad_alta"],
+        "Elasticidad": sens["elasticidad"],
+    })
+    df_sens["Rango"] = (df_sens[f"Utilidad +{variacion_pct}%"] - df_sens[f"Utilidad -{variacion_pct}%"]).abs()
+    df_sens = df_sens.sort_values("Rango", ascending=True)
+
+    fig_tornado = go.Figure()
+    fig_tornado.add_trace(go.Bar(y=df_sens["Variable"], x=df_sens[f"Utilidad -{variacion_pct}%"] - sens["utilidad_base"],
+                                 orientation="h", name=f"-{variacion_pct}%", marker_color="indianred"))
+    fig_tornado.add_trace(go.Bar(y=df_sens["Variable"], x=df_sens[f"Utilidad +{variacion_pct}%"] - sens["utilidad_base"],
+                                 orientation="h", name=f"+{variacion_pct}%", marker_color="seagreen"))
+    fig_tornado.update_layout(barmode="overlay", title=f"Tornado: Cambio en Utilidad Neta (base ${sens['utilidad_base']/1000:,.1f}k)",
+                              xaxis_title="Δ Utilidad Neta ($)", height=max(400, 28 * len(df_sens)))
+    st.plotly_chart(fig_tornado, use_container_width=True)
+
+    st.dataframe(df_sens.sort_values("Rango", ascending=False).drop(columns="Rango").style.format({
+        f"Utilidad -{variacion_pct}%": "${:,.0f}", f"Utilidad +{variacion_pct}%": "${:,.0f}", "Elasticidad": "{:+.2f}",
+    }), hide_index=True)
+
+    st.markdown("### Interacción de Dos Variables")
+    opciones_sens = variables_sensibilidad(cantidades_flota, entradas_actuales)
+    cs1, cs2, cs3 = st.columns(3)
+    with cs1:
+        sens_x = st.selectbox("Variable X", opciones_sens, index=opciones_sens.index("tarifa_venta"), format_func=etiqueta_sensibilidad)
+    with cs2:
+        opciones_sens_y = [v for v in opciones_sens if v != sens_x]
+        sens_y = st.selectbox("Variable Y", opciones_sens_y, index=opciones_sens_y.index("salario_tecnico_base") if "salario_tecnico_base" in opciones_sens_y else 0, format_func=etiqueta_sensibilidad)
+    with cs3:
+        rango_malla_pct = st.slider("Rango de la malla (±%)", 5, 50, 20)
+
+    mult_sens, utilidad_sens = malla_sensibilidad(cantidades_flota, entradas_actuales, sens_x, sens_y, rango_malla_pct / 100, pasos=41)
+    ejes_pct = (mult_sens - 1) * 100
+    fig_interaccion = go.Figure(go.Heatmap(z=utilidad_sens, x=ejes_pct, y=ejes_pct, colorscale="RdYlGn", zmid=0, colorbar={'title': "Utilidad ($)"}))
+    fig_interaccion.update_layout(xaxis_title=f"{etiqueta_sensibilidad(sens_x)} (Δ%)", yaxis_title=f"{etiqueta_sensibilidad(sens_y)} (Δ%)")
+    st.plotly_chart(fig_interaccion, use_container_width=True)
+
+perfil.marcar("pestaña Sensibilidad")
+
+with tab_escenarios:
+    st.subheader("💾 Escenarios Guardados")
+    st.markdown(f"Guarda las entradas de la barra lateral con sus KPIs en un almacén SQLite local ({len(almacen_escenarios):,} escenarios). Si un juego de entradas idéntico ya fue calculado, se reutiliza su resultado.")
+
+    iguales = almacen_escenarios.buscar_por_huella(cantidades_flota, entradas_actuales)
+    if iguales:
+        st.info(f"Las entradas actuales coinciden con: {', '.join(iguales)}")
+
+    ce1, ce2, ce3 = st.columns([3, 1, 1])
+    # Valor por defecto fijo por sesión (un default que cambia entre reruns reinicia el widget y borra lo escrito)
+    st.session_state.setdefault("nombre_escenario", f"Escenario {len(almacen_escenarios) + 1}")
+    nombre_escenario = ce1.text_input("Nombre del Escenario", key="nombre_escenario")
+    sobrescribir = ce2.checkbox("Sobrescribir si existe")
+    if ce3.button("Guardar Escenario", type="primary"):
+        try:
+            _, reutilizado = almacen_escenarios.guardar(nombre_escenario, cantidades_flota, entradas_actuales, sobrescribir)
+            st.success(f"'{nombre_escenario}' guardado" + (" (resultado reutilizado de la caché)" if reutilizado else ""))
+        except sqlite3.IntegrityError:
+            st.error(f"Ya existe un escenario llamado '{nombre_escenario}'. Marca 'Sobrescribir si existe' o usa otro nombre.")
+
+    ETIQUETAS_KPI = {
+        "ingreso_total": "Ingreso Total", "utilidad_neta": "Utilidad Neta", "ocupacion": "Ocupación",
+        "saturacion_avionica": "Saturación Aviónica", "margen_avionica": "Margen Aviónica",
+        "costo_nomina_total": "Nómina Total", "costo_admin_mensual": "Costo Admin", "demanda_total_horas": "Demanda (hrs)",
+        "capacidad_total": "Capacidad (hrs)",
+    }
+
+    st.markdown("#### Filtrar y Ordenar")
+    st.caption("Los filtros vacíos no se aplican.")
+    cf1, cf2, cf3, cf4, cf5, cf6 = st.columns(6)
+    filtro_utilidad = cf1.number_input("Utilidad Neta Mínima ($)", value=None, step=100_000)
+    filtro_ocupacion = cf2.number_input("Ocupación Mínima (%)", value=None, min_value=0.0, step=5.0)
+    filtro_saturacion = cf3.number_input("Saturación Aviónica Máxima (%)", value=None, min_value=0.0, step=10.0)
+    incluir_no_finitos = cf4.checkbox("Incluir KPIs no finitos", value=True,
+                                      help="Escenarios con KPIs infinitos o sin dato (p. ej. saturación con capacidad de aviónica 0) pasan los filtros")
+    orden_kpi = cf5.selectbox("Ordenar por", KPIS_ESCENARIO, index=KPIS_ESCENARIO.index("utilidad_neta"), format_func=ETIQUETAS_KPI.get)
+    limite_filas = cf6.number_input("Máx. Filas", value=200, min_value=1)
+
+    df_escenarios = almacen_escenarios.filtrar(
+        minimos={"utilidad_neta": filtro_utilidad, "ocupacion": None if filtro_ocupacion is None else filtro_ocupacion / 100},
+        maximos={"saturacion_avionica": None if filtro_saturacion is None else filtro_saturacion / 100},
+        orden=orden_kpi, limite=limite_filas, incluir_no_finitos=incluir_no_finitos,
+    )
+    st.dataframe(
+        df_escenarios.rename(columns={**ETIQUETAS_KPI, "nombre": "Escenario", "creado": "Creado"}).style.format({
+            "Ingreso Total": "${:,.0f}", "Utilidad Neta": "${:,.0f}", "Ocupación": "{:.1%}", "Saturación Aviónica": "{:.1%}",
+            "Margen Aviónica": "${:,.0f}", "Nómina Total": "${:,.0f}", "Costo Admin": "${:,.0f}",
+            "Demanda (hrs)": "{:,.0f}", "Capacidad (hrs)": "{:,.0f}",
+        }),
+        hide_index=True, use_container_width=True,
+    )
+
+    nombres_guardados = almacen_escenarios.filtrar(orden="nombre", descendente=False)["nombre"].tolist()
+    if len(nombres_guardados) >= 2:
+        st.markdown("#### Comparar Dos Escenarios")
+        cd1, cd2 = st.columns(2)
+        escenario_a = cd1.selectbox("Escenario A", nombres_guardados, index=0)
+        escenario_b = cd2.selectbox("Escenario B", nombres_guardados, index=1)
+        if escenario_a == escenario_b:
+            st.warning("Elige dos escenarios distintos.")
+        else:
+            st.dataframe(almacen_escenarios.diferencias(escenario_a, escenario_b), hide_index=True, use_container_width=True)
+
+    if nombres_guardados:
+        with st.expander("🗑️ Eliminar Escenario"):
+            escenario_borrar = st.selectbox("Escenario", nombres_guardados, key="escenario_borrar")
+            if st.button("Eliminar"):
+                almacen_escenarios.eliminar(escenario_borrar)
+                st.rerun()
+
+perfil.marcar("pestaña Escenarios")
+
+with tab_multisitio:
+    st.subheader("🏢 Red de Hangares (Multi-Sitio)")
+    st.markdown("Cada fila es un hangar con su propia flota, plantilla y finanzas; todos se evalúan en un solo cálculo vectorizado. Columnas de flota con las claves del registro (p. ej. `B757-C`) y de entradas con los nombres del motor (`av_tecnicos`, `tarifa_venta`, ...); las que falten toman el valor de la barra lateral.")
+
+    fuente_sitios = st.radio("Fuente de Sitios", ["Tabla editable", "Cargar CSV", "Sitios de ejemplo"], horizontal=True)
+    COLUMNAS_SITIO = ["av_tecnicos", "otros_tecnicos", "he_15", "he_20", "salario_tecnico_base", "tarifa_venta", "gastos_fijos", "cant_pms"]
+    claves_activas = [str(c) for c, qty in zip(registro_flota["claves"], cantidades_flota) if qty > 0] or list(FLOTA_DEFECTO)
+
+    if fuente_sitios == "Tabla editable":
+        base_sitio = {**{c: cantidades_flota[registro_flota["indice"][c]] for c in claves_activas}, **{c: entradas_actuales[c] for c in COLUMNAS_SITIO}}
+        df_sitios = st.data_editor(pd.DataFrame([
+            {"Sitio": "Sitio Principal", **base_sitio},
+            {"Sitio": "Sitio Norte", **base_sitio, **{c: base_sitio[c] * 2 for c in claves_activas}},
+            {"Sitio": "Sitio Sur", **base_sitio, "otros_tecnicos": entradas_actuales["otros_tecnicos"] * 1.5, "tarifa_venta": entradas_actuales["tarifa_venta"] * 0.9},
+        ]), num_rows="dynamic", use_container_width=True, key="editor_sitios")
+    elif fuente_sitios == "Cargar CSV":
+        archivo_sitios = st.file_uploader("CSV de sitios (mismo formato que el plan de lote_mro.py)", type="csv")
+        df_sitios = pd.read_csv(archivo_sitios) if archivo_sitios is not None else pd.DataFrame(columns=["Sitio"])
+    else:
+        cs1, cs2 = st.columns(2)
+        n_sitios_ejemplo = cs1.slider("Cantidad de Sitios", 5, 500, 60)
+        semilla_sitios = cs2.number_input("Semilla", value=7, min_value=0, key="semilla_sitios")
+        rng_sitios = np.random.default_rng(semilla_sitios)
+        escala_sitio = rng_sitios.lognormal(0, 0.5, n_sitios_ejemplo)
+        df_sitios = pd.DataFrame({
+            "Sitio": [f"Sitio {i+1:03d}" for i in range(n_sitios_ejemplo)],
+            **{c: rng_sitios.poisson(cantidades_flota[registro_flota["indice"][c]] * escala_sitio) for c in claves_activas},
+            "av_tecnicos": np.round(av_tecnicos * rng_sitios.uniform(0.5, 2.0, n_sitios_ejemplo)),
+            "otros_tecnicos": np.round(otros_tecnicos * rng_sitios.uniform(0.5, 1.5, n_sitios_ejemplo)),
+            "tarifa_venta": np.round(tarifa_venta * rng_sitios.uniform(0.85, 1.15, n_sitios_ejemplo), 1),
+            "gastos_fijos": np.round(gastos_fijos * rng_sitios.uniform(0.6, 1.4, n_sitios_ejemplo), -3),
+        })
+        with st.expander(f"Ver {n_sitios_ejemplo} sitios generados"):
+            st.dataframe(df_sitios, hide_index=True, use_container_width=True)
+
+    cr1, cr2, cr3 = st.columns(3)
+    redistribuir_sitios = cr1.checkbox("Mover demanda excedente a sitios con holgura", value=True)
+    fraccion_transferible = cr2.slider("Fracción del Excedente Transferible", 0.0, 1.0, 1.0, disabled=not redistribuir_sitios)
+    costo_traslado_hora = cr3.number_input("Costo de Traslado ($/hora movida)", value=5.0, min_value=0.0, disabled=not redistribuir_sitios)
+
+    error_sitios = None
+    if not df_sitios.empty:
+        df_sitios = df_sitios.reset_index(drop=True)
+        nombres_sitios = df_sitios["Sitio"].astype(str).tolist() if "Sitio" in df_sitios.columns else [f"Sitio {i+1}" for i in range(len(df_sitios))]
+        tabla_sitios = df_sitios.assign(**{c: v for c, v in entradas_actuales.items() if c not in df_sitios.columns})
+        try:
+            cantidades_sitios, entradas_sitios, _ = leer_tabla_escenarios(tabla_sitios, registro_flota)
+        except ValueError as error:
+            error_sitios = str(error)
+
+    if df_sitios.empty:
+        st.info("Agrega al menos un sitio para evaluar la red.")
+    elif error_sitios is not None:
+        st.error(error_sitios)
+    else:
+        t_inicio = time.perf_counter()
+        pronostico_sitios = dict(meses=mc_meses, factor_tendencia=mc_tendencia, prob_escasez=mc_prob_escasez, fraccion_retraso=mc_fraccion_retraso)
+        red_sin = multisitio_cache(cantidades_sitios, entradas_sitios, **pronostico_sitios)
+        red = multisitio_cache(cantidades_sitios, entradas_sitios, redistribuir=redistribuir_sitios, fraccion_transferible=fraccion_transferible,
+                               costo_traslado_hora=costo_traslado_hora, **pronostico_sitios)
+        t_calculo = time.perf_counter() - t_inicio
+        consolidado, consolidado_sin = red["consolidado"], red_sin["consolidado"]
+
+        cm1, cm2, cm3, cm4 = st.columns(4)
+        cm1.metric("Ingreso Consolidado", f"${consolidado['ingreso_total']/1e6:,.2f}M", f"{(consolidado['ingreso_total'] - consolidado_sin['ingreso_total'])/1e3:+,.0f}k por traslados")
+        cm2.metric("Utilidad Consolidada", f"${consolidado['utilidad_neta']/1e6:,.2f}M", f"{(consolidado['utilidad_neta'] - consolidado_sin['utilidad_neta'])/1e3:+,.0f}k por traslados")
+        cm3.metric("Ocupación de la Red", f"{consolidado['ocupacion']*100:.1f}%", f"{consolidado['horas_recibidas']:,.0f} hrs movidas", delta_color="off")
+        cm4.metric("Sitios Saturados", f"{consolidado['sitios_saturados']} / {len(nombres_sitios)}", f"{consolidado_sin['sitios_saturados']} sin traslados", delta_color="off")
+        st.caption(f"{len(nombres_sitios)} sitios evaluados en {t_calculo*1000:,.1f} ms.")
+
+        sitios = red["sitios"]
+        df_red = pd.DataFrame({
+            "Sitio": nombres_sitios,
+            "Demanda Original (hrs)": red_sin["sitios"]["demanda_total_horas"],
+            "Horas Recibidas": sitios["horas_recibidas"],
+            "Horas Cedidas": sitios["horas_cedidas"],
+            "Demanda Final (hrs)": sitios["demanda_total_horas"],
+            "Capacidad (hrs)": sitios["capacidad_total"],
+            "Ocupación": sitios["ocupacion"],
+            "Ingreso": sitios["ingreso_total"],
+            "Utilidad Neta": sitios["utilidad_neta"],
+        })
+
+        fig_red = go.Figure()
+        fig_red.add_trace(go.Bar(x=nombres_sitios, y=df_red["Capacidad (hrs)"], name="Capacidad", marker_color="lightgray"))
+        fig_red.add_trace(go.Bar(x=nombres_sitios, y=df_red["Demanda Original (hrs)"], name="Demanda Original", marker_color="indianred"))
+        fig_red.add_trace(go.Bar(x=nombres_sitios, y=df_red["Demanda Final (hrs)"], name="Demanda Tras Traslados", marker_color="seagreen"))
+        fig_red.update_layout(barmode="group", title="Demanda vs Capacidad por Sitio", yaxis_title="Horas / mes")
+        st.plotly_chart(fig_red, use_container_width=True)
+
+        col_r1, col_r2 = st.columns([3, 2])
+        with col_r1:
+            st.markdown("#### P&L por Sitio")
+            st.dataframe(df_red.style.format({
+                "Demanda Original (hrs)": "{:,.0f}", "Horas Recibidas": "{:,.0f}", "Horas Cedidas": "{:,.0f}",
+                "Demanda Final (hrs)": "{:,.0f}", "Capacidad (hrs)": "{:,.0f}", "Ocupación": "{:.1%}",
+                "Ingreso": "${:,.0f}", "Utilidad Neta": "${:,.0f}",
+            }), hide_index=True, use_container_width=True)
+        with col_r2:
+            st.markdown("#### P&L Consolidado")
+            st.dataframe(pd.DataFrame({
+                "Concepto": ["Ingreso", "Nómina", "Administración", "Gastos Fijos", "Traslados", "Utilidad Neta"],
+                "Monto": [consolidado["ingreso_total"], -consolidado["costo_nomina_total"], -consolidado["costo_admin_mensual"],
+                          -consolidado["gastos_fijos"], -consolidado["costo_traslados"], consolidado["utilidad_neta"]],
+            }).style.format({"Monto": "${:,.0f}"}), hide_index=True, use_container_width=True)
+
+            origen, destino = np.nonzero(red["traslados"] > 0.5)
+            if len(origen):
+                st.markdown("#### Principales Traslados")
+                df_traslados = pd.DataFrame({
+                    "Origen": np.array(nombres_sitios)[origen], "Destino": np.array(nombres_sitios)[destino],
+                    "Horas": red["traslados"][origen, destino],
+                }).nlargest(15, "Horas")
+                st.dataframe(df_traslados.style.format({"Horas": "{:,.0f}"}), hide_index=True, use_container_width=True)
+
+        demanda_red = red["pronostico_mensual"].sum(axis=0)
+        fig_red_pron = go.Figure()
+        fig_red_pron.add_trace(go.Scatter(x=np.arange(1, mc_meses + 1), y=demanda_red, mode="lines+markers", name="Demanda Esperada de la Red"))
+        fig_red_pron.add_trace(go.Scatter(x=np.arange(1, mc_meses + 1), y=np.full(mc_meses, consolidado["capacidad_total"]), mode="lines",
+                                          line={'dash': "dash", 'color': "red"}, name="Capacidad de la Red"))
+        fig_red_pron.update_layout(title=f"Pronóstico Esperado Consolidado a {mc_meses} Meses", xaxis_title="Mes Futuro", yaxis_title="Horas")
+        st.plotly_chart(fig_red_pron, use_container_width=True)
+
+perfil.marcar("pestaña Multi-Sitio")
+
+with tab_flujo:
+    st.subheader("💵 Flujo de Caja, VPN y TIR")
+    st.markdown(f"Proyecta el P&L mes a mes sobre cada trayectoria de demanda Monte Carlo ({mc_meses} meses, parámetros de la barra lateral) y lo convierte a caja con rampa de contratación, escalamiento salarial y plazos de cobro/pago.")
+
+    cf1, cf2, cf3, cf4 = st.columns(4)
+    with cf1:
+        fc_trayectorias = st.select_slider("Escenarios (Trayectorias)", [1_000, 5_000, 10_000, 20_000], value=10_000)
+        fc_inversion = st.number_input("Inversión Inicial ($)", value=2_000_000, step=100_000, min_value=0)
+    with cf2:
+        fc_plantilla_inicial = st.slider("Plantilla Inicial (% del objetivo)", 0, 100, 70) / 100
+        fc_meses_rampa = st.slider("Meses de Rampa de Contratación", 0, 24, 6)
+        fc_costo_contratacion = st.number_input("Costo por Contratación ($)", value=1_500, step=100, min_value=0)
+    with cf3:
+        fc_escalamiento_salarial = st.number_input("Escalamiento Salarial Anual (%)", value=4.0, step=0.5) / 100
+        fc_escalamiento_tarifa = st.number_input("Escalamiento Tarifa Anual (%)", value=3.0, step=0.5) / 100
+    with cf4:
+        fc_dias_cobro = st.number_input("Plazo de Cobro (días)", value=45, min_value=0, max_value=180)
+        fc_dias_pago = st.number_input("Plazo de Pago Gastos Fijos (días)", value=30, min_value=0, max_value=180)
+        fc_tasa_descuento = st.number_input("Tasa de Descuento Anual (%)", value=12.0, step=0.5) / 100
+
+    t_inicio = time.perf_counter()
+    sim_flujo = trayectorias_cache(
+        cantidades_flota, registro_flota["horas"], capacidad_total, meses=mc_meses, n_trayectorias=fc_trayectorias,
+        factor_tendencia=mc_tendencia, dispersion_llegadas=mc_dispersion, cv_horas=mc_cv_horas,
+        prob_escasez=mc_prob_escasez, fraccion_retraso=mc_fraccion_retraso, semilla=mc_semilla,
+    )
+    flujo = flujo_caja_cache(
+        sim_flujo["trayectorias"], entradas_actuales, fraccion_plantilla_inicial=fc_plantilla_inicial, meses_rampa=fc_meses_rampa,
+        costo_contratacion=fc_costo_contratacion, escalamiento_salarial_anual=fc_escalamiento_salarial,
+        escalamiento_tarifa_anual=fc_escalamiento_tarifa, dias_cobro=fc_dias_cobro, dias_pago=fc_dias_pago,
+        tasa_descuento_anual=fc_tasa_descuento, inversion_inicial=fc_inversion,
+    )
+    t_calculo = time.perf_counter() - t_inicio
+
+    vpn_p10, vpn_p50, vpn_p90 = np.percentile(flujo["vpn"], [10, 50, 90])
+    recuperados = flujo["mes_recuperacion"][flujo["mes_recuperacion"] > 0]
+    ck1, ck2, ck3, ck4 = st.columns(4)
+    ck1.metric("VPN Mediano", f"${vpn_p50/1e6:,.2f}M", f"P10 ${vpn_p10/1e6:,.2f}M · P90 ${vpn_p90/1e6:,.2f}M", delta_color="off")
+    ck2.metric("Prob. VPN < 0", f"{(flujo['vpn'] < 0).mean()*100:.1f}%")
+    ck3.metric("TIR Anual Mediana", f"{np.nanmedian(flujo['tir_anual'])*100:,.1f}%" if np.isfinite(flujo["tir_anual"]).any() else "N/A")
+    ck4.metric("Recuperación Mediana", f"Mes {np.median(recuperados):.0f}" if len(recuperados) else "Fuera del horizonte",
+               f"{len(recuperados)/len(flujo['vpn'])*100:.0f}% recupera en el horizonte", delta_color="off")
+    st.caption(f"{len(flujo['vpn']):,} escenarios x {mc_meses} meses en {t_calculo*1000:,.0f} ms. Necesidad de caja (P90): ${-np.percentile(flujo['caja_minima'], 10):,.0f}.")
+
+    col_f1, col_f2 = st.columns(2)
+    with col_f1:
+        bandas_caja = np.percentile(flujo["caja_acumulada"], [10, 50, 90], axis=0)
+        meses_eje = np.arange(1, mc_meses + 1)
+        fig_caja = go.Figure()
+        fig_caja.add_trace(go.Scatter(x=meses_eje, y=bandas_caja[2], mode="lines", line={'width': 0}, showlegend=False, name="P90"))
+        fig_caja.add_trace(go.Scatter(x=meses_eje, y=bandas_caja[0], mode="lines", line={'width': 0}, fill="tonexty",
+                                      fillcolor="rgba(44, 160, 44, 0.25)", name="Banda P10-P90"))
+        fig_caja.add_trace(go.Scatter(x=meses_eje, y=bandas_caja[1], mode="lines+markers", name="Caja Acumulada P50"))
+        fig_caja.add_hline(y=0, line_dash="dash", line_color="red")
+        fig_caja.update_layout(title="Caja Acumulada", xaxis_title="Mes", yaxis_title="$")
+        st.plotly_chart(fig_caja, use_container_width=True)
+    with col_f2:
+        fig_vpn = px.histogram(x=flujo["vpn"], nbins=60, labels={'x': "VPN ($)"}, title="Distribución del VPN")
+        fig_vpn.add_vline(x=0, line_dash="dash", line_color="red")
+        st.plotly_chart(fig_vpn, use_container_width=True)
+
+    st.markdown("#### Estado de Flujo Mensual (Escenario Mediano por Mes)")
+    df_flujo = pd.DataFrame({
+        "Mes": meses_eje,
+        "Ingreso Devengado": np.median(flujo["ingreso"], axis=0),
+        "Cobros": np.median(flujo["cobros"], axis=0),
+        "Nómina": -np.median(flujo["costo_nomina"], axis=0),
+        "Administración": -np.median(flujo["costo_admin"], axis=0),
+        "Gastos Fijos Pagados": -np.median(flujo["pagos_fijos"], axis=0),
+        "Contrataciones": -np.median(flujo["costo_contratacion"], axis=0),
+        "Flujo Neto": np.median(flujo["flujo_neto"], axis=0),
+        "Caja Acumulada": bandas_caja[1],
+    })
+    st.dataframe(df_flujo.style.format({c: "${:,.0f}" for c in df_flujo.columns if c != "Mes"}), hide_index=True, use_container_width=True)
+
+perfil.marcar("pestaña Flujo de Caja")
+panel_perfilado(perfil, "mro")
\ No newline at end of file